@@ -0,0 +1,10 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmarks for the performance sensitive parts of ttkstyles. Every
+module can be run from the repository root, for example:
+
+    python -m benchmarks.bench_configure
+"""
@@ -0,0 +1,75 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark extracting a single theme folder from a large repository
+archive. The whole archive is extracted and the folder copied out of it,
+as ZippedFile used to, and compared to streaming only the members of the
+folder from an ArchiveIndex, both with a new and with a reused index.
+"""
+# Standard Library
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+# Project Modules
+from ttkstyles.archive import ArchiveIndex
+
+
+# Size of the archive in MB, may be given as the first argument
+SIZE = 300
+FILE_SIZE = 256 * 1024
+THEME_FILES = 20
+
+
+def create_archive(path: str, size: int):
+    """Create an archive of incompressible files with one small theme folder"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(size * 1024 * 1024 // FILE_SIZE):
+            archive.writestr("repo-master/data/{:03d}/{}.bin".format(i % 100, i), os.urandom(FILE_SIZE))
+        for i in range(THEME_FILES):
+            archive.writestr("repo-master/themes/dummy/image{}.png".format(i), os.urandom(4096))
+
+
+def extract_all(path: str, member: str, target: str):
+    with zipfile.ZipFile(path) as archive:
+        extract_to = tempfile.mkdtemp()
+        archive.extractall(extract_to)
+        shutil.copytree(os.path.join(extract_to, member), target)
+        shutil.rmtree(extract_to)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "repo.zip")
+        create_archive(path, size)
+        member = "repo-master/themes/dummy"
+
+        results = []
+        start = time.perf_counter()
+        extract_all(path, member, os.path.join(directory, "all"))
+        results.append(("extract all", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        ArchiveIndex.get(path).extract(member, os.path.join(directory, "new"))
+        results.append(("new index", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        ArchiveIndex.get(path).extract(member, os.path.join(directory, "reused"))
+        results.append(("reused index", time.perf_counter() - start))
+
+        print("archive: {} MB, {} members".format(size, len(ArchiveIndex.get(path).names)))
+        for name, duration in results:
+            print("{:<14} {:>10.1f} ms".format(name, duration * 1000))
+        ArchiveIndex.discard(path)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark applying a style sheet with a Style.configure call for every
+selector against applying it with a single Tcl evaluation through
+Style.configure_batch.
+"""
+# Standard Library
+import timeit
+import tkinter as tk
+from typing import Any, Dict
+# Project Modules
+from ttkstyles.style import Style
+
+
+SIZES = (10, 100, 1000)
+NUMBER, REPEAT = 10, 5
+
+
+def build_styles(n: int) -> Dict[str, Dict[str, Any]]:
+    """Build a style sheet with n selectors"""
+    return {
+        "Style{}.TLabel".format(i): {"font": ("Helvetica", 10 + i % 8), "foreground": "blue", "padding": (2, 4)}
+        for i in range(n)
+    }
+
+
+def bench(statement) -> float:
+    """Return the best time per call in milliseconds"""
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main():
+    window = tk.Tk()
+    style = Style(window, auto_load=False)
+
+    print("{:>10} {:>12} {:>12} {:>8}".format("selectors", "loop (ms)", "batch (ms)", "speedup"))
+    for n in SIZES:
+        styles = build_styles(n)
+        settings = {name: {"configure": options} for name, options in styles.items()}
+
+        def loop():
+            for name, options in styles.items():
+                style.configure(name, **options)
+
+        loop_time = bench(loop)
+        batch_time = bench(lambda: style.configure_batch(settings))
+        print("{:>10} {:>12.3f} {:>12.3f} {:>7.1f}x".format(n, loop_time, batch_time, loop_time / batch_time))
+
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark creating and configuring widgets with an increasing number of
+hooks installed on ttk.Widget. The widgets are created and configured
+without any hooked options, which is the common case, and configured
+once more with an option of the last hook created.
+"""
+# Standard Library
+import time
+import tkinter as tk
+from tkinter import ttk
+# Project Modules
+from ttkstyles.hooks import hook_ttk_widgets
+
+
+HOOKS = (0, 1, 2, 5)
+WIDGETS = 100000
+
+
+def updater(widget, option, value):
+    pass
+
+
+def main():
+    window = tk.Tk()
+    installed = 0
+
+    print("{:>6} {:>14} {:>14} {:>14}".format("hooks", "create (us)", "configure (us)", "hooked (us)"))
+    for n_hooks in HOOKS:
+        while installed < n_hooks:
+            installed += 1
+            hook_ttk_widgets(updater, {"bench_option_{}".format(installed): None}, apply_defaults=False)
+
+        frame = ttk.Frame(window)
+        start = time.perf_counter()
+        widgets = [ttk.Label(frame) for _ in range(WIDGETS)]
+        create = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for widget in widgets:
+            widget.configure(text="Label")
+        configure = time.perf_counter() - start
+
+        hooked = float("nan")
+        if installed != 0:
+            option = {"bench_option_{}".format(installed): "Value"}
+            start = time.perf_counter()
+            for widget in widgets:
+                widget.configure(**option)
+            hooked = time.perf_counter() - start
+
+        print("{:>6} {:>14.2f} {:>14.2f} {:>14.2f}".format(
+            n_hooks, create / WIDGETS * 1e6, configure / WIDGETS * 1e6, hooked / WIDGETS * 1e6))
+        frame.destroy()
+
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
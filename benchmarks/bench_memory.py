@@ -0,0 +1,64 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark the Python memory used per widget in large widget trees, for
+widgets without any hooked options and for widgets with a hooked option
+set to a value other than its default. Only memory allocated by Python
+is measured, the memory used by Tk itself is not included.
+"""
+# Standard Library
+import gc
+import tkinter as tk
+from tkinter import ttk
+import tracemalloc
+# Project Modules
+from ttkstyles.style import Style
+from ttkstyles import tooltips  # noqa: F401, installs the tooltip hook
+
+
+SIZES = (10000, 50000)
+ROWS = 100
+
+
+def build(window: tk.Tk, n: int, **kwargs) -> ttk.Frame:
+    """Build a tree of n labels in frames of ROWS labels each"""
+    top = ttk.Frame(window)
+    for i in range(n // ROWS):
+        frame = ttk.Frame(top)
+        for j in range(ROWS):
+            ttk.Label(frame, text="Label", **kwargs)
+    return top
+
+
+def measure(window: tk.Tk, n: int, **kwargs) -> float:
+    """Return the number of bytes allocated per widget"""
+    gc.collect()
+    start = tracemalloc.take_snapshot()
+    top = build(window, n, **kwargs)
+    gc.collect()
+    end = tracemalloc.take_snapshot()
+    size = sum(stat.size_diff for stat in end.compare_to(start, "filename"))
+    top.destroy()
+    return size / (n + n // ROWS)
+
+
+def main():
+    window = tk.Tk()
+    Style(window, auto_load=False)
+    tracemalloc.start()
+
+    print("{:>8} {:>12} {:>12} {:>12}".format("widgets", "plain (B)", "style (B)", "options (B)"))
+    for n in SIZES:
+        plain = measure(window, n)
+        style = measure(window, n, style="Custom.TLabel")
+        options = measure(window, n, tooltip_options={"wait": 1})
+        print("{:>8} {:>12.1f} {:>12.1f} {:>12.1f}".format(n, plain, style, options))
+
+    tracemalloc.stop()
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark the cost of retrieving the Style instance for a widget with
+Style(widget) for an increasing number of Tk roots and threads. The
+instances are created up front, so only the lookup is measured, which
+is what the hooks do for every widget.
+"""
+# Standard Library
+from threading import Barrier, Thread
+import time
+import tkinter as tk
+from tkinter import ttk
+# Project Modules
+from ttkstyles.style import Style
+
+
+ROOTS = (1, 2, 4, 8)
+THREADS = (1, 2, 4, 8)
+CALLS = 100000
+
+
+def lookup(widgets, barrier: Barrier, results: list):
+    """Look up the Style for every widget in turn and record the time"""
+    barrier.wait()
+    start = time.perf_counter()
+    n = len(widgets)
+    for i in range(CALLS):
+        Style(widgets[i % n])
+    results.append(time.perf_counter() - start)
+
+
+def main():
+    print("{:>6} {:>8} {:>14}".format("roots", "threads", "ns per call"))
+    for n_roots in ROOTS:
+        roots = [tk.Tk() for _ in range(n_roots)]
+        # Look up through a nested widget, as the hooks do
+        widgets = [ttk.Label(ttk.Frame(root)) for root in roots]
+        for root in roots:
+            Style(root, auto_load=False)
+
+        for n_threads in THREADS:
+            barrier, results = Barrier(n_threads), []
+            threads = [Thread(target=lookup, args=(widgets, barrier, results)) for _ in range(n_threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print("{:>6} {:>8} {:>14.1f}".format(n_roots, n_threads, max(results) / CALLS * 1e9))
+
+        for root in roots:
+            root.destroy()
+
+
+if __name__ == '__main__':
+    main()
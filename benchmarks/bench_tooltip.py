@@ -0,0 +1,61 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark hovering over a row of widgets with tooltips. For every hover
+the time from entering the widget until the tooltip is visible is
+measured, as well as the number of Tk windows created and destroyed.
+"""
+# Standard Library
+import statistics
+import time
+import tkinter as tk
+from tkinter import ttk
+# Project Modules
+from ttkstyles import tooltips
+
+
+WIDGETS = 50
+HOVERS = 500
+
+
+def main():
+    window = tk.Tk()
+    buttons = [ttk.Button(window, text=str(i), tooltip="Tooltip {}".format(i), tooltip_options={"wait": 0})
+               for i in range(WIDGETS)]
+    for i, button in enumerate(buttons):
+        button.grid(row=0, column=i)
+    window.update()
+
+    # Count the windows created and destroyed through the Tcl commands
+    churn = {"created": 0, "destroyed": 0}
+
+    def count(command, *args):
+        name = window.tk.splitlist(command)[0]
+        churn["destroyed" if name == "destroy" else "created"] += 1
+
+    command = window.register(count)
+    for name in ("toplevel", "ttk::label", "destroy"):
+        window.tk.call("trace", "add", "execution", name, "enter", command)
+
+    latencies = []
+    for i in range(HOVERS):
+        tooltip = tooltips.get_tooltip(buttons[i % WIDGETS])
+        start = time.perf_counter()
+        tooltip._enter()
+        while tooltip._window is None or not tooltip._window.toplevel.winfo_viewable():
+            window.update()
+        latencies.append(time.perf_counter() - start)
+        tooltip._hidetip()
+
+    print("hovers:            {}".format(HOVERS))
+    print("median latency:    {:.3f} ms".format(statistics.median(latencies) * 1000))
+    print("max latency:       {:.3f} ms".format(max(latencies) * 1000))
+    print("windows created:   {}".format(churn["created"]))
+    print("windows destroyed: {}".format(churn["destroyed"]))
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark the latency of the event loop while the pointer is swept
+across a grid of tristate checkbuttons. For every widget, <Enter> and
+<Leave> events are generated and the time until the event loop is idle
+again is measured.
+"""
+# Standard Library
+import statistics
+import time
+import tkinter as tk
+# Project Modules
+from ttkstyles.widgets.tristate import TristateCheckbutton, TristateWidget
+
+
+WIDGETS = 1000
+COLUMNS = 40
+
+
+def main():
+    window = tk.Tk()
+    widgets = []
+    for i in range(WIDGETS):
+        widget = TristateCheckbutton(window, text=str(i))
+        widget.set(TristateWidget.State(i % 3))
+        widget.grid(row=i // COLUMNS, column=i % COLUMNS)
+        widgets.append(widget)
+    window.update()
+
+    latencies = []
+    for widget in widgets:
+        start = time.perf_counter()
+        widget.event_generate("<Enter>")
+        widget.event_generate("<Leave>")
+        window.update()
+        latencies.append(time.perf_counter() - start)
+
+    print("widgets:        {}".format(WIDGETS))
+    print("total sweep:    {:.1f} ms".format(sum(latencies) * 1000))
+    print("median latency: {:.3f} ms".format(statistics.median(latencies) * 1000))
+    print("max latency:    {:.3f} ms".format(max(latencies) * 1000))
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Benchmark a TristateTree of tens of thousands of checkbuttons. Leaves
+are toggled one by one, which only updates the path to the root, and
+the whole tree is selected and deselected in a single operation.
+"""
+# Standard Library
+import random
+import time
+import tkinter as tk
+from tkinter import ttk
+# Project Modules
+from ttkstyles.widgets.tristate import TristateCheckbutton, TristateTree
+
+
+DEPTH = 4
+BRANCHING = 12
+TOGGLES = 10000
+
+
+def main():
+    window = tk.Tk()
+    frame = ttk.Frame(window)
+    tree = TristateTree()
+    root = tree.add(TristateCheckbutton(frame))
+    level = [root]
+    start = time.perf_counter()
+    for _ in range(DEPTH):
+        level = [tree.add(TristateCheckbutton(frame), parent) for parent in level for _ in range(BRANCHING)]
+    leaves = level
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(TOGGLES):
+        random.choice(leaves).invoke()
+    toggle = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree.select(root)
+    select = time.perf_counter() - start
+    start = time.perf_counter()
+    root.invoke()
+    deselect = time.perf_counter() - start
+
+    print("nodes:          {}".format(len(tree._nodes)))
+    print("build:          {:.1f} ms".format(build * 1000))
+    print("leaf toggle:    {:.1f} us".format(toggle / TOGGLES * 1e6))
+    print("select all:     {:.1f} ms".format(select * 1000))
+    print("deselect all:   {:.1f} ms".format(deselect * 1000))
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
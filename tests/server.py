@@ -0,0 +1,99 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import hashlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import os
+from socketserver import ThreadingMixIn
+from threading import Thread
+import time
+from urllib.parse import unquote, urlsplit
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling every connection in a thread of its own"""
+
+    daemon_threads = True
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    Serve files with ETag, Range and redirect support
+
+    Files are served from the ``files`` dictionary of the server, or
+    from its ``directory`` if it is not None. The server records the path
+    and headers of every request in ``requests``. If ``truncate`` is set,
+    the next response is cut off halfway to simulate an interrupted
+    download, and ``delay`` slows down writing the body, so that requests
+    overlap with a download in progress.
+    """
+
+    protocol_version = "HTTP/1.1"
+    CHUNK = 16384
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path in server.redirects:
+            self.send_response(302)
+            self.send_header("Location", server.redirects[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = self._read()
+        if data is None:
+            self.send_error(404)
+            return
+        etag = '"{}"'.format(hashlib.sha1(data).hexdigest())
+        if self.headers.get("If-None-Match", None) == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start = 0
+        if "Range" in self.headers and self.headers.get("If-Range", etag) == etag:
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        if server.truncate:
+            server.truncate = False
+            self.wfile.write(data[start:start + (len(data) - start) // 2])
+            self.close_connection = True
+            return
+        for i in range(start, len(data), self.CHUNK):
+            self.wfile.write(data[i:i + self.CHUNK])
+            time.sleep(server.delay)
+
+    def _read(self):
+        """Return the contents of the requested file or None if it does not exist"""
+        path = unquote(urlsplit(self.path).path)
+        if path in self.server.files:
+            return self.server.files[path]
+        if self.server.directory is None:
+            return None
+        path = os.path.join(self.server.directory, *[part for part in path.split("/") if part not in ("", "..")])
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as fi:
+            return fi.read()
+
+
+def serve(directory: str = None) -> ThreadingServer:
+    """Serve files over HTTP from a local port in a daemon thread"""
+    server = ThreadingServer(("127.0.0.1", 0), FileHandler)
+    server.directory, server.files, server.redirects, server.requests = directory, {}, {}, []
+    server.truncate, server.delay = False, 0.0
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
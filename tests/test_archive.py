@@ -0,0 +1,173 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import os
+import shutil
+import tempfile
+import tkinter as tk
+from unittest import TestCase
+import zipfile
+# Module Under Test
+from ttkstyles.archive import ArchiveIndex, isdir, listdir, local_path
+from ttkstyles.exceptions import TtkStyleException, TtkStyleFileUnavailable
+from ttkstyles.files import File, ZippedFile
+from ttkstyles.style import Style
+from ttkstyles.themes.mount import ArchiveMount
+
+
+PKG_INDEX = "package ifneeded ttk::theme::zipped 0.1 [list source [file join $dir zipped.tcl]]"
+
+THEME = """
+set images [glob -directory [file join [file dirname [info script]] images] *.gif]
+set ::theme_images [lmap image $images {file tail $image}]
+set ::theme_exists [file isfile [lindex $images 0]]
+if {[info commands ::ttk::style] ne ""} {
+    image create photo zipped_image -file [lindex $images 0]
+    ttk::style theme create zipped -parent clam
+}
+package provide ttk::theme::zipped 0.1
+"""
+
+# Single pixel GIF image
+GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+class TestArchiveIndex(TestCase):
+    """Test the 'archive.py' module"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "repo.zip")
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("repo-master/", "")
+            archive.writestr("repo-master/README.md", "Read me")
+            archive.writestr("repo-master/theme/theme.tcl", "# Theme")
+            archive.writestr("repo-master/theme/images/image.png", b"\0" * 1024)
+            archive.writestr("repo-master/theme-other/other.tcl", "# Other")
+            archive.writestr("repo-master/empty/", "")
+            archive.writestr("repo-master/zipped/pkgIndex.tcl", PKG_INDEX)
+            archive.writestr("repo-master/zipped/zipped.tcl", THEME)
+            archive.writestr("repo-master/zipped/images/pixel.gif", GIF)
+            archive.writestr("repo-master/font.ttf", b"font")
+
+    def test_index(self):
+        index = ArchiveIndex.get(self.path)
+        self.assertIs(ArchiveIndex.get(self.path), index)
+        self.assertEqual(index.topmost_folder(), "repo-master/")
+        self.assertTrue(index.is_dir("repo-master/theme/"))
+        self.assertTrue(index.is_dir("repo-master/empty"))
+        self.assertFalse(index.is_dir("repo-master/them"))
+        self.assertTrue(index.exists("repo-master/README.md"))
+        self.assertEqual([relative for relative, _ in index.under("repo-master/theme")],
+                         ["images/image.png", "theme.tcl"])
+        self.assertRaises(TtkStyleFileUnavailable, index.info, "repo-master/missing")
+
+    def test_extract(self):
+        index = ArchiveIndex.get(self.path)
+        target = os.path.join(self.directory, "theme")
+        index.extract("repo-master/theme", target)
+        self.assertEqual(sorted(os.listdir(target)), ["images", "theme.tcl"])
+        self.assertEqual(os.path.getsize(os.path.join(target, "images", "image.png")), 1024)
+
+        target = os.path.join(self.directory, "README.md")
+        index.extract("repo-master/README.md", target)
+        with open(target) as fi:
+            self.assertEqual(fi.read(), "Read me")
+
+    def test_changed_and_unsafe(self):
+        index = ArchiveIndex.get(self.path)
+        with zipfile.ZipFile(self.path, "a") as archive:
+            archive.writestr("repo-master/theme/../../escaped.tcl", "# Escaped")
+        changed = ArchiveIndex.get(self.path)
+        self.assertIsNot(changed, index)
+        self.assertRaises(TtkStyleException, changed.extract, "repo-master/theme", os.path.join(self.directory, "t"))
+
+    def test_discard(self):
+        cache = File.CACHE_DIR
+        File.set_cache_dir(os.path.join(self.directory, "cache"))
+        try:
+            # Archives that are extracted from are not kept open
+            path = ZippedFile("theme", File(self.path), root=False, extract=True).abspath
+            self.assertTrue(os.path.isfile(os.path.join(path, "theme.tcl")))
+            self.assertNotIn(os.path.abspath(self.path), ArchiveIndex._indices)
+
+            index = ArchiveIndex.get(self.path)
+            ArchiveIndex.discard(os.path.join(self.directory, "other.zip"))
+            self.assertIs(ArchiveIndex.get(self.path), index)
+            ArchiveIndex.discard(self.directory)
+            self.assertTrue(index._mapping.closed)
+            self.assertNotIn(os.path.abspath(self.path), ArchiveIndex._indices)
+        finally:
+            File.CACHE_DIR = cache
+
+    def test_in_archive(self):
+        theme = ZippedFile("zipped", File(self.path), root=False, extract=False)
+        path = theme.abspath
+        self.assertEqual(path, os.path.join(self.path, "repo-master", "zipped"))
+        self.assertTrue(isdir(path))
+        self.assertEqual(listdir(path), ["images", "pkgIndex.tcl", "zipped.tcl"])
+
+        font = local_path(ZippedFile("font.ttf", File(self.path), root=False, extract=False).abspath)
+        with open(font, "rb") as fi:
+            self.assertEqual(fi.read(), b"font")
+        # Members are never written to disk where no anonymous files exist
+        memfd_create = os.memfd_create
+        del os.memfd_create
+        try:
+            self.assertRaises(TtkStyleException, local_path, os.path.join(self.path, "repo-master", "README.md"))
+        finally:
+            os.memfd_create = memfd_create
+
+        interp = tk.Tcl()
+        with ArchiveMount(interp.tk):
+            interp.tk.call("set", "dir", path)
+            interp.tk.call("source", os.path.join(path, "pkgIndex.tcl"))
+            interp.tk.call("package", "require", "ttk::theme::zipped")
+        self.assertEqual(interp.getvar("::theme_images"), ("pixel.gif",))
+        self.assertTrue(interp.getboolean(interp.getvar("::theme_exists")))
+        self.assertEqual(interp.tk.call("info", "commands", "::ttkstyles::mount*"), "")
+
+    def test_mount_commands(self):
+        path = ZippedFile("zipped", File(self.path), root=False, extract=False).abspath
+        interp = tk.Tcl()
+        interp.tk.call("set", "dir", path)
+        with ArchiveMount(interp.tk):
+            self.assertEqual(interp.tk.splitlist(interp.tk.eval("glob -directory $dir -tails */*.{gif,png}")),
+                             ("images/pixel.gif",))
+            self.assertEqual(interp.tk.splitlist(interp.tk.eval("glob -directory $dir -types d *")),
+                             (os.path.join(path, "images"),))
+            self.assertEqual(interp.tk.splitlist(interp.tk.eval("glob -path $dir/zip *.tcl")),
+                             (os.path.join(path, "zipped.tcl"),))
+            self.assertEqual(interp.tk.eval("glob -nocomplain -directory $dir *.png"), "")
+            self.assertEqual(interp.tk.eval("file size [file join $dir images pixel.gif]"), str(len(GIF)))
+            self.assertEqual(interp.tk.eval("file type [file join $dir images]"), "directory")
+            self.assertEqual(interp.tk.eval("file tail [file join $dir zipped.tcl]"), "zipped.tcl")
+            script = "set fi [open [file join $dir zipped.tcl]]; set data [read $fi]; close $fi; set data"
+            self.assertEqual(interp.tk.eval(script), THEME)
+            script = "set fi [open [file join $dir images pixel.gif] rb]; seek $fi -4 end; binary encode hex [read $fi]"
+            self.assertEqual(interp.tk.eval(script), GIF[-4:].hex())
+            self.assertRaises(tk.TclError, interp.tk.eval, "open [file join $dir zipped.tcl] w")
+            self.assertRaises(tk.TclError, interp.tk.eval, "file delete [file join $dir zipped.tcl]")
+        # Channels remain readable after loading
+        self.assertEqual(interp.tk.eval("seek $fi 0; binary encode hex [read $fi 6]"), GIF[:6].hex())
+        interp.tk.eval("close $fi")
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIn("repo-master/zipped/zipped.tcl", archive.namelist())
+
+    def test_load_theme_in_archive(self):
+        window = tk.Tk()
+        try:
+            style = Style(window)
+            theme = ZippedFile("zipped", File(self.path), root=False, extract=False)
+            self.assertEqual(style.load_theme(theme, "tcl"), "zipped")
+            self.assertEqual(window.tk.call("image", "width", "zipped_image"), 1)
+            self.assertIsNone(theme._key)  # Nothing is extracted into the cache
+        finally:
+            window.destroy()
+
+    def tearDown(self):
+        ArchiveIndex.discard(self.directory)
+        shutil.rmtree(self.directory)
@@ -0,0 +1,54 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import tkinter as tk
+from tkinter import ttk
+from unittest import TestCase
+# Module Under Test
+from ttkstyles.capabilities import Capabilities
+from ttkstyles.themes import TclThemeLoader
+from ttkstyles.widgets import SwitchButton, ToggleButton
+
+
+class TestCapabilities(TestCase):
+    """Test the 'capabilities.py' module"""
+
+    def setUp(self):
+        self.window = tk.Tk()
+        self.style = ttk.Style(self.window)
+        self.style.theme_use("default")
+
+    def test_layouts(self):
+        capabilities = Capabilities.get(self.window)
+        theme = capabilities.theme()
+        self.assertEqual(theme.theme, "default")
+        self.assertTrue(theme.has_layout("TButton"))
+        self.assertFalse(theme.has_layout("Missing.TButton"))
+        self.assertIn("Checkbutton.indicator", theme.elements)
+        self.assertEqual(theme.extras, [])
+        self.assertIs(capabilities.theme(), theme)
+        self.assertRaises(tk.TclError, ToggleButton, self.window)
+
+        self.style.layout("Toggle", self.style.layout("TCheckbutton"))
+        self.window.update()  # <<ThemeChanged>> invalidates the index
+        self.assertIsNot(capabilities.theme(), theme)
+        self.assertEqual(capabilities.theme().extras, ["ToggleButton", "SwitchButton"])
+        self.assertEqual(ToggleButton(self.window).cget("style"), "Toggle")
+        self.assertEqual(SwitchButton(self.window).cget("style"), "Toggle")
+
+    def test_other_theme(self):
+        self.style.theme_settings("clam", {"Switch": {"layout": self.style.layout("TCheckbutton")}})
+        capabilities = Capabilities.get(self.window)
+        self.assertEqual(capabilities.theme("clam").extras, ["SwitchButton"])
+        self.assertEqual(self.style.theme_use(), "default")
+
+    def test_loader_extras(self):
+        loader = TclThemeLoader(self.window.tk, "")
+        loader._theme = "default"
+        self.assertEqual(loader.supports_extras(), [])
+
+    def tearDown(self):
+        self.window.destroy()
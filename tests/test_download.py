@@ -0,0 +1,137 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+from logging.handlers import BufferingHandler
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+# Module Under Test
+from ttkstyles import files
+from ttkstyles.download import Downloader
+# Test Utilities
+from server import serve
+
+
+class TestDownloader(TestCase):
+    """Test the 'download.py' module"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.server = serve()
+        self.downloader = Downloader(timeout=5)
+
+    def url(self, path: str) -> str:
+        return "http://127.0.0.1:{}{}".format(self.server.server_port, path)
+
+    def read(self, path: str) -> bytes:
+        with open(path, "rb") as fi:
+            return fi.read()
+
+    def test_revalidate(self):
+        self.server.files["/theme.zip"] = b"theme" * 1000
+        target = os.path.join(self.directory, "theme.zip")
+        validators = self.downloader.fetch(self.url("/theme.zip"), target)
+        self.assertEqual(self.read(target), b"theme" * 1000)
+        self.assertIsNotNone(validators["etag"])
+
+        self.assertIsNone(self.downloader.fetch(self.url("/theme.zip"), target, validators))
+        self.assertEqual(self.server.requests[-1][1]["If-None-Match"], validators["etag"])
+
+        self.server.files["/theme.zip"] = b"changed"
+        self.assertNotEqual(self.downloader.fetch(self.url("/theme.zip"), target, validators), validators)
+        self.assertEqual(self.read(target), b"changed")
+        self.assertEqual(self.downloader.connections, 1)
+
+    def test_resume(self):
+        data = os.urandom(100000)
+        self.server.files["/theme.zip"] = data
+        self.server.truncate = True
+        target = os.path.join(self.directory, "theme.zip")
+        self.assertRaises(http.client.IncompleteRead, self.downloader.fetch, self.url("/theme.zip"), target)
+        self.assertFalse(os.path.exists(target))
+        self.assertEqual(os.path.getsize(target + ".part"), len(data) // 2)
+
+        self.downloader.fetch(self.url("/theme.zip"), target)
+        self.assertEqual(self.server.requests[-1][1]["Range"], "bytes={}-".format(len(data) // 2))
+        self.assertEqual(self.read(target), data)
+        self.assertFalse(os.path.exists(target + ".part"))
+
+        # A partial download of a file that changed since is started over
+        self.server.files["/theme.zip"] = b"changed"
+        self.server.truncate = True
+        self.assertRaises(http.client.IncompleteRead, self.downloader.fetch, self.url("/theme.zip"), target)
+        self.server.files["/theme.zip"] = b"changed again"
+        self.downloader.fetch(self.url("/theme.zip"), target)
+        self.assertEqual(self.read(target), b"changed again")
+
+    def test_redirect(self):
+        self.server.files["/codeload/theme.zip"] = b"theme"
+        self.server.redirects["/archive/theme.zip"] = "/codeload/theme.zip"
+        target = os.path.join(self.directory, "theme.zip")
+        self.downloader.fetch(self.url("/archive/theme.zip"), target)
+        self.assertEqual(self.read(target), b"theme")
+
+    def test_prefetch(self):
+        downloader = Downloader()
+        records = BufferingHandler(10)
+        downloader.logger.addHandler(records)
+        started, release = threading.Event(), threading.Event()
+        blocking = downloader.prefetch(lambda: started.set() or release.wait(5))
+        pending = downloader.prefetch(self.fail, "Cancelled prefetch ran")
+        started.wait(5)
+        downloader.close()  # Cancels the prefetches that have not started
+        release.set()
+        self.assertTrue(blocking.result(5))
+        self.assertTrue(pending.cancelled())
+        self.assertTrue(downloader._prefetcher.daemon)
+
+        # Callbacks run in order, so the failure is logged once this one runs
+        logged = threading.Event()
+        downloader.prefetch(open, os.path.join(self.directory, "missing")).add_done_callback(lambda _: logged.set())
+        logged.wait(5)
+        self.assertEqual(len(records.buffer), 1)
+        self.assertIn("Prefetch failed", records.buffer[0].getMessage())
+
+    def test_remote_file(self):
+        cache_dir, revalidate = files.File.CACHE_DIR, files.RemoteFile.REVALIDATE
+        files.File.set_cache_dir(os.path.join(self.directory, "cache"))
+        try:
+            self.server.files["/font.ttf"] = b"font"
+            remote = [files.RemoteFile("font.ttf", self.url("/font.ttf")) for _ in range(8)]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                paths = set(executor.map(lambda f: f.abspath, remote))
+            self.assertEqual(len(paths), 1)
+            self.assertEqual(len(self.server.requests), 1)
+
+            files.RemoteFile.REVALIDATE = True
+            files.RemoteFile._revalidated.discard(remote[0]._key)
+            self.assertEqual(remote[0].abspath, paths.pop())
+            self.assertEqual(remote[1].abspath, remote[0].abspath)
+            self.assertEqual(len(self.server.requests), 2)  # Revalidated only once
+            self.assertIn("If-None-Match", self.server.requests[-1][1])
+
+            # An interrupted revalidation falls back to the cached file
+            path = remote[0].abspath
+            self.server.files["/font.ttf"] = b"newer font"
+            self.server.truncate = True
+            files.RemoteFile._revalidated.discard(remote[0]._key)
+            self.assertEqual(remote[0].abspath, path)
+            self.assertEqual(self.read(path), b"font")
+
+            self.server.files["/font.ttf"] = b"new font"
+            files.RemoteFile._revalidated.discard(remote[0]._key)
+            self.assertEqual(self.read(remote[0].abspath), b"new font")
+        finally:
+            files.File.CACHE_DIR, files.RemoteFile.REVALIDATE = cache_dir, revalidate
+
+    def tearDown(self):
+        self.downloader.close()
+        self.server.shutdown()
+        shutil.rmtree(self.directory)
@@ -4,10 +4,26 @@ License: GNU GPLv3
 Copyright (c) 2020 RedFantom
 """
 # Standard Library
+import json
 import os
+import shutil
+import tempfile
 from unittest import TestCase
+import zipfile
 # Module Under Test
 from ttkstyles import files
+from ttkstyles.cache import Cache
+# Test Utilities
+from server import serve
+
+
+def create_archive(path: str):
+    """Create a ZIP-archive with a folder with a topmost folder"""
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("repo/", "")
+        archive.writestr("repo/theme/", "")
+        archive.writestr("repo/theme/theme.tcl", "# Theme")
+        archive.writestr("repo/theme/image.png", b"\0" * 1024)
 
 
 class TestFiles(TestCase):
@@ -34,3 +50,72 @@ class TestFiles(TestCase):
         f = files.GitHubRepoFile("ttkthemes/png/breeze", "TkinterEP", "ttkthemes")
         self.assertTrue(os.path.exists(f.abspath))
         print(f.abspath)
+
+
+class TestCache(TestCase):
+    """Test the content-addressed cache of the 'files.py' module"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir, self.cache_size = files.File.CACHE_DIR, files.File.CACHE_SIZE
+        files.File.set_cache_dir(os.path.join(self.directory, "cache"))
+        create_archive(os.path.join(self.directory, "repo.zip"))
+        self.server = serve(self.directory)
+
+    def url(self, name: str) -> str:
+        return "http://127.0.0.1:{}/{}".format(self.server.server_port, name)
+
+    def test_shared_archive(self):
+        first = files.RemoteZippedFile("theme", self.url("repo.zip"), name="first.zip", root=False)
+        second = files.RemoteZippedFile("theme", self.url("repo.zip"), name="second.zip", root=False)
+        path = first.abspath
+        self.assertTrue(os.path.exists(os.path.join(path, "theme.tcl")))
+
+        self.server.shutdown()  # Everything must be resolved from the cache
+        self.assertEqual(second.abspath, path)
+        cache = Cache.get(files.File.CACHE_DIR)
+        self.assertEqual(cache.entry("url:{}".format(self.url("repo.zip")))["source"], self.url("repo.zip"))
+        self.assertEqual(len(os.listdir(os.path.join(files.File.CACHE_DIR, "blobs"))), 2)
+
+        cache.save()
+        with open(os.path.join(files.File.CACHE_DIR, Cache.MANIFEST)) as fi:
+            self.assertEqual(json.load(fi)["entries"], cache._entries)
+
+    def test_local_archive(self):
+        archive = files.File(os.path.join(self.directory, "repo.zip"))
+        f = files.ZippedFile("repo/theme/theme.tcl", archive)
+        path = f.abspath
+        with open(path) as fi:
+            self.assertEqual(fi.read(), "# Theme")
+        self.assertEqual(files.ZippedFile("repo/theme/theme.tcl", archive).abspath, path)
+
+    def test_eviction(self):
+        cache = Cache(os.path.join(self.directory, "evicted"))
+        for i, size in enumerate((100, 200, 300)):
+            path = os.path.join(self.directory, "blob{}".format(i))
+            with open(path, "wb") as fo:
+                fo.write(os.urandom(size))
+            cache.store("blob{}".format(i), path, "blob", "test")
+        for i in range(3):
+            cache._entries["blob{}".format(i)]["used"] = i
+        self.assertEqual(cache.size, 600)
+
+        cache._release()
+        cache.lookup("blob0")
+        cache.evict(400)
+        self.assertEqual(set(cache._entries), {"blob0", "blob2"})
+        self.assertIsNone(cache.lookup("blob1"))
+        self.assertEqual(len(os.listdir(os.path.join(cache.directory, "blobs"))), 2)
+
+        files.File.clear_cache()
+        self.assertEqual(os.listdir(files.File.CACHE_DIR), [])
+
+    def test_github_file_url(self):
+        f = files.GitHubRepoFile("ttkthemes/png", "TkinterEP", "ttkthemes")
+        self.assertEqual(f._archive._url, "https://github.com/TkinterEP/ttkthemes/archive/master.zip")
+        self.assertEqual(f._archive._path, "ttkthemes.zip")
+
+    def tearDown(self):
+        self.server.shutdown()
+        files.File.CACHE_DIR, files.File.CACHE_SIZE = self.cache_dir, self.cache_size
+        shutil.rmtree(self.directory)
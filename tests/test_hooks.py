@@ -6,6 +6,7 @@ Source: The ttkwidgets repository
 from unittest import TestCase
 import tkinter as tk
 from tkinter import ttk
+from ttkstyles import hooks
 from ttkstyles.hooks import hook_ttk_widgets, generate_hook_name, is_hooked
 
 
@@ -129,6 +130,66 @@ class TestHooks(TestCase):
         ttk.Button()
         self.assertTrue(self.has_been_updated())
 
+    def test_single_install(self):
+        calls = []
+
+        def record(widget, option, value):
+            calls.append((option, value))
+
+        hook_ttk_widgets(record, {"single_a": "A"})
+        hook_ttk_widgets(record, {"single_b": "B", "single_c": "C"})
+        # The functions of ttk.Widget are replaced once for all hooks
+        self.assertIs(ttk.Widget.__init__, hooks._widget_init)
+        self.assertIs(ttk.Widget.configure, hooks._widget_configure)
+        self.assertIs(ttk.Widget.config, hooks._widget_configure)
+        self.assertIsNot(hooks.OriginalFunctions.original_init, hooks._widget_init)
+        self.assertIsNot(hooks.OriginalFunctions.original_configure, hooks._widget_configure)
+
+        button = ttk.Button(self.window, single_b="Custom")
+        self.assertEqual(sorted(calls), [("single_a", "A"), ("single_b", "Custom"), ("single_c", "C")])
+        del calls[:]
+        button.configure(single_c="Y", text="Text", single_a="X")
+        self.assertEqual(calls, [("single_c", "Y"), ("single_a", "X")])
+        self.assertEqual(button.cget("text"), "Text")
+
+    def test_values_table(self):
+        options = {"table_option": "Default"}
+        hook_ttk_widgets(lambda *args: None, options)
+        values = hooks._values["table_option"]
+        button = ttk.Button(self.window)
+        self.assertNotIn(button, values)
+
+        button.configure(table_option="Custom")
+        self.assertEqual(values[button], "Custom")
+        self.assertIn(hooks.BINDTAG, button.bindtags())
+        button.configure(table_option="Default")
+        self.assertNotIn(button, values)
+        self.assertEqual(button.cget("table_option"), "Default")
+
+        button.configure(table_option="Custom")
+        button.destroy()
+        self.assertNotIn(button, values)
+
+    def test_deferred_hook(self):
+        batches = []
+        hook_ttk_widgets(None, {"deferred_option": None}, apply_defaults=False, batch_updater=batches.append)
+        buttons = [ttk.Button(self.window, deferred_option="Initial") for _ in range(10)]
+        for i in range(5):
+            for button in buttons:
+                button.configure(deferred_option="Value {}".format(i))
+        self.assertEqual(batches, [])
+        self.assertEqual(buttons[0].cget("deferred_option"), "Value 4")
+
+        self.window.update()
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0], [(button, "deferred_option", "Value 4") for button in buttons])
+
+        buttons[0].configure(deferred_option="Flushed")
+        buttons[1].configure(deferred_option="Destroyed")
+        buttons[1].destroy()
+        hooks.flush()
+        self.assertEqual(batches[1], [(buttons[0], "deferred_option", "Flushed")])
+
     def tearDown(self):
         self.window.destroy()
 
@@ -0,0 +1,152 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from threading import Thread
+import time
+from unittest import TestCase
+import zipfile
+# Module Under Test
+from ttkstyles import files
+from ttkstyles.cache import Cache
+from ttkstyles.lock import FileLock
+# Test Utilities
+from server import serve
+
+
+PROCESSES = 8
+THEME = "package provide ttk::theme::dummy 0.1\n"
+
+
+def resolve(cache: str, url: str, start: float):
+    """Resolve the theme of the repository in a new process at the start time"""
+    files.File.set_cache_dir(cache)
+    files.GitHubRepoFile.URL = url
+    time.sleep(max(start - time.time(), 0))
+    path = files.GitHubRepoFile("themes/dummy", "author", "repo").abspath
+    with open(os.path.join(path, "dummy.tcl")) as fi:
+        return path, fi.read(), sorted(os.listdir(path))
+
+
+class TestLock(TestCase):
+    """Test the 'lock.py' module and cache population by multiple processes"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def test_file_lock(self):
+        path, events = os.path.join(self.directory, "locks", "test.lock"), []
+
+        def hold(name: str):
+            with FileLock(path):
+                events.append((name, "acquired"))
+                time.sleep(0.1)
+                events.append((name, "released"))
+
+        threads = [Thread(target=hold, args=(str(i),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Every acquisition is followed by the release of the same holder
+        self.assertEqual([event for _, event in events], ["acquired", "released"] * 4)
+        self.assertTrue(all(events[i][0] == events[i + 1][0] for i in range(0, 8, 2)))
+
+    def store(self, cache: Cache, key: str):
+        """Store a file of 100 bytes for key in a cache"""
+        path = os.path.join(self.directory, key)
+        with open(path, "wb") as fo:
+            fo.write(key.encode() * 100)
+        cache.store(key, path, key, "test")
+
+    def test_evict_locked(self):
+        cache = Cache(os.path.join(self.directory, "cache"))
+        for key in ("a", "b"):
+            self.store(cache, key)
+        cache._release()  # Blobs used by this process are never evicted
+
+        # The lock of a key is held while its blob is populated or extracted from
+        with cache._lock_file(hashlib.sha1(b"a").hexdigest()):
+            cache.evict(0)
+        self.assertIsNotNone(cache.lookup("a"))
+        self.assertIsNone(cache.entry("b"))
+        cache._release()
+        with cache.lock("a"):
+            cache.evict(0)
+        self.assertIsNotNone(cache.entry("a"))
+        cache.evict(0)
+        self.assertIsNone(cache.entry("a"))
+        self.assertEqual(os.listdir(os.path.join(cache.directory, "blobs")), [])
+
+    def test_evict_used(self):
+        directory = os.path.join(self.directory, "cache")
+        first = Cache(directory)
+        self.store(first, "a")
+        self.store(first, "b")
+        first._release()
+        self.assertIsNotNone(first.lookup("a"))
+
+        # Blobs used by another process are not evicted
+        second = Cache(directory)
+        second.evict(0)
+        self.assertEqual(sorted(second._entries), ["a"])
+        self.assertTrue(os.path.exists(first.lookup("a")))
+        first._release()
+        second.evict(0)
+        self.assertEqual(second._entries, {})
+
+    def test_merge_removed(self):
+        directory = os.path.join(self.directory, "cache")
+        first = Cache(directory)
+        for key in ("a", "b"):
+            self.store(first, key)
+        second = Cache(directory)  # Cache of another process sharing the directory
+        second._remove(second.entry("a")["path"])
+        second.save()
+
+        # Keys removed by the other process are not written back
+        self.store(first, "c")
+        self.assertEqual(sorted(first._entries), ["b", "c"])
+        self.assertEqual(first.size, 200)
+        second._remove(second.entry("b")["path"])
+        second.save()
+        first.refresh()
+        self.assertEqual(sorted(first._entries), ["c"])
+        first.save()
+        self.assertEqual(sorted(Cache(directory)._entries), ["c"])
+
+    def test_processes(self):
+        with zipfile.ZipFile(os.path.join(self.directory, "master.zip"), "w") as archive:
+            archive.writestr("repo-master/themes/dummy/dummy.tcl", THEME)
+            for i in range(20):
+                archive.writestr("repo-master/themes/dummy/image{}.png".format(i), os.urandom(16384))
+        server = serve(self.directory)
+        server.delay = 0.01  # Processes start while the download is in progress
+        try:
+            url = "http://127.0.0.1:{}/{{commit}}.zip".format(server.server_port)
+            cache, start = os.path.join(self.directory, "cache"), time.time() + 2
+            with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+                results = pool.starmap(resolve, [(cache, url, start)] * PROCESSES)
+        finally:
+            server.shutdown()
+
+        self.assertEqual([path for path, _ in server.requests], ["/master.zip"])
+        self.assertEqual(len({path for path, _, _ in results}), 1)
+        for path, content, names in results:
+            self.assertEqual(content, THEME)
+            self.assertEqual(len(names), 21)
+        with open(os.path.join(cache, Cache.MANIFEST)) as fi:
+            keys = json.load(fi)["entries"].keys()
+        self.assertEqual(sum(key.startswith("url:") for key in keys), 1)
+        self.assertEqual(sum(key.startswith("zip:") for key in keys), 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,102 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+# Module Under Test
+from ttkstyles.files import File
+from ttkstyles.parser import StyleFile
+
+
+STYLE = b"""
+#theme {
+    name: azure;
+    type: tcl;
+    pkg: local;
+    path: azure;
+}
+
+Heading.TLabel {
+    font-size: 18;
+    grid-pady: (0, 10);
+}
+"""
+
+
+class TestStyleFile(TestCase):
+    """Test the 'parser.py' module"""
+
+    def setUp(self):
+        self.cache = File.CACHE_DIR
+        self.directory = tempfile.mkdtemp()
+        File.set_cache_dir(os.path.join(self.directory, "cache"))
+        self.path = os.path.join(self.directory, "test.ttkstyle")
+        with open(self.path, "wb") as fo:
+            fo.write(STYLE)
+
+    def test_compiled_cache(self):
+        parsed = StyleFile(self.path)
+        self.assertTrue(os.path.exists(StyleFile._compiled_path(parsed._path)))
+        self.assertEqual(parsed.grid_options, {"Heading.TLabel": {"pady": (0, 10)}})
+
+        # The compiled form must be loaded without importing tinycss
+        modules = {k: v for k, v in sys.modules.items() if k.startswith("tinycss")}
+        for module in modules:
+            del sys.modules[module]
+        try:
+            compiled = StyleFile(self.path)
+            self.assertFalse(any(k.startswith("tinycss") for k in sys.modules))
+        finally:
+            sys.modules.update(modules)
+        self.assertEqual(parsed._config, compiled._config)
+        self.assertEqual(parsed.styles, compiled.styles)
+
+    def test_compiled_cache_literals(self):
+        path = StyleFile._compiled_path(StyleFile(self.path)._path)
+        # Compiled files that are not literals are never evaluated
+        with open(path, "w") as fo:
+            fo.write("__import__('os').remove({!r})".format(self.path))
+        self.assertEqual(StyleFile(self.path).grid_options, {"Heading.TLabel": {"pady": (0, 10)}})
+        self.assertTrue(os.path.exists(self.path))
+
+        # A compiled file that cannot be written leaves no temporary file behind
+        os.remove(path)
+        os.makedirs(os.path.join(path, "blocked"))
+        StyleFile(self.path)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+    def test_compiled_cache_invalidated(self):
+        StyleFile(self.path)
+        with open(self.path, "ab") as fo:
+            fo.write(b"Other.TLabel { font-size: 12; }\n")
+        self.assertIn("Other.TLabel", StyleFile(self.path).styles)
+
+    def test_themes(self):
+        with open(self.path, "ab") as fo:
+            fo.write(b"#theme.dark { name: azure-dark; type: tcl; pkg: local; path: azure; }\n")
+            fo.write(b"azure-dark|Heading.TLabel { font-color: white; }\n")
+        parsed = StyleFile(self.path)
+        self.assertEqual([name for _, name, _ in parsed.themes], ["azure", "azure-dark"])
+        self.assertEqual(list(parsed.styles), ["Heading.TLabel"])
+        self.assertNotIn("foreground", parsed.theme_styles("azure")["Heading.TLabel"])
+        self.assertEqual(parsed.theme_styles("azure-dark")["Heading.TLabel"]["foreground"], "white")
+
+    def test_values(self):
+        with open(self.path, "ab") as fo:
+            fo.write(b"#font.Roboto { pkg: remote zip; path: fonts/all; "
+                     b"url: https://example.com/download?family=Roboto; archive: \"roboto.zip\"; }\n")
+        section = StyleFile(self.path, cache=False)._config["#font.Roboto"]
+        self.assertEqual(section, {"pkg": "remote zip", "path": "fonts/all", "archive": "roboto.zip",
+                                   "url": "https://example.com/download?family=Roboto"})
+        options = StyleFile(self.path, cache=False)._config["Heading.TLabel"]
+        self.assertEqual(options, {"font-size": 18, "grid-pady": (0, 10)})
+
+    def tearDown(self):
+        File.CACHE_DIR = self.cache
+        shutil.rmtree(self.directory)
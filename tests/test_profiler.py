@@ -0,0 +1,62 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import io
+import json
+import tkinter as tk
+from tkinter import ttk
+from unittest import TestCase
+# Module Under Test
+from ttkstyles import profiler
+from ttkstyles.style import Style
+
+
+class TestProfiler(TestCase):
+    """Test the 'profiler.py' module"""
+
+    def setUp(self):
+        self.window = tk.Tk()
+        self.style = Style(self.window, auto_load=False)
+
+    def test_disabled(self):
+        init, lookup = ttk.Widget.__init__, Style.lookup
+        with profiler.profiled():
+            self.assertTrue(profiler.is_enabled())
+            self.assertIsNot(ttk.Widget.__init__, init)
+        self.assertFalse(profiler.is_enabled())
+        self.assertIs(ttk.Widget.__init__, init)
+        self.assertIs(Style.lookup, lookup)
+
+        ttk.Label(self.window, text="Not recorded").grid()
+        self.assertEqual(profiler.stats(), {})
+
+    def test_stats(self):
+        with profiler.profiled():
+            for i in range(10):
+                label = ttk.Label(self.window, text=str(i))
+                label.configure(text="Label")
+                label.cget("text")
+                label.grid()
+            self.style.lookup("TLabel", "foreground")
+        stats = profiler.stats()
+
+        for name in ("hooks.init", "hooks.configure", "hooks.cget", "grid.configure"):
+            self.assertEqual(stats[name]["calls"], 10)
+        self.assertIn("tk.init", stats)
+        self.assertEqual(stats["style.lookup"]["calls"], 1)
+        init = stats["hooks.init"]
+        self.assertGreater(init["tcl_commands"], 0)
+        self.assertLessEqual(init["p50"], init["p99"])
+        self.assertGreaterEqual(init["total"], stats["tk.init"]["total"])
+
+        fo = io.StringIO()
+        profiler.dump(fo)
+        self.assertEqual(json.loads(fo.getvalue()), stats)
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+        self.window.destroy()
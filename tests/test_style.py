@@ -3,10 +3,110 @@ Author: RedFantom
 License: GNU GPLv3
 Copyright (c) 2021 RedFantom
 """
+import os
+import shutil
+import tempfile
+import time
 from unittest import TestCase
 import tkinter as tk
 from tkinter import ttk
+import zipfile
+from ttkstyles.files import File
 from ttkstyles.style import Style, TkSingleton
+from server import serve
+
+
+THEME = """
+ttk::style theme create dummy -parent clam -settings {
+    set padding 7
+    ttk::style configure TButton -padding $padding
+}
+package provide ttk::theme::dummy 0.1
+"""
+
+STYLE = """
+#theme {{
+    name: dummy;
+    type: tcl;
+    pkg: local;
+    path: {};
+}}
+
+Heading.TLabel {{
+    font-color: {};
+    grid-sticky: {};
+}}
+"""
+
+
+THEMES_STYLE = """
+#theme {{
+    name: dummy;
+    type: tcl;
+    pkg: local;
+    path: {};
+}}
+
+#theme.other {{
+    name: other;
+    type: tcl;
+    pkg: local;
+    path: {};
+}}
+
+Heading.TLabel {{
+    font-color: blue;
+    grid-sticky: we;
+}}
+
+other|Heading.TLabel {{
+    font-color: red;
+}}
+"""
+
+
+def create_theme(directory: str, name: str = "dummy") -> str:
+    """Create a minimal Tcl theme in directory"""
+    theme = os.path.join(directory, name)
+    if not os.path.exists(theme):
+        os.makedirs(theme)
+        with open(os.path.join(theme, "{}.tcl".format(name)), "w") as fo:
+            fo.write(THEME.replace("dummy", name))
+    return theme
+
+
+def create_style_file(directory: str, color: str = "blue", sticky: str = "we") -> str:
+    """Create a style file with a minimal Tcl theme in directory"""
+    theme = create_theme(directory)
+    path = os.path.join(directory, "test.ttkstyle")
+    with open(path, "w") as fo:
+        fo.write(STYLE.format(theme.replace(os.sep, "/"), color, sticky))
+    return path
+
+
+REMOTE_STYLE = """
+#theme {{
+    name: dummy;
+    type: tcl;
+    pkg: remote zip;
+    archive: dummy.zip;
+    path: dummy;
+    url: "{}";
+}}
+
+Heading.TLabel {{
+    font-color: blue;
+}}
+"""
+
+
+def create_theme_archive(directory: str) -> str:
+    """Create a ZIP-archive with the minimal Tcl theme in directory"""
+    path = os.path.join(directory, "dummy.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("dummy/", "")
+        archive.writestr("dummy/dummy.tcl", THEME)
+    return path
 
 
 def define_invalid_cls():
@@ -29,6 +129,8 @@ class TestStyle(TestCase):
         self.assertIs(style, Style(root=self.window))
         self.assertIs(style, Style(label))
         self.assertIs(style, Style())
+        self.assertIs(style, Style(None))
+        self.assertIs(style, Style(label, auto_load=False))
 
         second = tk.Tk()
         self.assertIsNot(style, Style(second))
@@ -51,5 +153,201 @@ class TestStyle(TestCase):
 
         w.update()
 
+    def test_configure_batch(self):
+        style = Style(self.window)
+        style.configure_batch({
+            "Batch.TLabel": {
+                "configure": {"foreground": "red", "font": ("Helvetica", 12), "padding": None},
+                "map": {"foreground": [("active", "blue")]},
+            }
+        })
+        self.assertEqual(style.lookup("Batch.TLabel", "foreground"), "red")
+        self.assertEqual(style.lookup("Batch.TLabel", "foreground", ("active",)), "blue")
+
+    def test_grid_defaults(self):
+        style = Style(self.window)
+        style._grid_options["TLabel"] = {"padx": 3}
+        style._grid_options["Heading.TLabel"] = {"pady": 4}
+
+        label = ttk.Label(self.window)
+        label.grid()
+        self.assertEqual(int(label.grid_info()["padx"]), 3)
+        self.assertIn((ttk.Label, None), style._grid_index)
+
+        heading = ttk.Label(self.window, style="Heading.TLabel")
+        heading.grid(padx=1)
+        self.assertEqual(int(heading.grid_info()["padx"]), 1)
+        self.assertEqual(int(heading.grid_info()["pady"]), 4)
+
+        style._grid_options["TLabel"] = {"padx": 5}
+        self.assertEqual(len(style._grid_index), 0)
+        label.grid()
+        self.assertEqual(int(label.grid_info()["padx"]), 5)
+
+        tk.Label(self.window).grid()  # Widgets that are not themed have no defaults
+
+    def test_lookup_cache(self):
+        style = Style(self.window)
+        cache = style._lookup_cache
+        style.configure("Cached.TLabel", foreground="red")
+        hits, misses = cache.hits, cache.misses
+        self.assertEqual(style.lookup("Cached.TLabel", "foreground"), "red")
+        self.assertEqual(style.lookup("Cached.TLabel", "foreground"), "red")
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (1, 1))
+
+        style.configure("Cached.TLabel", foreground="blue")
+        self.assertEqual(style.lookup("Cached.TLabel", "foreground"), "blue")
+        style.map("Cached.TLabel", foreground=[("active", "green")])
+        self.assertEqual(style.lookup("Cached.TLabel", "foreground", ("active",)), "green")
+
+        label = ttk.Label(self.window, style="Cached.TLabel")
+        self.assertEqual(str(label.cget("foreground")), "blue")
+
+    def test_restyle_labels(self):
+        style = Style(self.window)
+        style.configure("Restyled.TLabel", foreground="red")
+        labels = [ttk.Label(self.window, style="Restyled.TLabel") for _ in range(100)]
+        other = ttk.Label(self.window, style="Other.TLabel")
+        self.window.update()
+
+        cache = style._lookup_cache
+        misses = cache.misses
+        style.configure("Restyled.TLabel", foreground="blue")
+        style.configure("Restyled.TLabel", font="Courier 12")
+        self.window.update()
+        # One pass with a lookup per option of each style
+        self.assertEqual(cache.misses - misses, 4)
+        self.assertTrue(all(str(label.cget("foreground")) == "blue" for label in labels))
+        self.assertEqual(str(labels[0].cget("font")), "Courier 12")
+
+        other.configure(style="Restyled.TLabel")
+        self.assertEqual(set(style._labels["Restyled.TLabel"]), set(labels) | {other})
+        self.assertEqual(len(style._labels["Other.TLabel"]), 0)
+        labels[0].destroy()
+        style.configure("Restyled.TLabel", foreground="green")
+        self.window.update()
+        self.assertEqual(str(other.cget("foreground")), "green")
+
+        # Labels of which the style is reset are no longer restyled
+        labels[1].configure(style=None)
+        self.assertNotIn(labels[1], style._labels["Restyled.TLabel"])
+        self.assertNotIn(labels[1], style._label_styles)
+        style.configure("Restyled.TLabel", foreground="red")
+        self.window.update()
+        self.assertEqual(str(labels[1].cget("foreground")), "green")
+
+    def test_watch(self):
+        directory = tempfile.mkdtemp()
+        try:
+            style = Style(self.window)
+            style.load_style_file(create_style_file(directory))
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "blue")
+
+            themes = []
+            style.load_theme = lambda *args: themes.append(args)
+            style.watch(interval=10)
+            path = create_style_file(directory, color="red", sticky="ns")
+            os.utime(path, ns=(0, 0))
+            deadline = time.time() + 5
+            while style._settings_stat != Style._stat_file(path) and time.time() < deadline:
+                self.window.update()
+                time.sleep(0.01)
+
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "red")
+            self.assertEqual(style._grid_options["Heading.TLabel"], {"sticky": "ns"})
+            self.assertEqual(len(themes), 0)
+
+            # A file that fails to load does not stop the watch
+            with open(path, "w") as fo:
+                fo.write("#theme { name: dummy; }\n")
+            os.utime(path, ns=(1, 1))
+            while style._settings_stat != Style._stat_file(path) and time.time() < deadline:
+                self.window.update()
+                time.sleep(0.01)
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "red")
+            path = create_style_file(directory, color="green", sticky="ns")
+            os.utime(path, ns=(2, 2))
+            while style._settings_stat != Style._stat_file(path) and time.time() < deadline:
+                self.window.update()
+                time.sleep(0.01)
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "green")
+            style.unwatch()
+            self.assertIsNone(style._watch_id)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_snapshot(self):
+        directory = tempfile.mkdtemp()
+        try:
+            style = Style(self.window)
+            style.load_style_file(create_style_file(directory))
+            path = os.path.join(directory, "dummy.snapshot")
+            style.snapshot(path)
+
+            second = tk.Tk()
+            restored = Style(second)
+            self.assertEqual(restored.restore(path), "dummy")
+            self.assertEqual(restored.tk.call("ttk::style", "theme", "use"), "dummy")
+            self.assertEqual(str(restored.lookup("TButton", "padding")), "7")
+            self.assertEqual(restored.lookup("Heading.TLabel", "foreground"), "blue")
+            second.destroy()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_load_style_file_async(self):
+        directory, cache = tempfile.mkdtemp(), File.CACHE_DIR
+        File.set_cache_dir(os.path.join(directory, "cache"))
+        server = serve(directory)
+        try:
+            create_theme_archive(directory)
+            path = os.path.join(directory, "remote.ttkstyle")
+            with open(path, "w") as fo:
+                fo.write(REMOTE_STYLE.format("http://127.0.0.1:{}/dummy.zip".format(server.server_port)))
+
+            style = Style(self.window)
+            results = []
+            style.load_style_file_async(path, callback=results.append, placeholder="clam")
+            self.assertEqual(style.tk.call("ttk::style", "theme", "use"), "clam")
+            deadline = time.time() + 10
+            while len(results) == 0 and time.time() < deadline:
+                self.window.update()
+                time.sleep(0.01)
+
+            self.assertEqual(results, [None])
+            self.assertEqual(style.tk.call("ttk::style", "theme", "use"), "dummy")
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "blue")
+        finally:
+            server.shutdown()
+            File.CACHE_DIR = cache
+            shutil.rmtree(directory)
+
+    def test_preload_themes(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "themes.ttkstyle")
+            themes = [create_theme(directory, name).replace(os.sep, "/") for name in ("dummy", "other")]
+            with open(path, "w") as fo:
+                fo.write(THEMES_STYLE.format(*themes))
+            style = Style(self.window)
+            style.load_style_file(path)
+
+            results = []
+            style.preload_themes(callback=results.append, interval=10)
+            deadline = time.time() + 10
+            while len(results) == 0 and time.time() < deadline:
+                self.window.update()
+                time.sleep(0.01)
+            self.assertEqual(results, [None])
+            self.assertEqual(style.tk.call("ttk::style", "theme", "use"), "dummy")
+
+            style.load_theme = style._load_file = None  # Switching must not load anything
+            style.set_theme("other")
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "red")
+            self.assertEqual(style._grid_options["Heading.TLabel"], {"sticky": "we"})
+            style.set_theme("dummy")
+            self.assertEqual(style.lookup("Heading.TLabel", "foreground"), "blue")
+        finally:
+            shutil.rmtree(directory)
+
     def tearDown(self):
         self.window.destroy()
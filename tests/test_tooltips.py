@@ -3,12 +3,15 @@ Author: RedFantom
 License: GNU GPLv3
 Source: The ttkwidgets repository
 """
+import time
 from unittest import TestCase
 import tkinter as tk
 from tkinter import ttk
+from ttkstyles import hooks
 from ttkstyles.hooks import is_hooked
 # TODO: Adjust tests for different module
 from ttkstyles import tooltips
+from ttkstyles.widgets.tooltip import DynamicText, TooltipDispatcher, TooltipWindow
 
 
 class TestTooltipsModule(TestCase):
@@ -19,13 +22,8 @@ class TestTooltipsModule(TestCase):
         tooltip = "This is a great tooltip."
         widget = ttk.Button(text="Hello World", tooltip=tooltip)
 
-        # Check the holder existence
-        holder = getattr(widget, tooltips.NAME.lower(), None)
-        self.assertIsNotNone(holder)
-        self.assertTrue(hasattr(holder, "tooltip_widget"))
-
         # Check that the tooltip widget exists and is created with the given value
-        tooltip_widget = getattr(holder, "tooltip_widget", None)
+        tooltip_widget = tooltips.get_tooltip(widget)
         self.assertIsNotNone(tooltip_widget)
         self.assertEqual(tooltip_widget["text"], tooltip)
 
@@ -37,14 +35,132 @@ class TestTooltipsModule(TestCase):
 
         # Check that the tooltip is destroyed when configured with None
         widget["tooltip"] = None
-        tooltip_widget = getattr(holder, "tooltip_widget")
+        tooltip_widget = tooltips.get_tooltip(widget)
         self.assertIsNone(tooltip_widget)
 
         # Check that the tooltip is updated when its options are changed
         widget.configure(tooltip_options={"headertext": "header"}, tooltip=tooltip)
-        tooltip_widget = getattr(holder, "tooltip_widget", None)
+        tooltip_widget = tooltips.get_tooltip(widget)
         self.assertIsNotNone(tooltip_widget)
         self.assertEqual(tooltip_widget["headertext"], "header")
         self.assertEqual(tooltip_widget["text"], tooltip)
         self.assertEqual(widget["tooltip"], tooltip)
         self.assertEqual(widget["tooltip_options"], {"headertext": "header"})
+
+        # Check that the tooltip is forgotten when the widget is destroyed
+        widget.destroy()
+        self.assertIsNone(tooltips.get_tooltip(widget))
+        self.assertNotIn(widget, hooks._values["tooltip"])
+
+    def test_window_pool(self):
+        window = tk.Tk()
+        try:
+            first = ttk.Button(window, tooltip="First", tooltip_options={"wait": 0})
+            second = ttk.Button(window, tooltip="Second", tooltip_options={"wait": 0})
+            toplevels = len(window.winfo_children())
+            self.assertEqual(tooltips.get_tooltip(first)._wait, 0)
+            self.assertNotIn("wait", tooltips.get_tooltip(first).kwargs)
+
+            tooltips.get_tooltip(first)._showtip()
+            pool = TooltipWindow.get(window)
+            self.assertIs(pool.owner, tooltips.get_tooltip(first))
+            self.assertEqual(pool.label.cget("text"), "First")
+            tooltips.get_tooltip(first)._hidetip()
+            self.assertEqual(pool.toplevel.wm_state(), "withdrawn")
+
+            tooltips.get_tooltip(second)._showtip()
+            self.assertIs(TooltipWindow.get(second), pool)
+            self.assertEqual(pool.label.cget("text"), "Second")
+            self.assertEqual(len(window.winfo_children()), toplevels + 1)
+        finally:
+            window.destroy()
+
+    def test_options_merged(self):
+        window = tk.Tk()
+        try:
+            button = ttk.Button(window, tooltip="Tooltip", tooltip_options={"wait": 0})
+            button.configure(tooltip_options={"direction": "above"})
+            tooltip = tooltips.get_tooltip(button)
+            self.assertEqual((tooltip.cget("wait"), tooltip.cget("direction")), (0, "above"))
+            self.assertEqual(button.cget("tooltip_options"), {"direction": "above"})
+
+            # A new tooltip is created with all options given before
+            button.configure(tooltip=None)
+            button.configure(tooltip="Again")
+            tooltip = tooltips.get_tooltip(button)
+            self.assertEqual((tooltip.cget("wait"), tooltip.cget("direction")), (0, "above"))
+        finally:
+            window.destroy()
+
+    def test_dispatcher(self):
+        window = tk.Tk()
+        try:
+            button = ttk.Button(window)
+            button.bind("<Enter>", lambda event: None)
+            binding = button.bind("<Enter>")
+            button.configure(tooltip="Tooltip")
+            # The bindings of the widget are left alone
+            self.assertEqual(button.bind("<Enter>"), binding)
+            self.assertEqual(button.bind("<ButtonPress>"), "")
+            # The events are bound once for the class, after those of ttk
+            dispatcher = TooltipDispatcher.get(button)
+            ttk.Button(window, tooltip="Other")
+            for sequence, command in (("<Enter>", "<Enter>"), ("<Button-1>", "<ButtonPress>")):
+                script = window.bind_class("TButton", sequence)
+                self.assertEqual(script.count(dispatcher._commands[command]), 1)
+                self.assertFalse(script.startswith(dispatcher._commands[command]))
+            self.assertEqual(window.bind_class("all", "<Enter>"), "")
+            self.assertEqual(window.bind_class("TLabel", "<Enter>"), "")
+
+            tooltip = tooltips.get_tooltip(button)
+            self.assertIs(dispatcher.records[str(button)], tooltip)
+            dispatcher._enter(str(button))
+            self.assertIsNotNone(tooltip.id0)
+            dispatcher._leave(str(button))
+            self.assertIsNone(tooltip.id0)
+
+            button.configure(tooltip=None)
+            self.assertNotIn(str(button), dispatcher.records)
+            dispatcher._enter(str(button))
+            self.assertIsNone(tooltip.id0)
+        finally:
+            window.destroy()
+
+    def test_lazy_dynamic_text(self):
+        window = tk.Tk()
+        try:
+            calls = []
+
+            def text():
+                calls.append(None)
+                return "Call {}".format(len(calls))
+
+            button = ttk.Button(window, tooltip=text)
+            tooltip = tooltips.get_tooltip(button)
+            self.assertEqual(calls, [])
+
+            tooltip._showtip()
+            self.assertEqual(TooltipWindow.get(window).label.cget("text"), "Call 1")
+            tooltip._hidetip()
+            tooltip._showtip()
+            self.assertEqual(TooltipWindow.get(window).label.cget("text"), "Call 2")
+        finally:
+            window.destroy()
+
+    def test_dynamic_text(self):
+        calls = []
+
+        def text():
+            calls.append(None)
+            return str(len(calls))
+
+        self.assertEqual([DynamicText(text)() for _ in range(2)], ["1", "2"])
+        memoized = DynamicText(text, memoize=True)
+        self.assertEqual([memoized(), memoized()], ["3", "3"])
+        memoized.invalidate()
+        self.assertEqual(memoized(), "4")
+
+        expiring = DynamicText(text, ttl=0.05)
+        self.assertEqual([expiring(), expiring()], ["5", "5"])
+        time.sleep(0.1)
+        self.assertEqual(expiring(), "6")
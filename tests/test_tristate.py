@@ -0,0 +1,106 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import tkinter as tk
+from unittest import TestCase
+# Module Under Test
+from ttkstyles.widgets.tristate import TristateCheckbutton, TristateRadiobutton, TristateTree, TristateWidget
+
+
+State = TristateWidget.State
+
+
+class TestTristate(TestCase):
+    """Test the 'tristate.py' module"""
+
+    def setUp(self):
+        self.window = tk.Tk()
+
+    def test_states(self):
+        for cls in (TristateCheckbutton, TristateRadiobutton):
+            widget = cls(self.window)
+            self.assertEqual(widget.get(), State.NONE)
+            self.assertFalse(widget.instate(["alternate"]) or widget.instate(["selected"]))
+
+            widget.set(State.TRISTATE)
+            self.assertTrue(widget.instate(["alternate"]))
+            widget.set(State.SELECTED)
+            self.assertTrue(widget.instate(["selected", "!alternate"]))
+            widget.set(State.NONE)
+            self.assertTrue(widget.instate(["!selected", "!alternate"]))
+
+    def test_invoke(self):
+        invoked = []
+        for cls in (TristateCheckbutton, TristateRadiobutton):
+            widget = cls(self.window, command=lambda: invoked.append(None))
+            states = []
+            for _ in range(3):
+                widget.invoke()
+                states.append((widget.get(), widget.instate(["alternate"]), widget.instate(["selected"])))
+            self.assertEqual(states, [
+                (State.TRISTATE, True, False),
+                (State.SELECTED, False, True),
+                (State.NONE, False, False),
+            ])
+        self.assertEqual(len(invoked), 6)
+
+    def test_tree(self):
+        tree = TristateTree()
+        root = tree.add(TristateCheckbutton(self.window))
+        groups = [tree.add(TristateCheckbutton(self.window), root) for _ in range(3)]
+        leaves = [[tree.add(TristateCheckbutton(self.window), group) for _ in range(4)] for group in groups]
+        self.assertEqual(tree.children(root), groups)
+        self.assertIs(tree.parent(leaves[0][0]), groups[0])
+
+        leaves[0][0].invoke()
+        self.assertEqual(leaves[0][0].get(), State.SELECTED)
+        self.assertEqual((groups[0].get(), root.get()), (State.TRISTATE, State.TRISTATE))
+        self.assertTrue(root.instate(["alternate"]))
+
+        groups[0].invoke()
+        self.assertTrue(all(leaf.get() == State.SELECTED for leaf in leaves[0]))
+        self.assertTrue(leaves[0][3].instate(["selected"]))
+        self.assertEqual((groups[0].get(), root.get()), (State.SELECTED, State.TRISTATE))
+
+        tree.select(root)
+        self.assertTrue(all(leaf.get() == State.SELECTED for group in leaves for leaf in group))
+        self.assertTrue(root.instate(["selected", "!alternate"]))
+        root.invoke()
+        self.assertTrue(all(leaf.get() == State.NONE for group in leaves for leaf in group))
+        self.assertEqual(root.get(), State.NONE)
+
+        for leaf in leaves[2]:
+            tree.select(leaf)
+        self.assertEqual((groups[2].get(), root.get()), (State.SELECTED, State.TRISTATE))
+        tree.remove(groups[2])
+        self.assertEqual(root.get(), State.NONE)
+        self.assertIsNone(leaves[2][0]._controller)
+
+        # Setting a checkbutton updates the tree as invoking it does
+        leaves[0][1].set(State.SELECTED)
+        self.assertEqual((groups[0].get(), root.get()), (State.TRISTATE, State.TRISTATE))
+        self.assertEqual((tree._nodes[groups[0]].selected, tree._nodes[root].partial), (1, 1))
+        for leaf in leaves[0]:
+            leaf.set(State.SELECTED)
+        self.assertEqual((groups[0].get(), root.get()), (State.SELECTED, State.TRISTATE))
+        groups[0].set(State.NONE)
+        self.assertTrue(all(leaf.get() == State.NONE for leaf in leaves[0]))
+        self.assertEqual(root.get(), State.NONE)
+        self.assertRaises(ValueError, groups[0].set, State.TRISTATE)
+
+        # Destroyed checkbuttons are removed from the tree
+        tree.select(leaves[1][0])
+        self.assertEqual(groups[1].get(), State.TRISTATE)
+        leaves[1][0].destroy()
+        self.assertNotIn(leaves[1][0], tree._nodes)
+        self.assertEqual(tree.children(groups[1]), leaves[1][1:])
+        self.assertEqual((groups[1].get(), root.get()), (State.NONE, State.NONE))
+        groups[0].destroy()
+        self.assertEqual(tree.children(root), [groups[1]])
+        self.assertTrue(all(leaf not in tree._nodes for leaf in leaves[0]))
+
+    def tearDown(self):
+        self.window.destroy()
@@ -0,0 +1,289 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+from bisect import bisect_left
+import io
+import mmap
+import os
+import shutil
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import zipfile
+# Project Modules
+from ttkstyles.exceptions import TtkStyleException, TtkStyleFileUnavailable
+
+
+class _MappedFile(io.RawIOBase):
+    """Read-only file object for a memory-mapped file, as ZipFile requires"""
+
+    def __init__(self, mapping: mmap.mmap):
+        io.RawIOBase.__init__(self)
+        self._mapping = mapping
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mapping.read(size if size is not None and size >= 0 else None)
+
+    def readinto(self, buffer) -> int:
+        data = self._mapping.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mapping.seek(offset, whence)
+        return self._mapping.tell()
+
+    def tell(self) -> int:
+        return self._mapping.tell()
+
+
+class ArchiveIndex(object):
+    """
+    Index of the members of a ZIP-archive by their path
+
+    The archive is opened and its central directory read only once, after
+    which members are found by name in constant time and all members
+    under a folder by bisecting the sorted names. Folders need not have
+    an entry of their own in the archive. The archive file is memory
+    mapped, so members can be read without opening the file again.
+
+    Indices of archives that are served without extracting are shared by
+    path, see :meth:`get`, and are rebuilt when the archive file changes
+    on disk. An index that is only needed briefly, such as to extract
+    files, is created directly and used as a context manager, so that
+    the archive is not kept open.
+    """
+
+    _indices: Dict[str, "ArchiveIndex"] = {}
+    _indices_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stat = self._stat_file(path)
+        self._file = open(path, "rb")
+        try:
+            self._mapping = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped and are no archive
+            self._file.close()
+            raise zipfile.BadZipFile("File is not a zip file")
+        self.archive = zipfile.ZipFile(_MappedFile(self._mapping))
+        self.members: Dict[str, zipfile.ZipInfo] = {}
+        self._folders: Set[str] = set()
+        for info in self.archive.infolist():
+            name = info.filename.strip("/")
+            if not name:
+                continue
+            elif info.is_dir():
+                self._folders.add(name)
+            else:
+                self.members[name] = info
+        self.names: List[str] = sorted(self.members)
+
+    @classmethod
+    def get(cls, path: str) -> "ArchiveIndex":
+        """
+        Return the shared index of an archive file
+
+        An index that is replaced because the archive has changed is not
+        closed, as it may still be read by another thread, but left to
+        be closed once it is no longer referenced.
+        """
+        path = os.path.abspath(path)
+        with cls._indices_lock:
+            index = cls._indices.get(path, None)
+            if index is None or index._stat != cls._stat_file(path):
+                index = cls._indices[path] = cls(path)
+        return index
+
+    @classmethod
+    def discard(cls, path: str):
+        """
+        Close and forget the shared indices of the archives at or under a path
+
+        Must be called before an archive file is removed, as an archive
+        that is open cannot be removed on all platforms.
+        """
+        path = os.path.abspath(path)
+        prefix = os.path.join(path, "")
+        with cls._indices_lock:
+            for archive in [archive for archive in cls._indices if archive == path or archive.startswith(prefix)]:
+                cls._indices.pop(archive).close()
+
+    @staticmethod
+    def _stat_file(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def close(self):
+        self.archive.close()
+        self._mapping.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def is_dir(self, path: str) -> bool:
+        """Return whether a path is a folder in the archive"""
+        path = path.strip("/")
+        if path == "" or path in self._folders:
+            return True
+        prefix = path + "/"
+        i = bisect_left(self.names, prefix)
+        return i < len(self.names) and self.names[i].startswith(prefix)
+
+    def exists(self, path: str) -> bool:
+        return path.strip("/") in self.members or self.is_dir(path)
+
+    def under(self, path: str) -> Iterator[Tuple[str, zipfile.ZipInfo]]:
+        """Iterate over the files below a folder with their paths relative to it"""
+        path = path.strip("/")
+        prefix = path + "/" if path else ""
+        for i in range(bisect_left(self.names, prefix), len(self.names)):
+            name = self.names[i]
+            if not name.startswith(prefix):
+                break
+            yield name[len(prefix):], self.members[name]
+
+    def listdir(self, path: str) -> List[str]:
+        """Return the names of the files and folders directly in a folder"""
+        path = path.strip("/")
+        names = {relative.split("/", 1)[0] for relative, _ in self.under(path)}
+        prefix = path + "/" if path else ""
+        names.update(folder[len(prefix):].split("/", 1)[0] for folder in self._folders if folder.startswith(prefix))
+        return sorted(names)
+
+    def read(self, path: str) -> bytes:
+        """Return the contents of a file in the archive"""
+        info = self.info(path)
+        if info is None:
+            raise IsADirectoryError("'{}' is a folder in zipfile '{}'".format(path, self.path))
+        return self.archive.read(info)
+
+    def topmost_folder(self) -> str:
+        """Return the relative path in the archive to the topmost folder"""
+        folders = {name.split("/", 1)[0] for name in self.names if "/" in name}
+        if len(folders) != 1:
+            raise TtkStyleException("Could not find a unique topmost folder in zipfile '{}' while specified".format(
+                self.path))
+        return "{}/".format(folders.pop())
+
+    def info(self, path: str) -> Optional[zipfile.ZipInfo]:
+        """Return the member for a file, None for a folder"""
+        path = path.strip("/")
+        info = self.members.get(path, None)
+        if info is None and not self.is_dir(path):
+            raise TtkStyleFileUnavailable("Unable to find '{}' in specified ZIP file".format(path))
+        return info
+
+    def extract(self, path: str, target: str):
+        """
+        Extract a file or all files in a folder directly to target
+
+        Only the requested members are read, streamed from the archive
+        to their destination without intermediate copies.
+
+        :param path: Path of the file or folder in the archive
+        :param target: Path to extract the file or the folder to
+        """
+        info = self.info(path)
+        if info is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._copy(info, target)
+            return
+        os.makedirs(target, exist_ok=True)
+        for relative, info in self.under(path):
+            parts = relative.split("/")
+            if any(part in ("", ".", "..") for part in parts):
+                raise TtkStyleException("Unsafe path '{}' in zipfile '{}'".format(info.filename, self.path))
+            destination = os.path.join(target, *parts)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            self._copy(info, destination)
+
+    def _copy(self, info: zipfile.ZipInfo, destination: str):
+        with self.archive.open(info) as fi, open(destination, "wb") as fo:
+            shutil.copyfileobj(fi, fo, 1 << 20)
+
+
+def find_member(path: str) -> Optional[Tuple[ArchiveIndex, str]]:
+    """
+    Return the index of the archive a path points into and the path of the member
+
+    Paths into an archive are formed by joining the path to the archive
+    file with the path of a member, like ZippedFile does when it does not
+    extract. Only archives for which an index exists are considered.
+    """
+    path = os.path.normpath(path)
+    for archive, index in list(ArchiveIndex._indices.items()):
+        if path == archive or path.startswith(archive + os.sep):
+            return index, path[len(archive) + 1:].replace(os.sep, "/")
+    return None
+
+
+def isdir(path: str) -> bool:
+    """Return whether a path is a folder, in the file system or an archive"""
+    member = find_member(path)
+    if member is None:
+        return os.path.isdir(path)
+    index, path = member
+    return index.is_dir(path)
+
+
+def exists(path: str) -> bool:
+    """Return whether a path exists, in the file system or an archive"""
+    member = find_member(path)
+    if member is None:
+        return os.path.exists(path)
+    index, path = member
+    return index.exists(path)
+
+
+def listdir(path: str) -> List[str]:
+    """Return the contents of a folder, in the file system or an archive"""
+    member = find_member(path)
+    if member is None:
+        return os.listdir(path)
+    index, path = member
+    return index.listdir(path)
+
+
+# Files for members that must be passed to libraries by path
+_local_files: Dict[str, str] = {}
+
+
+def local_path(path: str) -> str:
+    """
+    Return a path in the file system for a path that may point into an archive
+
+    The contents of the member are written to an anonymous in-memory
+    file, never to disk. The file is kept for as long as the process
+    runs, as libraries such as fontconfig may read it lazily. Platforms
+    without anonymous files (``os.memfd_create``), such as Windows and
+    macOS, cannot pass members by path, in which case the archive must be
+    extracted.
+    """
+    member = find_member(path)
+    if member is None:
+        return path
+    local = _local_files.get(path, None)
+    if local is None:
+        if not hasattr(os, "memfd_create"):
+            raise TtkStyleException("'{}' must be read from a file, which requires the archive to be extracted "
+                                    "on this platform, see ZippedFile".format(path))
+        index, name = member
+        # The descriptor stays open, as the file exists only as long as it does
+        fd = os.memfd_create(os.path.basename(name))
+        with os.fdopen(fd, "wb", closefd=False) as fo:
+            fo.write(index.read(name))
+        local = _local_files[path] = "/proc/self/fd/{}".format(fd)
+    return local
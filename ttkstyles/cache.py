@@ -0,0 +1,363 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import atexit
+from contextlib import contextmanager, ExitStack
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Set
+# Project Modules
+from ttkstyles.archive import ArchiveIndex
+from ttkstyles.lock import FileLock
+from ttkstyles.logger import get_logger
+
+
+class Cache(object):
+    """
+    Content-addressed store for the files made available by File
+
+    Files and extracted folders are stored as blobs by the hash of their
+    content, in ``blobs/<hash>/<name>``, so identical archives are only
+    stored once, no matter by which style file or under which name they
+    were requested. A manifest maps the key of every File to its blob,
+    along with its source, size and the time it was last used.
+
+    The manifest of a cache directory is loaded once per process. When
+    the size of all blobs exceeds :attr:`max_size`, the blobs least
+    recently used are evicted, except for those of which the lock of a
+    key is held and those in use, by this or another process. A process
+    holds a shared lock on every blob it has used, see :meth:`lookup`.
+
+    Multiple processes may share a cache directory. A blob is populated
+    while holding the lock of its key, see :meth:`lock`, and only moved
+    into place once complete. The manifest is written under a lock of
+    its own and merged with the changes other processes have written.
+    """
+
+    MANIFEST = "manifest.json"
+    VERSION = 1
+    CHUNK = 1 << 20
+
+    _instances: Dict[str, "Cache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: str):
+        self.logger = get_logger(__class__.__name__)
+        self.directory = directory
+        self.max_size: Optional[int] = None
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        # Blobs that were used by this process and have been verified to exist, with their shared locks
+        self._used: Dict[str, FileLock] = {}
+        # Keys removed by this process since the manifest was last written
+        self._removed: Set[str] = set()
+        # Keys in the manifest when it was last read or written, and keys added since
+        self._known: Set[str] = set(self._entries)
+        self._added: Set[str] = set()
+        self._dirty = False
+        self._key_locks: Dict[str, threading.Lock] = {}
+        atexit.register(self.save)
+
+    @classmethod
+    def get(cls, directory: str) -> "Cache":
+        """Return the Cache for a cache directory"""
+        directory = os.path.abspath(directory)
+        with cls._instances_lock:
+            cache = cls._instances.get(directory, None)
+            if cache is None:
+                cache = cls._instances[directory] = cls(directory)
+        return cache
+
+    @property
+    def _manifest(self) -> str:
+        return os.path.join(self.directory, self.MANIFEST)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the entries from the manifest in the cache directory"""
+        try:
+            with open(self._manifest) as fi:
+                manifest = json.load(fi)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version", None) != self.VERSION:
+            return {}
+        return manifest["entries"]
+
+    def _lock_file(self, name: str, shared: bool = False) -> FileLock:
+        return FileLock(os.path.join(self.directory, "locks", "{}.lock".format(name)), shared)
+
+    def _used_lock(self, relative: str, shared: bool = True) -> FileLock:
+        """Return the lock that processes using a blob hold shared"""
+        return self._lock_file("used-{}".format(hashlib.sha1(relative.encode()).hexdigest()), shared)
+
+    def _use(self, relative: str):
+        """Mark a blob as used by this process, so that no process evicts it"""
+        lock = self._used_lock(relative)
+        lock.acquire()
+        self._used[relative] = lock
+
+    def _release(self):
+        """Release the blobs used by this process, so that they may be evicted"""
+        for lock in self._used.values():
+            lock.release()
+        self._used.clear()
+
+    def save(self):
+        """Write the manifest if it has changed, replacing it atomically"""
+        with self._lock:
+            if not self._dirty or not os.path.isdir(self.directory):
+                return
+            with self._lock_file("manifest"):
+                self._merge(self._load())
+                fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "w") as fo:
+                    json.dump({"version": self.VERSION, "entries": self._entries}, fo)
+                os.replace(temp, self._manifest)
+            self._known = set(self._entries)
+            self._added.clear()
+            self._removed.clear()
+            self._dirty = False
+
+    def refresh(self):
+        """Merge the entries other processes have written to the manifest"""
+        with self._lock:
+            self._merge(self._load())
+
+    def _merge(self, entries: Dict[str, Dict[str, Any]]):
+        """
+        Merge entries read from the manifest, keeping the most recently used entry of each key
+
+        Keys that have disappeared from the manifest since it was last
+        read or written were removed by another process, and are removed
+        here as well unless this process has added them since.
+        """
+        for key in self._known - set(entries) - self._added:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+        self._known = set(entries)
+        for key, entry in entries.items():
+            if key in self._removed:
+                continue
+            current = self._entries.get(key, None)
+            if current is None or current["used"] < entry["used"] and current["path"] != entry["path"]:
+                self._entries[key] = entry
+            elif current["used"] < entry["used"]:
+                current["used"] = entry["used"]
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Hold the lock to populate the blob of a key
+
+        The lock excludes other threads as well as other processes, which
+        block until the lock is released. The manifest is refreshed once
+        the lock is acquired, so that a blob populated by another process
+        in the meantime is found with :meth:`lookup`.
+        """
+        with self._lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock, self._lock_file(hashlib.sha1(key.encode()).hexdigest()):
+            self.refresh()
+            yield
+
+    def blob(self, digest: str, name: str) -> str:
+        """Return the absolute path to a blob"""
+        return os.path.join(self.directory, "blobs", digest, name)
+
+    def entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the manifest entry for a key"""
+        return self._entries.get(key, None)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Return the absolute path to the blob for a key, if it is cached
+
+        The existence of a blob is only checked the first time it is used
+        by this process, after which the blob is kept from eviction for
+        as long as the process runs. The time of last use is written to
+        the manifest along with the next change or when the process exits.
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry["path"])
+            if entry["path"] not in self._used:
+                # Marked before checking, so that the blob cannot be evicted in between
+                self._use(entry["path"])
+                if not os.path.exists(path):
+                    self._used.pop(entry["path"]).release()
+                    self.logger.debug("Blob for '{}' has disappeared".format(key))
+                    del self._entries[key]
+                    self._removed.add(key)
+                    self._dirty = True
+                    return None
+            entry["used"] = time.time()
+            self._dirty = True
+        return path
+
+    def add(self, key: str, digest: str, name: str, source: str, **meta) -> str:
+        """
+        Record the existing blob for a key and return its path
+
+        A blob the key referred to before is kept for eviction, as it may
+        still be in use, unless other keys refer to it.
+
+        :param meta: Additional values to store in the entry
+        """
+        path = self.blob(digest, name)
+        relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        with self._lock:
+            previous = self._entries.get(key, None)
+            self._entries[key] = dict(
+                meta, hash=digest, path=relative, source=source, size=self._size(path), used=time.time())
+            self._added.add(key)
+            if previous is not None and previous["path"] != relative and \
+                    all(entry["path"] != previous["path"] for entry in self._entries.values()):
+                self._entries["replaced:{}".format(previous["path"])] = previous
+                self._added.add("replaced:{}".format(previous["path"]))
+            if relative not in self._used:
+                self._use(relative)
+            self._dirty = True
+            self._evict()
+            self.save()
+        return path
+
+    def store(self, key: str, path: str, name: str, source: str, digest: str = None, **meta) -> str:
+        """
+        Move a file or folder into the cache and return the path of its blob
+
+        :param key: Key the blob is looked up with
+        :param path: File or folder to move, removed if the blob exists
+        :param name: Base name of the blob
+        :param source: Description of the origin, a URL or archive
+        :param digest: Hash identifying the content, the hash of the
+            file at path if not given
+        :param meta: Additional values to store in the entry
+        """
+        if digest is None:
+            digest = self.digest_file(path)
+        target = self.blob(digest, name)
+        if os.path.exists(target):
+            (shutil.rmtree if os.path.isdir(path) else os.remove)(path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.replace(path, target)
+            except OSError:
+                # Identical content may have been stored under another key
+                if not os.path.exists(target):
+                    raise
+                (shutil.rmtree if os.path.isdir(path) else os.remove)(path)
+        return self.add(key, digest, name, source, **meta)
+
+    def evict(self, max_size: int = None):
+        """Evict the blobs least recently used until the size fits"""
+        with self._lock:
+            self._evict(max_size)
+            self.save()
+
+    def _evict(self, max_size: int = None):
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return
+        blobs: Dict[str, Dict[str, Any]] = {}
+        for entry in self._entries.values():
+            blob = blobs.setdefault(entry["path"], {"size": entry["size"], "used": 0.0})
+            blob["used"] = max(blob["used"], entry["used"])
+        total = sum(blob["size"] for blob in blobs.values())
+        for path, blob in sorted(blobs.items(), key=lambda item: item[1]["used"]):
+            if total <= max_size:
+                break
+            if path in self._used:
+                continue
+            keys = [key for key, entry in self._entries.items() if entry["path"] == path]
+            with ExitStack() as stack:
+                # Blocking could deadlock with a thread that holds a key lock and waits for this one
+                if not all(self._try_lock(stack, key) for key in keys) or \
+                        not self._try_acquire(stack, self._used_lock(path, shared=False)):
+                    self.logger.debug("Not evicting '{}' from the cache, it is locked".format(path))
+                    continue
+                self.logger.debug("Evicting '{}' from the cache".format(path))
+                self._remove(path)
+            total -= blob["size"]
+
+    def _try_lock(self, stack: ExitStack, key: str) -> bool:
+        """Acquire the lock of a key without blocking, released when the stack exits"""
+        lock = self._key_locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return False
+        stack.callback(lock.release)
+        return self._try_acquire(stack, self._lock_file(hashlib.sha1(key.encode()).hexdigest()))
+
+    @staticmethod
+    def _try_acquire(stack: ExitStack, lock: FileLock) -> bool:
+        """Acquire a file lock without blocking, released when the stack exits"""
+        if not lock.acquire(blocking=False):
+            return False
+        stack.callback(lock.release)
+        return True
+
+    def _remove(self, relative: str):
+        """Remove a blob and all entries that refer to it"""
+        path = os.path.join(self.directory, relative)
+        ArchiveIndex.discard(path)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        if os.path.isdir(os.path.dirname(path)) and len(os.listdir(os.path.dirname(path))) == 0:
+            os.rmdir(os.path.dirname(path))
+        for key in [key for key, entry in self._entries.items() if entry["path"] == relative]:
+            del self._entries[key]
+            self._removed.add(key)
+        self._dirty = True
+
+    def clear(self):
+        """Remove all contents of the cache directory"""
+        with self._lock:
+            ArchiveIndex.discard(self.directory)
+            self._release()
+            if os.path.exists(self.directory):
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    (shutil.rmtree if os.path.isdir(path) else os.remove)(path)
+            self._entries.clear()
+            self._removed.clear()
+            self._known.clear()
+            self._added.clear()
+            self._dirty = False
+
+    @property
+    def size(self) -> int:
+        """Return the total size of all blobs in bytes"""
+        return sum({entry["path"]: entry["size"] for entry in self._entries.values()}.values())
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Return the hash of data"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def digest_file(path: str) -> str:
+        """Return the hash of the contents of a file"""
+        hash = hashlib.sha256()
+        with open(path, "rb") as fi:
+            for chunk in iter(lambda: fi.read(Cache.CHUNK), b""):
+                hash.update(chunk)
+        return hash.hexdigest()
+
+    @staticmethod
+    def _size(path: str) -> int:
+        """Return the size of a file or of all files in a folder"""
+        if not os.path.isdir(path):
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(dir, f)) for dir, _, files in os.walk(path) for f in files)
@@ -0,0 +1,127 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import tkinter as tk
+from typing import Dict, FrozenSet, Iterable, List, Optional
+import weakref
+# Project Modules
+from .lookup import LookupCache
+
+
+# Layouts that a theme may provide for the extra widgets, in order of preference
+EXTRAS: Dict[str, List[str]] = {
+    "ToggleButton": ["ToggleButton", "Togglebutton", "Toggle"],
+    "SwitchButton": ["Switch", "SwitchButton", "Switchbutton", "ToggleButton", "Togglebutton", "Toggle"],
+    "ToolTip": ["ToolTip", "Tooltip", "Tip", "Balloon"],
+}
+
+# Return the given layouts that exist and all element names of a theme
+PROBE = """
+proc ::ttkstyles::probe {theme layouts} {
+    set found [list]
+    ttk::style theme settings $theme {
+        foreach layout $layouts {
+            if {![catch {ttk::style layout $layout}]} {
+                lappend found $layout
+            }
+        }
+        set elements [ttk::style element names]
+    }
+    return [list $found $elements]
+}
+"""
+
+
+class ThemeCapabilities(object):
+    """
+    Layouts and elements provided by a single theme
+
+    All the layouts of the extra widgets and the element names are
+    probed in a single Tcl evaluation, without changing the theme in
+    use. Other layouts are probed when they are first requested.
+    """
+
+    def __init__(self, tkinterp, theme: str):
+        self._tk = tkinterp
+        self.theme = theme
+        candidates = sorted({layout for layouts in EXTRAS.values() for layout in layouts})
+        found, elements = self._probe(candidates)
+        self._layouts: Dict[str, bool] = {layout: layout in found for layout in candidates}
+        self.elements: FrozenSet[str] = frozenset(elements)
+
+    def _probe(self, layouts: List[str]):
+        if not self._tk.call("info", "commands", "::ttkstyles::probe"):
+            self._tk.eval("namespace eval ::ttkstyles {}")
+            self._tk.eval(PROBE)
+        found, elements = self._tk.splitlist(self._tk.call("::ttkstyles::probe", self.theme, layouts))
+        return set(map(str, self._tk.splitlist(found))), tuple(map(str, self._tk.splitlist(elements)))
+
+    def has_layout(self, layout: str) -> bool:
+        """Return whether the theme provides a layout"""
+        exists = self._layouts.get(layout, None)
+        if exists is None:
+            exists = self._layouts[layout] = layout in self._probe([layout])[0]
+        return exists
+
+    def first_layout(self, layouts: Iterable[str]) -> Optional[str]:
+        """Return the first of the given layouts the theme provides"""
+        for layout in layouts:
+            if self.has_layout(layout):
+                return layout
+        return None
+
+    @property
+    def extras(self) -> List[str]:
+        """Return the names of the extra widgets supported by the theme"""
+        return [name for name, layouts in EXTRAS.items() if self.first_layout(layouts) is not None]
+
+
+class Capabilities(object):
+    """
+    Index of the capabilities of the themes of a Tk instance
+
+    The capabilities of a theme are determined once and reused until
+    the cache of the Tk instance is invalidated, which happens on any
+    ``<<ThemeChanged>>`` event and whenever :class:`ttkstyles.Style`
+    changes the style settings.
+    """
+
+    _indices = weakref.WeakKeyDictionary()
+
+    def __init__(self, root: tk.Tk):
+        self._tk = root.tk
+        self._themes: Dict[str, ThemeCapabilities] = {}
+        self._theme = None
+        LookupCache.get(root).add_listener(self.invalidate)
+
+    @classmethod
+    def get(cls, widget: tk.Misc) -> "Capabilities":
+        """Return the Capabilities for the Tk instance of a widget"""
+        root = widget._root()
+        index = cls._indices.get(root, None)
+        if index is None:
+            index = cls._indices[root] = cls(root)
+        return index
+
+    def theme(self, name: str = None) -> ThemeCapabilities:
+        """Return the capabilities of a theme, by default the theme in use"""
+        if name is None:
+            if self._theme is None:
+                self._theme = self._tk.call("ttk::style", "theme", "use")
+            name = self._theme
+        capabilities = self._themes.get(name, None)
+        if capabilities is None:
+            capabilities = self._themes[name] = ThemeCapabilities(self._tk, name)
+        return capabilities
+
+    def first_layout(self, layouts: Iterable[str]) -> Optional[str]:
+        """Return the first of the given layouts the theme in use provides"""
+        return self.theme().first_layout(layouts)
+
+    def invalidate(self):
+        """Discard the capabilities of all themes"""
+        self._themes.clear()
+        self._theme = None
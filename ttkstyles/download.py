@@ -0,0 +1,282 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+import http.client
+import json
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+# Project Modules
+from ttkstyles.exceptions import TtkStyleFileUnavailable
+from ttkstyles.logger import get_logger
+
+
+# Validators of a response, the ETag and Last-Modified headers
+Validators = Dict[str, Optional[str]]
+
+
+class Downloader(object):
+    """
+    Download engine shared by all RemoteFiles of a process
+
+    Connections are kept alive and reused for subsequent requests to the
+    same host, up to :attr:`MAX_CONNECTIONS` idle connections per host.
+    Downloads are written to a ``.part`` file next to their destination,
+    which is renamed into place only once complete. An interrupted
+    download is resumed with a Range request, as long as the server
+    reports that the file is unchanged. Files that are available already
+    are revalidated with their ETag or Last-Modified date, rather than
+    downloaded again.
+    """
+
+    TIMEOUT = 30
+    MAX_CONNECTIONS = 4
+    MAX_REDIRECTS = 10
+    MAX_WORKERS = 8
+    CHUNK = 1 << 16
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, timeout: float = TIMEOUT, max_workers: int = MAX_WORKERS):
+        self.logger = get_logger(__class__.__name__)
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._idle_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ttkstyles-download")
+        # Prefetches run in a daemon thread of their own, which does not delay the exit of the process
+        self._prefetches: "queue.Queue[Tuple[Future, Callable, tuple]]" = queue.Queue()
+        self._prefetcher: Optional[threading.Thread] = None
+        self._prefetcher_lock = threading.Lock()
+        # Number of connections opened, for inspection of the reuse
+        self.connections = 0
+        atexit.register(self.close)
+
+    @classmethod
+    def get(cls) -> "Downloader":
+        """Return the Downloader of this process"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Run a function in the pool of download threads"""
+        return self._executor.submit(func, *args)
+
+    def prefetch(self, func: Callable, *args) -> Future:
+        """
+        Run a function in the background without waiting for it
+
+        Prefetches run one after the other in a daemon thread, so that
+        the process may exit while they are pending or in progress. An
+        exception raised by the function is logged rather than raised.
+        Prefetches that have not started are cancelled by :meth:`close`.
+        """
+        future = Future()
+        future.add_done_callback(self._prefetched)
+        self._prefetches.put((future, func, args))
+        with self._prefetcher_lock:
+            if self._prefetcher is None:
+                self._prefetcher = threading.Thread(target=self._prefetch, name="ttkstyles-prefetch", daemon=True)
+                self._prefetcher.start()
+        return future
+
+    def _prefetch(self):
+        """Run the prefetches in the order they were submitted"""
+        while True:
+            future, func, args = self._prefetches.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _prefetched(self, future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.warning("Prefetch failed: {}".format(future.exception()))
+
+    def cancel_prefetches(self):
+        """Cancel the prefetches that have not started yet"""
+        while True:
+            try:
+                future, _, _ = self._prefetches.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    def fetch(self, url: str, destination: str, validators: Validators = None) -> Optional[Validators]:
+        """
+        Download a file to destination, resuming a partial download
+
+        :param url: URL of the file, which may redirect elsewhere
+        :param destination: Path to write the file to, atomically
+        :param validators: Validators of an earlier download of the file,
+            to only download the file if it has changed since
+        :return: Validators of the downloaded file or None if the file
+            has not changed since it was downloaded with validators
+        """
+        part, meta = destination + ".part", destination + ".part.json"
+        headers = {"Accept-Encoding": "identity", "User-Agent": "ttkstyles"}
+        offset, resume = 0, self._load_validators(meta) if os.path.exists(part) else None
+        condition = self._condition(resume) if resume is not None else None
+        if condition is not None:
+            offset = os.path.getsize(part)
+            headers.update({"Range": "bytes={}-".format(offset), "If-Range": condition})
+        elif validators is not None:
+            if validators.get("etag", None):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified", None):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        host, connection, response = self._request(url, headers)
+        try:
+            if response.status == http.client.NOT_MODIFIED and validators is not None:
+                response.read()
+                mode = None
+            elif response.status == http.client.PARTIAL_CONTENT and offset != 0 and \
+                    self._range_start(response) == offset:
+                self.logger.debug("Resuming download of '{}' at {} bytes".format(url, offset))
+                mode = "ab"
+            elif response.status == http.client.OK:
+                mode = "wb"
+            elif offset != 0 and response.status in (
+                    http.client.PARTIAL_CONTENT, http.client.REQUESTED_RANGE_NOT_SATISFIABLE):
+                # The partial download cannot be resumed, so start over
+                response.read()
+                os.remove(part)
+                mode = None
+            else:
+                response.read()
+                raise TtkStyleFileUnavailable("Downloading '{}' failed with HTTP status {}".format(
+                    url, response.status))
+
+            if mode is not None:
+                received = {"etag": response.getheader("ETag"), "last_modified": response.getheader("Last-Modified")}
+                os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+                with open(meta, "w") as fo:
+                    json.dump(received, fo)
+                with open(part, mode) as fo:
+                    for chunk in iter(lambda: response.read(self.CHUNK), b""):
+                        fo.write(chunk)
+                # Reading in chunks stops at a closed connection without error
+                if response.length:
+                    raise http.client.IncompleteRead(b"", response.length)
+        except BaseException:
+            connection.close()
+            raise
+        self._release(host, connection, response)
+        if mode is None:
+            return None if response.status == http.client.NOT_MODIFIED else self.fetch(url, destination, validators)
+
+        os.replace(part, destination)
+        os.remove(meta)
+        return received
+
+    def _request(self, url: str, headers: Dict[str, str]):
+        """Send a GET request, following redirects, and return the response"""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            host, connection, response = self._send(url, headers)
+            if response.status not in (301, 302, 303, 307, 308):
+                return host, connection, response
+            location = response.getheader("Location")
+            response.read()
+            self._release(host, connection, response)
+            if location is None:
+                raise TtkStyleFileUnavailable("Redirect without location for '{}'".format(url))
+            url = urljoin(url, location)
+        raise TtkStyleFileUnavailable("Too many redirects while downloading '{}'".format(url))
+
+    def _send(self, url: str, headers: Dict[str, str]):
+        """Send a request on a pooled connection, retrying once on a connection that was closed"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise TtkStyleFileUnavailable("Unsupported URL scheme for '{}'".format(url))
+        host = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = "{}{}".format(parts.path or "/", "?" + parts.query if parts.query else "")
+        proxy = getproxies().get(parts.scheme, None) if not proxy_bypass(parts.hostname) else None
+        if proxy is not None and parts.scheme == "http":
+            target = url  # Plain HTTP proxies take the full URL
+        while True:
+            connection, reused = self._acquire(host, proxy)
+            try:
+                connection.request("GET", target, headers=headers)
+                return host, connection, connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                # Idle connections may have been closed by the server
+                if not reused:
+                    raise
+
+    def _acquire(self, host: Tuple[str, str, int], proxy: Optional[str]) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection to a host or a new one, and whether it is reused"""
+        with self._idle_lock:
+            idle = self._idle.get(host, [])
+            if len(idle) != 0:
+                return idle.pop(), True
+            self.connections += 1
+        scheme, hostname, port = host
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if proxy is None:
+            return cls(hostname, port, timeout=self.timeout), False
+        proxy = urlsplit(proxy)
+        connection = cls(proxy.hostname, proxy.port, timeout=self.timeout)
+        if scheme == "https":
+            connection.set_tunnel(hostname, port)
+        return connection, False
+
+    def _release(self, host: Tuple[str, str, int], connection: http.client.HTTPConnection,
+                 response: http.client.HTTPResponse):
+        """Return a connection to the pool if it can be reused"""
+        if response.will_close:
+            connection.close()
+            return
+        with self._idle_lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self.MAX_CONNECTIONS:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Cancel the pending prefetches and close all idle connections"""
+        self.cancel_prefetches()
+        with self._idle_lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+    @staticmethod
+    def _condition(validators: Validators) -> Optional[str]:
+        """Return the value for If-Range, which requires a strong ETag or a date"""
+        etag = validators.get("etag", None)
+        if etag is not None and not etag.startswith("W/"):
+            return etag
+        return validators.get("last_modified", None)
+
+    @staticmethod
+    def _range_start(response: http.client.HTTPResponse) -> Optional[int]:
+        """Return the first byte of the range in a partial response"""
+        content_range = response.getheader("Content-Range", "")
+        try:
+            return int(content_range.split(" ", 1)[1].split("-", 1)[0])
+        except (IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def _load_validators(path: str) -> Optional[Validators]:
+        try:
+            with open(path) as fi:
+                return json.load(fi)
+        except (OSError, ValueError):
+            return None
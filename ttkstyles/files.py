@@ -4,30 +4,45 @@ License: GNU GPLv3
 Copyright (c) 2020 RedFantom
 """
 # Standard Library
+import hashlib
+import http.client
 import os
 import shutil
 import site
 import tempfile
-from urllib.request import urlretrieve
-import zipfile
+from typing import Dict, Optional, Set
 # Packages
 import appdirs
 # Project Modules
-from ttkstyles.exceptions import TtkStyleFileUnavailable, TtkStyleException
+from ttkstyles.archive import ArchiveIndex, exists
+from ttkstyles.cache import Cache
+from ttkstyles.download import Downloader
+from ttkstyles.exceptions import TtkStyleException, TtkStyleFileUnavailable
 from ttkstyles.logger import get_logger
 
 
 class File(object):
     CACHE_DIR = None
+    # Maximum size of the cache in bytes, None for no limit
+    CACHE_SIZE = None
 
     def __init__(self, path: str):
         self.logger = get_logger(__class__.__name__)
         self._path = path
 
-    def _make_available(self):
+    def _make_available(self) -> str:
         """Make the file available and return an absolute path"""
         raise NotImplementedError()
 
+    @property
+    def _key(self) -> Optional[str]:
+        """Return the key of the file in the cache, None if it is not cached"""
+        return None
+
+    def _revalidate(self, path: str) -> str:
+        """Return the path to a cached file, updating the file if it has changed"""
+        return path
+
     @property
     def abspath(self) -> str:
         """
@@ -41,32 +56,34 @@ class File(object):
         result in the file cache to ensure that IO operations that take
         too much time are only executed once.
         """
-        if os.path.exists(self._path):
+        key = self._key
+        if key is not None:
+            path = self._cache_index.lookup(key)
+            if path is not None:
+                self.logger.debug("Found cached file '{}'".format(self._path))
+                return self._revalidate(path)
+        if exists(self._path):
             self.logger.debug("Valid path to file '{}'".format(self._path))
             return os.path.abspath(self._path)
-        elif os.path.exists(self._target):
-            self.logger.debug("Found cached file '{}'".format(self._path))
-            return self._target
-        else:
-            self.logger.debug("Did not find file '{}', making available".format(self._path))
-            self._make_available()
-        return self._target
-
-    @property
-    def _target(self) -> str:
-        """Return the path any File subclass should make the file available to"""
-        return os.path.join(self._cache, self._path)
+        self.logger.debug("Did not find file '{}', making available".format(self._path))
+        return self._make_available()
 
     @property
     def _cache(self) -> str:
         """Return a path to the folder in which files should be cached"""
         return self.CACHE_DIR or appdirs.user_cache_dir("ttkstyles", "TkinterEP")
 
+    @property
+    def _cache_index(self) -> Cache:
+        """Return the Cache for the cache directory"""
+        cache = Cache.get(self._cache)
+        cache.max_size = File.CACHE_SIZE
+        return cache
+
     @staticmethod
     def clear_cache():
         """Clear the file cache"""
-        for p in os.listdir(File(None)._cache):
-            shutil.rmtree(p)
+        File(None)._cache_index.clear()
 
     @staticmethod
     def set_cache_dir(path: str):
@@ -75,6 +92,19 @@ class File(object):
             os.makedirs(path, exist_ok=True)
         File.CACHE_DIR = path
 
+    @staticmethod
+    def set_cache_size(size: Optional[int]):
+        """
+        Limit the size of the cache directory
+
+        When the files in the cache exceed the given size, the files
+        least recently used are removed from the cache.
+
+        :param size: Maximum size in bytes, None for no limit
+        """
+        File.CACHE_SIZE = size
+        File(None)._cache_index.evict()
+
 
 class SitePackage(File):
     """Class to handle a file found in a Python site package"""
@@ -95,12 +125,26 @@ class SitePackage(File):
                     return f
         raise TtkStyleFileUnavailable("Could not find '{}' for package '{}'".format(file_name, package))
 
-    def _make_available(self):
-        pass
+    def _make_available(self) -> str:
+        return os.path.abspath(self._path)
 
 
 class RemoteFile(File):
-    """Class to handle a remote file"""
+    """
+    Class to handle a remote file
+
+    Files are downloaded by the :class:`ttkstyles.download.Downloader`
+    of the process, only once, even when requested by multiple threads
+    or processes at the same time. If :attr:`REVALIDATE` is set, files cached by an
+    earlier process are revalidated with the server once per process
+    and only downloaded again if they have changed.
+    """
+
+    # Whether to check cached files for changes once per process
+    REVALIDATE = False
+
+    # Keys of the files revalidated by this process
+    _revalidated: Set[str] = set()
 
     def __init__(self, file_name: str, url: str):
         """
@@ -110,75 +154,154 @@ class RemoteFile(File):
         File.__init__(self, file_name)
         self._url = url
 
-    def _make_available(self):
-        """Download the file to the cache directory"""
-        if not os.path.exists(os.path.dirname(self._target)):
-            os.makedirs(os.path.dirname(self._target), exist_ok=True)
-        urlretrieve(self._url, self._target)
+    @property
+    def _key(self) -> str:
+        return "url:{}".format(self._url)
+
+    @property
+    def _download(self) -> str:
+        """Return the path to download the file to before it is stored"""
+        return os.path.join(self._cache, "downloads", hashlib.sha1(self._url.encode()).hexdigest())
+
+    def _make_available(self) -> str:
+        """Download the file into the cache"""
+        with self._cache_index.lock(self._key):
+            # The file may have been downloaded by another thread or process meanwhile
+            path = self._cache_index.lookup(self._key)
+            if path is not None:
+                return path
+            return self._fetch()
+
+    def _fetch(self, validators: Dict[str, Optional[str]] = None) -> Optional[str]:
+        """Download the file and store it, unless it has not changed since validators"""
+        received = Downloader.get().fetch(self._url, self._download, validators)
+        if received is None:
+            return None
+        return self._cache_index.store(self._key, self._download, os.path.basename(self._path), self._url, **received)
+
+    def _revalidate(self, path: str) -> str:
+        """Download the file again if it has changed since it was cached"""
+        if not self.REVALIDATE or self._key in RemoteFile._revalidated:
+            return path
+        with self._cache_index.lock(self._key):
+            if self._key in RemoteFile._revalidated:
+                return self._cache_index.lookup(self._key) or path
+            RemoteFile._revalidated.add(self._key)
+            entry = self._cache_index.entry(self._key) or {}
+            validators = {"etag": entry.get("etag", None), "last_modified": entry.get("last_modified", None)}
+            try:
+                return self._fetch(validators) or path
+            except (OSError, http.client.HTTPException, TtkStyleException) as e:
+                self.logger.warning("Could not revalidate '{}', using cached file: {}".format(self._url, e))
+                return path
 
 
 class ZippedFile(File):
-    """Handle a file that is a ZIP-archive file"""
-    def __init__(self, path: str, archive: File, root=True):
+    """
+    Handle a file that is a ZIP-archive file
+
+    By default, the file is extracted into the cache. Otherwise, the file
+    is served straight from the archive: Its path is then the path to the
+    archive joined with the path of the file within it, which the theme
+    loaders and :meth:`ttkstyles.Style.load_font` read from the archive.
+    """
+
+    # Whether files are extracted if not specified for a file
+    EXTRACT = True
+
+    def __init__(self, path: str, archive: File, root=True, extract: bool = None):
         """
         :param path: Path to the file within the archive
         :param archive: File for the ZIP-archive the file is contained in
         :param root: Whether the path to the file is from root or a topmost folder
+        :param extract: Whether to extract the file to the cache or to
+            serve it from the archive, defaults to :attr:`EXTRACT`
         """
         File.__init__(self, path)
         self._archive = archive
         self._root = root
+        self._extract = extract
 
-    def _make_available(self):
-        """Extract the requested file from the given archive File"""
-        archive = self._archive.abspath
-        with zipfile.ZipFile(archive) as fi:
-            if self._root is False:
-                path = "{}{}".format(self._find_topmost_folder(fi), self._path)
-            else:
-                path = self._path
-            if path != "all":
-                f = self._find_file_in_zip(fi, path)
-                self._extract(fi, f, self._target)
-            else:
-                fi.extractall(self._target)
-
-    @staticmethod
-    def _extract(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: str):
-        """Extract file or folder specified by 'info' recursively to 'target'"""
-        if info.is_dir():
-            extract_to = os.path.join(tempfile.gettempdir(), os.path.basename(archive.filename))
-            archive.extractall(extract_to)
-            path = os.path.join(extract_to, info.orig_filename)
-            os.makedirs(os.path.dirname(target), exist_ok=True)
-            shutil.copytree(path, target, dirs_exist_ok=True)
-            shutil.rmtree(path)
-        else:
-            archive.extract(info, target)
+    @property
+    def extracted(self) -> bool:
+        """Return whether the file is extracted rather than served from the archive"""
+        return self._extract if self._extract is not None else ZippedFile.EXTRACT
 
-    @staticmethod
-    def _find_file_in_zip(archive: zipfile.ZipFile, path: str) -> zipfile.ZipInfo:
-        path = path.strip("/")
-        for f in archive.filelist:
-            if f.orig_filename.strip("/") == path:
-                return f
-        raise TtkStyleFileUnavailable("Unable to find '{}' in specified ZIP file".format(path))
+    @property
+    def _archive_key(self) -> str:
+        """Return the key of the archive, by its path and modification if it is not cached"""
+        key = self._archive._key
+        if key is not None:
+            return key
+        path = os.path.abspath(self._archive.abspath)
+        stat = os.stat(path)
+        return "file:{}:{}:{}".format(path, stat.st_mtime_ns, stat.st_size)
 
-    @staticmethod
-    def _find_topmost_folder(archive: zipfile.ZipFile) -> str:
-        """Return the relative path in the zipfile to the topmost folder"""
-        folders = list(filter(lambda x: x.endswith("/") and x.count("/") == 1, archive.namelist()))
-        if len(folders) != 1:
-            raise TtkStyleException("Could not find a unique topmost folder in zipfile '{}' while specified".format(archive))
-        return folders[0]
+    @property
+    def _key(self) -> Optional[str]:
+        if not self.extracted:
+            return None
+        return "zip:{}!{}:{}".format(self._archive_key, self._path, self._root)
+
+    def _revalidate(self, path: str) -> str:
+        """Extract the file again if the remote archive it was extracted from has changed"""
+        if not isinstance(self._archive, RemoteFile) or not self._archive.REVALIDATE:
+            return path
+        self._archive.abspath  # Revalidates the archive
+        archive, entry = self._cache_index.entry(self._archive_key), self._cache_index.entry(self._key)
+        if archive is not None and entry is not None and entry.get("archive", None) != archive["hash"]:
+            return self._make_available()
+        return path
+
+    def _member(self, index: ArchiveIndex) -> str:
+        """Return the path of the file within the archive"""
+        path = self._path if self._path != "all" else ""
+        if self._root is False:
+            path = "{}{}".format(index.topmost_folder(), path)
+        return path.strip("/")
+
+    def _make_available(self) -> str:
+        """Extract the requested file from the given archive File into the cache"""
+        archive = self._archive.abspath
+        if not self.extracted:
+            index = ArchiveIndex.get(archive)
+            path = self._member(index)
+            index.info(path)  # Raises if the file does not exist
+            return os.path.join(index.path, *path.split("/")) if path else index.path
+        cache = self._cache_index
+        entry = cache.entry(self._archive_key)
+        # Extracted contents are identified by the contents of the archive
+        source = entry["hash"] if entry is not None else Cache.digest_file(archive)
+        digest = Cache.digest("{}!{}:{}".format(source, self._path, self._root).encode())
+        name = os.path.basename(self._path.strip("/")) or os.path.basename(archive)
+        with cache.lock(self._key):
+            # The file may have been extracted by another thread or process meanwhile
+            entry = cache.entry(self._key)
+            path = cache.lookup(self._key) if entry is not None and entry.get("archive", None) == source else None
+            if path is not None:
+                return path
+            if os.path.exists(cache.blob(digest, name)):
+                return cache.add(self._key, digest, name, archive, archive=source)
+
+            # Files are extracted to a temporary folder and moved into place
+            # once complete, so that they are never seen partially extracted
+            os.makedirs(self._cache, exist_ok=True)
+            temp = tempfile.mkdtemp(dir=self._cache, suffix=".extract")
+            try:
+                target = os.path.join(temp, name)
+                with ArchiveIndex(archive) as index:
+                    index.extract(self._member(index), target)
+                return cache.store(self._key, target, name, archive, digest, archive=source)
+            finally:
+                shutil.rmtree(temp, ignore_errors=True)
 
 
 class RemoteZippedFile(ZippedFile):
     """Handle a file that is in a remote ZIP-archive file"""
-    def __init__(self, path: str, url: str, name: str=None, root=True):
+    def __init__(self, path: str, url: str, name: str=None, root=True, extract: bool = None):
         if name is None:
             name = url.split("/")[-1]
-        ZippedFile.__init__(self, path, RemoteFile(name, url), root)
+        ZippedFile.__init__(self, path, RemoteFile(name, url), root, extract)
 
 
 class GitHubRepoFile(RemoteZippedFile):
@@ -188,16 +311,22 @@ class GitHubRepoFile(RemoteZippedFile):
     The repository is downloaded as a ZIP file and the specified file
     is extracted to make it available.
     """
-    def __init__(self, path: str, author: str, name: str, commit: str="master"):
+
+    # Template of the URL to download the archive from, for mirrors
+    URL = "https://github.com/{author}/{name}/archive/{commit}.zip"
+
+    def __init__(self, path: str, author: str, name: str, commit: str="master", extract: bool = None):
         """
         :param path: Relative file path in the repository
         :param author: Author name for the repository
         :param name: Repository name
         :param commit: The commit to download the ZIP-file for
+        :param extract: Whether to extract the file, see ZippedFile
         """
-        RemoteZippedFile.__init__(self, path, "{}.zip".format(name), self._build_url(author, name, commit), root=False)
+        RemoteZippedFile.__init__(self, path, self._build_url(author, name, commit), "{}.zip".format(name),
+                                  root=False, extract=extract)
 
     @staticmethod
     def _build_url(author: str, name: str, commit: str) -> str:
         """Build a URL to a download the zipped file from GitHub"""
-        return "https://github.com/{}/{}/archive/{}.zip".format(author, name, commit)
+        return GitHubRepoFile.URL.format(author=author, name=name, commit=commit)
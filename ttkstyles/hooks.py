@@ -14,19 +14,139 @@ initialization of the widget.
 Default values may be specified as well. For more details, see
 :meth:`hook_ttk_widgets` for more details. See :meth:`tooltip_updater`
 for a practical implementation of a hook.
+
+The functions of ``ttk.Widget`` are replaced only once, no matter how
+many hooks are created. The replacements find the hooks to call in a
+central index of options, so widgets that are created or configured
+without any hooked options only pay for a single set intersection.
+
+Option values are kept in a :class:`WidgetTable` per option, which only
+holds the values that differ from the default and forgets widgets when
+they are destroyed.
+
+Hooks may be deferred, in which case changes are collected and passed to
+the updater once the event loop is idle. Changes of the same option of
+the same widget are coalesced, so reconfiguring many widgets in a loop
+results in a single pass of the updater.
 """
+import tkinter as tk
 from tkinter import ttk
 import typing
+import weakref
+
+
+NULL = object()
+
+
+class OriginalFunctions(object):
+    """Functions of ``ttk.Widget`` as they were before hooks were installed"""
+    original_init = None
+    original_config = None
+    original_configure = None
+    original_cget = None
+    original_keys = None
+    defaults = {}
+
+
+class WidgetTable(dict):
+    """
+    Mapping of widgets to values that forgets widgets when destroyed
+
+    Storing values of widgets in tables rather than on the widgets
+    themselves keeps the memory used by widgets that do not have a
+    value at zero. Widgets are removed from all tables by a ``<Destroy>``
+    binding added to the bindtags of the widget when it is first stored.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        dict.__init__(self)
+        _tables.append(self)
+
+    def __setitem__(self, widget: tk.Misc, value: typing.Any):
+        if widget not in _tracked:
+            _track(widget)
+        dict.__setitem__(self, widget, value)
+
+    def forget(self, widget: tk.Misc):
+        """Remove a widget that has been destroyed from the table"""
+        self.pop(widget, None)
+
+
+# Bindtag of the widgets stored in any WidgetTable
+BINDTAG = "TtkStylesHooked"
+_DESTROYED = "::ttkstyles::hooks_destroyed"
+_tables = []  # type: typing.List[WidgetTable]
+_tracked = set()  # type: typing.Set[tk.Misc]
+_bound = weakref.WeakSet()  # type: typing.MutableSet[tk.Tk]
+
+
+def _track(widget):
+    """Bind to the destruction of a widget to remove it from the tables"""
+    root = widget._root()
+    if root not in _bound:
+        _bound.add(root)
+        widget.tk.eval("namespace eval ::ttkstyles {}")
+        widget.tk.createcommand(_DESTROYED, lambda path: _forget(root, path))
+        widget.tk.call("bind", BINDTAG, "<Destroy>", _DESTROYED + " %W")
+    widget.tk.eval("bindtags {0} [linsert [bindtags {0}] end {1}]".format(widget._w, BINDTAG))
+    _tracked.add(widget)
+
+
+def _forget(root, path):
+    """Remove a destroyed widget from all tables"""
+    try:
+        widget = root.nametowidget(path)
+    except KeyError:
+        return
+    _tracked.discard(widget)
+    for table in _tables:
+        table.forget(widget)
+
+
+class _Hook(object):
+    """Registration of a single hook in the index"""
+
+    __slots__ = ("name", "updater", "holder", "apply_defaults", "deferred", "batch_updater")
+
+    def __init__(self, name: str, updater: typing.Callable, holder: type, apply_defaults: bool,
+                 deferred: bool, batch_updater: typing.Callable):
+        self.name = name
+        self.updater = updater
+        self.holder = holder
+        self.apply_defaults = apply_defaults
+        self.deferred = deferred
+        self.batch_updater = batch_updater
+
+    def update(self, changes: typing.List[typing.Tuple[ttk.Widget, str, typing.Any]]):
+        """Pass a batch of changes to the updater of the hook"""
+        if self.batch_updater is not None:
+            self.batch_updater(changes)
+        else:
+            for widget, option, value in changes:
+                self.updater(widget, option, value)
+
+
+# Hooks in order of creation
+_hooks = []  # type: typing.List[_Hook]
+# Hook of every option
+_index = {}  # type: typing.Dict[str, _Hook]
+# Values of every option that differ from the default
+_values = {}  # type: typing.Dict[str, WidgetTable]
+_hooked = frozenset()  # type: typing.FrozenSet[str]
+# Options of which the updater is called with the default on init
+_init_defaults = ()  # type: typing.Tuple[typing.Tuple[_Hook, str], ...]
+# Changes of deferred hooks by widget and option, in order of change
+_pending = WidgetTable()  # type: typing.Dict[ttk.Widget, typing.Dict[str, typing.Any]]
+# Tcl interpreters for which a flush of the pending changes is scheduled
+_scheduled = set()
 
 
 def is_hooked(options):
     # type: (dict) -> bool
     """Return whether ``ttk.Widget`` is hooked for any of the given options"""
-    for hookname in [hook for hook in dir(ttk.Widget) if hook.startswith("WidgetHook_")]:
-        hookoptions = getattr(ttk.Widget, hookname).defaults
-        if any(option in hookoptions for option in options):
-            return True
-    return hasattr(ttk.Widget, generate_hook_name(options))
+    return not _hooked.isdisjoint(options) or hasattr(ttk.Widget, generate_hook_name(options))
 
 
 def generate_hook_name(options):
@@ -38,13 +158,17 @@ def generate_hook_name(options):
 def hook_ttk_widgets(
         updater: typing.Callable[[ttk.Widget, str, typing.Any], None],
         options: dict,
+        apply_defaults: bool = True,
+        deferred: bool = False,
+        batch_updater: typing.Callable[[typing.List[typing.Tuple[ttk.Widget, str, typing.Any]]], None] = None,
 ) -> str:
     """
     Create a hook in either tk.Widget or ttk.Widget to support options
     This function works by overriding the ``__init__``, ``configure``,
     ``config``, ``cget`` and ``keys`` functions of the ``ttk.Widget``
-    class. The original functions are stored safely inside a class
-    object created upon the ``ttk.Widget`` class, so that they can
+    class once. The original functions are stored safely inside the
+    :class:`OriginalFunctions` class, of which a sub-class is created
+    upon the ``ttk.Widget`` class for every hook, so that they can
     still be executed when necessary.
     Multiple hooks are allowed at the same time and a custom hook
     overwriting any of the functions (as long as it is done properly)
@@ -60,10 +184,24 @@ def hook_ttk_widgets(
         default values. A default value must be specified for every
         option. All option names must be allowed in valid Python syntax.
     :type options: Dict[str, Any]
-    :return: Name of the attribute created to store values
+    :param apply_defaults: Whether to call the updater with the default
+        values of the options not given upon initialization of a widget.
+        Hooks of which the updater does nothing for the default values
+        should pass False, so that widgets created without the options
+        do not pay for the hook.
+    :param deferred: Whether to collect the changes of the options and
+        call the updater only once the event loop is idle. Changes of
+        the same option of a widget in between are coalesced, so only
+        the last value is passed to the updater.
+    :param batch_updater: Function to call with all the changes
+        collected for a deferred hook at once, as a list of tuples of
+        widget, option and value, instead of calling the updater for
+        every change. Implies ``deferred``.
+    :type batch_updater: (changes: List[Tuple[ttk.Widget, str, Any]]) -> None
+    :return: Name of the attribute created on ``ttk.Widget``
     :rtype: str
     """
-    NULL = object()
+    global _hooked, _init_defaults
 
     assert len(options) > 0
 
@@ -71,80 +209,154 @@ def hook_ttk_widgets(
     name = generate_hook_name(options)
     # Check to see if the hook already exists
     if hasattr(ttk.Widget, name):  # Hook already exists, will be updated
-        if updater is not None:
+        if updater is not None or batch_updater is not None:
             raise RuntimeError("Invalid parameter: Updater may not be changed after hook creation")
         getattr(ttk.Widget, name).defaults = options.copy()
         return name
     elif is_hooked(options):
         raise RuntimeError("Invalid options: Cannot replace full hook with partial hook")
+    elif updater is None and batch_updater is None:
+        raise RuntimeError("Invalid parameter: An updater is required to create a hook")
 
-    # Create a class with the original functions
-    class OriginalFunctions(object):
-        original_init = ttk.Widget.__init__
-        original_config = ttk.Widget.config
-        original_configure = ttk.Widget.configure
-        original_cget = ttk.Widget.cget
-        original_keys = ttk.Widget.keys
-        defaults = options
+    if OriginalFunctions.original_init is None:
+        _install()
 
+    # Create a class with the defaults, which inherits the original functions
+    holder = type("OriginalFunctions", (OriginalFunctions,), {"defaults": options})
     # Move the OriginalFunctions class to the target class
-    setattr(ttk.Widget, name, OriginalFunctions)
-
-    def setter(self, option, value):
-        """Store an option on the embedded object and then call updater"""
-        current = getter(self, option)
-        if current != value:
-            setattr(getattr(self, name.lower()), option, value)
-            updater(self, option, value)
-
-    def getter(self, option):
-        """Retrieve an option value from the embedded object"""
-        return getattr(getattr(self, name.lower()), option, NULL)
-
-    def __init__(self, *args):
-        """Catch initialization and pop all the custom options"""
-        master, widget, widget_options = args
-        # Pop all the options, taking default values first
-        values = getattr(self, name).defaults.copy()
-        for (option, default) in options.items():
-            value = widget_options.pop(option, default)
-            values[option] = value
-        # Perform initialization of the widget
-        getattr(self, name).original_init(self, master, widget, widget_options)
-        # Create an instance object to store options on
-        setattr(self, name.lower(), OriginalFunctions())
-        # Set all the options only after widget init is complete
-        for option, value in values.items():  # updater only called after init is done
-            setter(self, option, value)
-
-    def configure(self, *args, **kwargs):
-        """Catch configure to pop custom options and configure them"""
-        for widget_options in args + (kwargs,):  # Loop over all sets of options available
-            if widget_options is None:
-                continue
-            for option, _ in options.items():
-                current = getter(self, option)
-                value = widget_options.pop(option, current)
-                setter(self, option, value)
-        return getattr(self, name).original_configure(self, *args, **kwargs)
-
-    def cget(self, key):
-        """Return the value of a custom option if key is a custom option"""
-        if key in options:
-            return getter(self, key)
-        return getattr(self, name).original_cget(self, key)
-
-    def keys(self):
-        """Return an updated list of keys with the custom options"""
-        keys = getattr(self, name).original_keys(self)
-        keys.extend(options.keys())
-        return keys
-
-    ttk.Widget.__init__ = __init__
-    ttk.Widget.configure = configure
-    ttk.Widget.config = configure
-    ttk.Widget.cget = cget
-    ttk.Widget.__getitem__ = cget
-    ttk.Widget.keys = keys
+    setattr(ttk.Widget, name, holder)
 
+    hook = _Hook(name, updater, holder, apply_defaults, deferred or batch_updater is not None, batch_updater)
+    _hooks.append(hook)
+    _index.update((option, hook) for option in options)
+    _values.update((option, WidgetTable()) for option in options)
+    _hooked = frozenset(_index)
+    _init_defaults = tuple((h, option) for h in _hooks if h.apply_defaults for option in h.holder.defaults)
     return name
+
+
+def _get(widget, hook, option):
+    """Retrieve an option value from the table of the option"""
+    value = _values[option].get(widget, NULL)
+    return hook.holder.defaults.get(option) if value is NULL else value
+
+
+def _set(widget, hook, option, value, force=False):
+    """Store an option value in the table of the option and then call updater"""
+    default = hook.holder.defaults.get(option)
+    table = _values[option]
+    if force or table.get(widget, default) != value:
+        if value == default:
+            table.pop(widget, None)
+        else:
+            table[widget] = value
+        if hook.deferred:
+            _defer(widget, option, value)
+        else:
+            hook.updater(widget, option, value)
+
+
+def _defer(widget, option, value):
+    """Store a change of a deferred hook until the event loop is idle"""
+    changes = _pending.get(widget, None)
+    if changes is None:
+        changes = _pending[widget] = {}
+    else:  # Move the option to the end, so changes are flushed in order
+        changes.pop(option, None)
+    changes[option] = value
+    if widget.tk not in _scheduled:
+        _scheduled.add(widget.tk)
+        # Scheduled on the root, which outlives the widget
+        widget._root().after_idle(flush, widget)
+
+
+def flush(widget: tk.Misc = None):
+    """
+    Pass the pending changes of deferred hooks to their updaters
+
+    This is done automatically once the event loop is idle, but may be
+    called to apply the changes immediately.
+
+    :param widget: Only flush the changes of widgets of the Tcl
+        interpreter of this widget, rather than all changes
+    """
+    tkinterp = None if widget is None else widget.tk
+    if tkinterp is None:
+        _scheduled.clear()
+    else:
+        _scheduled.discard(tkinterp)
+    batches = {}  # type: typing.Dict[_Hook, typing.List[typing.Tuple[ttk.Widget, str, typing.Any]]]
+    for target in list(_pending):
+        if tkinterp is not None and target.tk is not tkinterp:
+            continue
+        for option, value in _pending.pop(target).items():
+            batches.setdefault(_index[option], []).append((target, option, value))
+    for hook in _hooks:  # Hooks are updated in order of creation
+        if hook in batches:
+            hook.update(batches[hook])
+
+
+def _widget_init(self, master, widget, kw=None):
+    """Catch initialization and pop all the custom options"""
+    values = {option: kw.pop(option) for option in _hooked.intersection(kw)} if kw else None
+    # Perform initialization of the widget
+    OriginalFunctions.original_init(self, master, widget, kw)
+    # Set all the options only after widget init is complete
+    if values:
+        for hook in _hooks:
+            for option in hook.holder.defaults:
+                if option in values:
+                    _set(self, hook, option, values[option], True)
+                elif hook.apply_defaults:
+                    _set(self, hook, option, hook.holder.defaults[option], True)
+    else:
+        for hook, option in _init_defaults:
+            _set(self, hook, option, hook.holder.defaults[option], True)
+
+
+def _widget_configure(self, cnf=None, **kw):
+    """Catch configure to pop custom options and configure them"""
+    popped = False
+    for widget_options in (cnf, kw):  # Loop over all sets of options available
+        if not isinstance(widget_options, dict):
+            continue
+        if _hooked.isdisjoint(widget_options):
+            continue
+        # Options are updated in the order in which they were given
+        for option in [option for option in widget_options if option in _hooked]:
+            _set(self, _index[option], option, widget_options.pop(option))
+        popped = True
+    if popped and not cnf and not kw:  # Only custom options were configured
+        return None
+    return OriginalFunctions.original_configure(self, cnf, **kw)
+
+
+def _widget_cget(self, key):
+    """Return the value of a custom option if key is a custom option"""
+    hook = _index.get(key, None)
+    if hook is not None:
+        return _get(self, hook, key)
+    return OriginalFunctions.original_cget(self, key)
+
+
+def _widget_keys(self):
+    """Return an updated list of keys with the custom options"""
+    keys = OriginalFunctions.original_keys(self)
+    keys.extend(_index)
+    return keys
+
+
+def _install():
+    """Replace the functions of ttk.Widget with those dispatching to hooks"""
+    OriginalFunctions.original_init = ttk.Widget.__init__
+    OriginalFunctions.original_config = ttk.Widget.config
+    OriginalFunctions.original_configure = ttk.Widget.configure
+    OriginalFunctions.original_cget = ttk.Widget.cget
+    OriginalFunctions.original_keys = ttk.Widget.keys
+
+    ttk.Widget.__init__ = _widget_init
+    ttk.Widget.configure = _widget_configure
+    ttk.Widget.config = _widget_configure
+    ttk.Widget.cget = _widget_cget
+    ttk.Widget.__getitem__ = _widget_cget
+    ttk.Widget.keys = _widget_keys
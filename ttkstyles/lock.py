@@ -0,0 +1,90 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import os
+import time
+# Advisory file locks are platform specific
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileLock(object):
+    """
+    Exclusive advisory lock on a file, shared between processes
+
+    The lock is taken with ``flock`` on POSIX systems and with
+    ``msvcrt.locking`` on Windows. As the lock belongs to the open file,
+    it also excludes other threads of the same process that take a lock
+    on the same file. Lock files are left in place, as removing them
+    would allow two processes to lock different files of the same path.
+
+    A shared lock only excludes exclusive locks. Windows does not offer
+    shared locks, so there a shared lock is not taken at all, which is
+    of little consequence as files that are open cannot be removed.
+    """
+
+    # Interval between attempts on Windows, where locking does not block
+    INTERVAL = 0.05
+
+    def __init__(self, path: str, shared: bool = False):
+        self.path = path
+        self.shared = shared
+        self._fo = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Acquire the lock
+
+        :param blocking: Whether to block until the lock is acquired,
+            rather than to give up if it is held elsewhere
+        :return: Whether the lock was acquired
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fo = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                try:
+                    fcntl.flock(fo.fileno(), operation if blocking else operation | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    fo.close()
+                    return False
+            elif not self.shared:
+                fo.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(fo.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            fo.close()
+                            return False
+                        time.sleep(self.INTERVAL)
+        except BaseException:
+            fo.close()
+            raise
+        self._fo = fo
+        return True
+
+    def release(self):
+        """Release the lock"""
+        fo, self._fo = self._fo, None
+        if fcntl is not None:
+            fcntl.flock(fo.fileno(), fcntl.LOCK_UN)
+        elif not self.shared:
+            fo.seek(0)
+            msvcrt.locking(fo.fileno(), msvcrt.LK_UNLCK, 1)
+        fo.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
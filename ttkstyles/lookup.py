@@ -0,0 +1,72 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import tkinter as tk
+from typing import Any, Callable, List, Tuple
+import weakref
+# Project Modules
+from .utils import bind_theme_changed
+
+
+class LookupCache(object):
+    """
+    Memoized ``ttk::style lookup`` for a Tk instance
+
+    The results of lookups are stored by theme, style, option and state
+    and are reused until the cache is invalidated. The cache of a Tk
+    instance is invalidated by :class:`ttkstyles.Style` whenever a style
+    is configured or mapped or the theme is changed, as well as on any
+    ``<<ThemeChanged>>`` event, which ttk generates whenever the theme
+    settings change.
+    """
+
+    _caches = weakref.WeakKeyDictionary()
+
+    def __init__(self, root: tk.Tk):
+        self._tk = root.tk
+        self._cache = {}
+        self._theme = None
+        self.hits = 0
+        self.misses = 0
+        self._listeners: List[Callable[[], None]] = []
+        bind_theme_changed(root, self.invalidate)
+
+    @classmethod
+    def get(cls, widget: tk.Misc) -> "LookupCache":
+        """Return the LookupCache for the Tk instance of a widget"""
+        root = widget._root()
+        cache = cls._caches.get(root, None)
+        if cache is None:
+            cache = cls._caches[root] = cls(root)
+        return cache
+
+    def lookup(self, style: str, option: str, state: Tuple[str, ...] = None, default: Any = None) -> Any:
+        """Return the value of an option for a style like ttk.Style.lookup"""
+        if self._theme is None:
+            self._theme = self._tk.call("ttk::style", "theme", "use")
+        key = (self._theme, style, option, tuple(state) if state else (), default)
+        try:
+            value = self._cache[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return value
+        self.misses += 1
+        state = " ".join(state) if state else ""
+        value = self._cache[key] = self._tk.call("ttk::style", "lookup", style, "-" + option, state, default)
+        return value
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback to call whenever the cache is invalidated"""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """Discard all cached values and notify the listeners"""
+        self._cache.clear()
+        self._theme = None
+        for callback in self._listeners:
+            callback()
@@ -5,43 +5,133 @@ Copyright (c) 2020 RedFantom
 """
 # Standard Library
 import ast
+import hashlib
 import os
+import tempfile
 from typing import Any, Dict, Generator, List, Optional, Tuple
 # Project Modules
 from .exceptions import TtkStyleFileUnavailable, TtkStyleFileParseError
 from .files import File, ZippedFile, RemoteFile, RemoteZippedFile, GitHubRepoFile
-# Packages
-import tinycss
-import tinycss.token_data
+from .logger import get_logger
 
 
 class StyleFile(object):
-    """Parser for example.ttkstyle configuration files"""
+    """
+    Parser for example.ttkstyle configuration files
 
-    def __init__(self, path: str):
+    Besides the ``#theme`` section, more themes may be specified in
+    sections named ``#theme.<alias>``. Options that only apply to a
+    specific theme may be given by prefixing the selector with the name
+    of the theme, for example ``azure-dark|Heading.TLabel``.
+    """
+
+    # Bump whenever the structure of the compiled form changes
+    COMPILED_VERSION = 6
+
+    THEME_SEPARATOR = "|"
+
+    def __init__(self, path: str, cache: bool = True):
         """
         :param path: Valid path to the configuration file
+        :param cache: Whether to use the compiled form of the file in
+            the File cache directory. If the file has not changed since
+            it was last compiled, the compiled form is loaded instead of
+            parsing the file again, which does not require tinycss.
         """
         if not os.path.exists(path):
             raise TtkStyleFileUnavailable("Could not find style file '{}'".format(path))
+        self.logger = get_logger(__class__.__name__)
+        self._path = os.path.abspath(path)
 
-        parser = tinycss.make_parser()
         with open(path, "rb") as fi:
-            css = parser.parse_stylesheet_bytes(fi.read())
-        self._config = self.css_rules_to_dict(css.rules)
+            data = fi.read()
+        stat = os.stat(path)
+        key = (self._path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest())
+
+        compiled = self._load_compiled(key) if cache else None
+        if compiled is None:
+            self._config = self.parse_bytes(data)
+            self._grid_options = self._build_grid_options(self._config)
+            if cache:
+                self._save_compiled(key)
+        else:
+            self._config, self._grid_options = compiled["config"], compiled["grid"]
+
+    @staticmethod
+    def parse_bytes(data: bytes) -> Dict[str, Dict[str, Any]]:
+        """Parse the contents of a style file into a rule dictionary"""
+        import tinycss
+        parser = tinycss.make_parser()
+        css = parser.parse_stylesheet_bytes(data)
+        return StyleFile.css_rules_to_dict(css.rules)
+
+    @staticmethod
+    def _compiled_path(path: str) -> str:
+        """Return the path to the compiled form of a style file"""
+        name = hashlib.sha1(path.encode()).hexdigest()
+        return os.path.join(File(None)._cache, "compiled", "{}.compiled".format(name))
+
+    def _load_compiled(self, key: Tuple[str, int, int, str]) -> Optional[Dict[str, Any]]:
+        """
+        Return the compiled form for key if it is available and valid
+
+        The compiled form is the representation of a dictionary of
+        literals, which is evaluated with :func:`ast.literal_eval`, so that
+        a compiled file written into a shared cache cannot run code.
+        """
+        path = self._compiled_path(self._path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as fi:
+                compiled = ast.literal_eval(fi.read())
+        except Exception as e:
+            self.logger.debug("Failed to read compiled style file '{}': {}".format(path, e))
+            return None
+        if not isinstance(compiled, dict) or compiled.get("version") != self.COMPILED_VERSION \
+                or compiled.get("key") != key:
+            self.logger.debug("Compiled style file '{}' is outdated".format(path))
+            return None
+        self.logger.debug("Loaded compiled style file for '{}'".format(self._path))
+        return compiled
+
+    def _save_compiled(self, key: Tuple[str, int, int, str]):
+        """Write the compiled form of this style file to the cache"""
+        path = self._compiled_path(self._path)
+        compiled = {
+            "version": self.COMPILED_VERSION,
+            "key": key,
+            "config": self._config,
+            "grid": self._grid_options,
+        }
+        temp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so that other processes
+            # never read a partially written compiled file
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w") as fo:
+                fo.write(repr(compiled))
+            os.replace(temp, path)
+        except OSError as e:
+            self.logger.debug("Failed to write compiled style file '{}': {}".format(path, e))
+            if temp is not None and os.path.exists(temp):
+                os.remove(temp)
 
     @staticmethod
-    def css_rules_to_dict(rules: List[tinycss.css21.RuleSet]) -> Dict[str, Dict[str, Any]]:
+    def css_rules_to_dict(rules: List["tinycss.css21.RuleSet"]) -> Dict[str, Dict[str, Any]]:
         """Convert the tinycss rules to option dictionaries"""
         rules_dict = dict()
-        print(rules)
         for rule in rules:
             key = "".join(map(lambda x: x.value, rule.selector))
-            print(key)
             rules_dict[key] = {}
             for option in rule.declarations:
-                option: tinycss.css21.Declaration
-                val = StyleFile.flatten_to_string(option.value[0])
+                option: "tinycss.css21.Declaration"
+                # Values of a single token keep its value, such as 10 for 10px
+                if len(option.value) == 1 and not option.value[0].is_container:
+                    val = option.value[0].value
+                else:
+                    val = "".join(token.as_css() for token in option.value).strip()
                 try:
                     val = ast.literal_eval(val)
                 except:
@@ -54,7 +144,16 @@ class StyleFile(object):
         """Return theme File, type and name for the given settings"""
         if "#theme" not in self._config:
             raise TtkStyleFileParseError("Style file does not specify theme, yet it is required.")
-        theme = dict(self._config["#theme"])
+        return self._theme_from_section("#theme")
+
+    @property
+    def themes(self) -> List[Tuple[File, str, str]]:
+        """Return theme File, name and type for all themes, starting with the default theme"""
+        sections = [k for k in self._config.keys() if k.startswith("#theme.")]
+        return [self.theme] + [self._theme_from_section(k) for k in sections]
+
+    def _theme_from_section(self, sec_name: str) -> Tuple[File, str, str]:
+        theme = dict(self._config[sec_name])
         StyleFile._validate_key(theme, ("name", "type"))
         return self.interpret_file_from_section(theme), theme["name"], theme["type"]
 
@@ -62,17 +161,23 @@ class StyleFile(object):
     def fonts(self) -> Generator[Tuple[File, str], None, None]:
         fonts = filter(lambda x: x.startswith("#font."), self._config.keys())
         for sec_name in fonts:
-            section = dict(self._config[sec_name])
-            family = section.get("family", None)
-            if family is None:
-                family = sec_name.split(".")[-1]
-            yield self.interpret_file_from_section(section), family
+            yield self.font(sec_name)
+
+    def font(self, sec_name: str) -> Tuple[File, str]:
+        """Return font File and family for the given font section"""
+        section = dict(self._config[sec_name])
+        family = section.get("family", None)
+        if family is None:
+            family = sec_name.split(".")[-1]
+        return self.interpret_file_from_section(section), family
 
     @staticmethod
     def interpret_file_from_section(section: Dict[str, str]) -> File:
         """Build a File instance from the given settings"""
         StyleFile._validate_key(section, ("pkg", "path"))
         pkg = section["pkg"]
+        # Files in archives are extracted unless specified otherwise
+        extract = {"true": True, "false": False}.get(section.get("extract", None), None)
 
         if pkg == "local":
             return File(section["path"])
@@ -83,16 +188,17 @@ class StyleFile(object):
 
         elif pkg == "zip":
             StyleFile._validate_key(section, ("archive",))
-            return ZippedFile(section["path"], File(section["archive"]), section.get("root", "true") == "true")
+            return ZippedFile(section["path"], File(section["archive"]), section.get("root", "true") == "true",
+                              extract)
 
         elif pkg == "remote zip":
             StyleFile._validate_key(section, ("url",))
             return RemoteZippedFile(section["path"], section["url"], name=section.get("archive", None),
-                                    root=section.get("root", "true") == "true")
+                                    root=section.get("root", "true") == "true", extract=extract)
 
         elif pkg == "github":
             StyleFile._validate_key(section, ("author", "repo", "commit"))
-            return GitHubRepoFile(section["path"], section["author"], section["repo"], section["commit"])
+            return GitHubRepoFile(section["path"], section["author"], section["repo"], section["commit"], extract)
 
         else:
             raise TtkStyleFileParseError("No valid value given for file pkg type: '{}'".format(pkg))
@@ -105,10 +211,39 @@ class StyleFile(object):
 
     @property
     def styles(self) -> Dict[str, Dict[str, Any]]:
-        config = {k: v for k, v in self._config.items() if not k.startswith("#")}
-        options = {k: self.style_options_to_tkinter(v) for k, v in config.items()}
-        print(options)
-        return options
+        config = {k: v for k, v in self._config.items() if self._is_style(k)}
+        return {k: self.style_options_to_tkinter(dict(v)) for k, v in config.items()}
+
+    def theme_styles(self, name: str) -> Dict[str, Dict[str, Any]]:
+        """Return the styles with the options specific to a theme applied"""
+        config = {k: dict(v) for k, v in self._config.items() if self._is_style(k)}
+        prefix = name + self.THEME_SEPARATOR
+        for key, options in self._config.items():
+            if key.startswith(prefix):
+                config.setdefault(key[len(prefix):], {}).update(options)
+        return {k: self.style_options_to_tkinter(v) for k, v in config.items()}
+
+    @staticmethod
+    def _is_style(key: str) -> bool:
+        """Return whether a section applies to a style in all themes"""
+        return not key.startswith("#") and StyleFile.THEME_SEPARATOR not in key
+
+    @property
+    def grid_options(self) -> Dict[str, Dict[str, Any]]:
+        """Return the grid options for every style that specifies them"""
+        return {k: dict(v) for k, v in self._grid_options.items()}
+
+    @staticmethod
+    def _build_grid_options(config: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Extract the grid options from the style sections of a rule dictionary"""
+        grid = {}
+        for style, options in config.items():
+            if not StyleFile._is_style(style):
+                continue
+            options = {k[5:]: v for k, v in options.items() if k.startswith("grid-")}
+            if len(options) != 0:
+                grid[style] = options
+        return grid
 
     @staticmethod
     def style_options_to_tkinter(options: Dict[str, Any]) -> Dict[str, Any]:
@@ -133,15 +268,3 @@ class StyleFile(object):
                 tk_options["grid"][option[5:]] = value
 
         return tk_options
-
-    @staticmethod
-    def flatten_to_string(container: (tinycss.token_data.ContainerToken, tinycss.token_data.Token)) -> str:
-        if not container.is_container:
-            return container.value
-        string = ""
-        for element in container.content:
-            if element.is_container:
-                string += StyleFile.flatten_to_string(element)
-            else:
-                string += str(element.value)
-        return string
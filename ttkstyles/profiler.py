@@ -0,0 +1,264 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+
+Opt-in instrumentation of the hot paths of ttkstyles
+
+When enabled, the functions listed in :func:`targets` are replaced by
+wrappers that record the number of calls, their latencies and the
+number of Tcl commands evaluated while they run. When disabled, the
+original functions are put back, so profiling costs nothing unless it
+is used.
+
+The time spent in the hooks of ``ttk.Widget`` includes the time spent
+by Tk itself. The original ``ttk.Widget`` functions wrapped by the
+hooks are therefore recorded separately as ``tk.*``, so that the time
+ttkstyles adds is the difference between the ``hooks.*`` and ``tk.*``
+entries.
+
+    from ttkstyles import profiler
+
+    with profiler.profiled():
+        build_ui()
+    profiler.dump("profile.json")
+"""
+# Standard Library
+from contextlib import contextmanager
+import functools
+import json
+import random
+from threading import Lock, local
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple, Union
+# Project Modules
+from .files import File
+from . import hooks
+
+
+# Maximum number of latencies kept per function for the percentiles
+SAMPLES = 10000
+
+
+class _Record(object):
+    """Statistics of the calls to a single function"""
+
+    __slots__ = ("calls", "total", "tcl", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.tcl = 0
+        self.samples: List[float] = []
+
+    def add(self, duration: float, tcl: Optional[int]):
+        self.calls += 1
+        self.total += duration
+        if tcl is not None:
+            self.tcl += tcl
+        # Reservoir sampling keeps memory bounded for long sessions
+        if len(self.samples) < SAMPLES:
+            self.samples.append(duration)
+        else:
+            i = random.randrange(self.calls)
+            if i < SAMPLES:
+                self.samples[i] = duration
+
+    def summary(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if len(samples) != 0 else 0.0
+
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls != 0 else 0.0,
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+            "tcl_commands": self.tcl,
+        }
+
+
+_lock = Lock()
+_local = local()
+_records: Dict[str, _Record] = {}
+# Owner, attribute, original value and wrapper of every patch
+_patches: List[Tuple[Any, str, Any, Any]] = []
+# Number of commands 'info cmdcount' itself adds to the count
+_overhead = None
+
+
+def _interp(args: tuple):
+    """Return the Tcl interpreter of the object a function is called on"""
+    for candidate in args[:2]:
+        for obj in (candidate, getattr(candidate, "master", None)):
+            tkinterp = getattr(obj, "tk", None)
+            if tkinterp is not None and hasattr(tkinterp, "call"):
+                return tkinterp
+    return None
+
+
+def _cmdcount(tkinterp) -> int:
+    """Return the number of commands evaluated by an interpreter"""
+    global _overhead
+    if _overhead is None:
+        first = int(tkinterp.call("info", "cmdcount"))
+        _overhead = int(tkinterp.call("info", "cmdcount")) - first
+    _local.counts = getattr(_local, "counts", 0) + 1
+    return int(tkinterp.call("info", "cmdcount"))
+
+
+def _wrap(name: str, func: Callable) -> Callable:
+    """Build a wrapper of func that records its calls as name"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tkinterp = _interp(args)
+        before = None
+        if tkinterp is not None:
+            try:
+                counts = getattr(_local, "counts", 0)
+                before = _cmdcount(tkinterp)
+            except (tk.TclError, RuntimeError):  # Interpreter destroyed or not in the Tk thread
+                before = None
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            tcl = None
+            if before is not None:
+                try:
+                    after = _cmdcount(tkinterp)
+                    # Every 'info cmdcount' call in between, including
+                    # those of nested wrappers, adds to the count
+                    calls = _local.counts - counts - 1
+                    tcl = max(0, after - before - _overhead * calls)
+                except (tk.TclError, RuntimeError):
+                    pass
+            with _lock:
+                record = _records.get(name, None)
+                if record is None:
+                    record = _records[name] = _Record()
+                record.add(duration, tcl)
+
+    return wrapper
+
+
+def targets() -> List[Tuple[Any, Tuple[str, ...], str]]:
+    """
+    Return the functions instrumented by the profiler
+
+    :return: List of tuples of the owner, the names of the attributes
+        which hold the function on the owner and the name the function
+        is recorded as
+    """
+    from .style import Style
+    from .widgets.tooltip import ToolTip
+
+    result = [
+        (ttk.Widget, ("__init__",), "hooks.init"),
+        (ttk.Widget, ("configure", "config"), "hooks.configure"),
+        (ttk.Widget, ("cget", "__getitem__"), "hooks.cget"),
+        (tk.Grid, tuple(a for a in ("grid", "grid_configure", "config", "configure")
+                        if tk.Grid.__dict__.get(a) is tk.Grid.__dict__["grid"]), "grid.configure"),
+        (Style, ("lookup",), "style.lookup"),
+        (Style, ("configure",), "style.configure"),
+        (Style, ("configure_batch",), "style.configure_batch"),
+        (Style, ("load_theme",), "style.load_theme"),
+        (ToolTip, ("_showtip",), "tooltip.show"),
+        (ToolTip, ("_hidetip",), "tooltip.hide"),
+        (File, ("abspath",), "files.abspath"),
+    ]
+    # The hooks call the original functions of ttk.Widget through here
+    for attribute, name in (("original_init", "tk.init"), ("original_configure", "tk.configure"),
+                            ("original_cget", "tk.cget")):
+        result.append((hooks.OriginalFunctions, (attribute,), name))
+    return result
+
+
+def is_enabled() -> bool:
+    """Return whether the profiler is enabled"""
+    return len(_patches) != 0
+
+
+def enable():
+    """
+    Start recording the calls to the instrumented functions
+
+    Hooks created after the profiler has been enabled are not
+    recorded separately, so it should be enabled after the modules
+    installing hooks, such as :mod:`ttkstyles.tooltips`, are imported
+    and a :class:`ttkstyles.Style` has been created.
+    """
+    if is_enabled():
+        return
+    for owner, attributes, name in targets():
+        original = owner.__dict__.get(attributes[0], None)
+        if original is None:
+            continue
+        if isinstance(original, property):
+            wrapper = property(_wrap(name, original.fget), original.fset, original.fdel, original.__doc__)
+        else:
+            wrapper = _wrap(name, original)
+        for attribute in attributes:
+            if owner.__dict__.get(attribute, None) is original:
+                _patches.append((owner, attribute, original, wrapper))
+                setattr(owner, attribute, wrapper)
+
+
+def disable():
+    """Stop recording and restore the original functions"""
+    while len(_patches) != 0:
+        owner, attribute, original, wrapper = _patches.pop()
+        # A hook created while enabled holds on to the wrapper, which
+        # is left in place rather than removing the hook
+        if owner.__dict__.get(attribute, None) is wrapper:
+            setattr(owner, attribute, original)
+
+
+def reset():
+    """Discard all recorded statistics"""
+    with _lock:
+        _records.clear()
+
+
+@contextmanager
+def profiled(clear: bool = True):
+    """
+    Enable the profiler for the duration of a with block
+
+    :param clear: Whether to discard previously recorded statistics
+    """
+    if clear:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the statistics of all functions called while profiling
+
+    For every function, the number of ``calls``, the ``total`` and
+    ``mean`` time spent, the ``p50``, ``p90`` and ``p99`` latencies
+    in seconds and the number of ``tcl_commands`` evaluated are given.
+    """
+    with _lock:
+        return {name: record.summary() for name, record in sorted(_records.items())}
+
+
+def dump(f: Union[str, IO[str]]):
+    """Write the statistics as JSON to a path or file object"""
+    if isinstance(f, str):
+        with open(f, "w") as fo:
+            json.dump(stats(), fo, indent=2)
+    else:
+        json.dump(stats(), f, indent=2)
@@ -4,21 +4,27 @@ License: GNU GPLv3
 Copyright (c) 2020 RedFantom
 """
 # Standard Library
+from concurrent.futures import Future, ThreadPoolExecutor
 import inspect
 import os
 from threading import Lock
 import tkinter as tk
 from tkinter import ttk
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import weakref
 # Packages
 import appdirs
 # Project Modules
+from .archive import isdir, local_path
+from .download import Downloader
 from .exceptions import TtkStyleException, TtkStyleFileUnavailable
 from .files import File
 from . import hooks
+from .logger import get_logger
+from .lookup import LookupCache
 from .parser import StyleFile
 from .themes import LOADERS
+from .themes.snapshot import ThemeRecorder, ThemeSnapshot
 from .utils import filter_suffix, resolve
 
 
@@ -30,8 +36,11 @@ class TkSingleton(type):
     is not impossible to define multiple Tk instances. Hence, this
     metaclass is here to ensure that only a single Style exists per Tk
     instance, rather than a single Style instance overall.
+
+    Finding an existing instance does not require the lock, so that the
+    instance may be retrieved cheaply in functions that are called
+    often, such as hooks. The lock is only taken to create an instance.
     """
-    _instances = weakref.WeakKeyDictionary()
     _lock = Lock()
 
     _ROOT_KWARGS = {"root", "master"}
@@ -39,32 +48,39 @@ class TkSingleton(type):
     def __init__(cls, *args, **kwargs):
         """Validate the use of TkSingleton by another class"""
         super().__init__(*args, **kwargs)
-        if len(TkSingleton._init_parameters(cls).intersection(TkSingleton._ROOT_KWARGS)) == 0:
+        root_kwargs = TkSingleton._init_parameters(cls).intersection(TkSingleton._ROOT_KWARGS)
+        if len(root_kwargs) == 0:
             raise RuntimeError("Invalid class to use TkSingleton: {}".format(cls))
+        cls._root_kwarg = sorted(root_kwargs)[0]
+        cls._instances = weakref.WeakKeyDictionary()
 
     def __call__(cls, *args, **kwargs):
         """Intercept creation of an instance to find any existing instance"""
-        with cls._lock:
-            if any(kwarg in kwargs for kwarg in TkSingleton._ROOT_KWARGS):
-                root = kwargs.get(set(kwargs.keys()).intersection(TkSingleton._ROOT_KWARGS).pop())
-            elif len(args) != 0 and args[0] != None:
-                args = list(args)
-                root = args.pop()
-                args = tuple(args)
-            else:
-                root = tk._get_default_root()
-            root = TkSingleton.walk_to_tk(root)
+        if "master" in kwargs:
+            root = kwargs.pop("master")
+        elif "root" in kwargs:
+            root = kwargs.pop("root")
+        elif len(args) != 0:
+            root, args = args[0], args[1:]
+        else:
+            root = None
+        if root is None:
+            root = tk._get_default_root()
+        root = TkSingleton.walk_to_tk(root)
+
+        ref = cls._instances.get(root, None)
+        instance = ref() if ref is not None else None
+        if instance is not None:
+            return instance
 
-            root_args = TkSingleton._init_parameters(cls)
-            kwarg = root_args.intersection(TkSingleton._ROOT_KWARGS).pop()
-            kwargs.update({kwarg: root})
-
-            instance = cls._instances.get(root, None)
-            if instance is None or instance() is None:
+        with cls._lock:
+            ref = cls._instances.get(root, None)
+            instance = ref() if ref is not None else None
+            if instance is None:
+                kwargs[cls._root_kwarg] = root
                 instance = super().__call__(*args, **kwargs)
                 cls._instances[root] = weakref.ref(instance)
-                return instance
-            return instance()
+            return instance
 
     @staticmethod
     def walk_to_tk(widget: tk.BaseWidget):
@@ -79,6 +95,38 @@ class TkSingleton(type):
         return set(map(lambda param: param.name, inspect.signature(cls.__init__).parameters.values()))
 
 
+class _GridOptions(dict):
+    """
+    Dictionary of grid options per style that reports modifications
+
+    The values of this dictionary must be treated as immutable: Replace
+    the options for a style instead of modifying them in place, so that
+    the change is reported.
+    """
+
+    def __init__(self, on_change: Callable[[], None], *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._on_change = on_change
+
+    def _changed(method):
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            self._on_change()
+            return result
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+    clear = _changed(dict.clear)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    setdefault = _changed(dict.setdefault)
+    update = _changed(dict.update)
+
+    del _changed
+
+
 class Style(ttk.Style, metaclass=TkSingleton):
     """
     Loader for ttk styles with fonts, Tcl themes, Python themes and more
@@ -138,7 +186,11 @@ class Style(ttk.Style, metaclass=TkSingleton):
     THEME_PY = "python"
     THEME_GTK = "gtk"
 
-    def __init__(self, master: tk.Tk=None, allow_override: bool = True, auto_load: bool = True):
+    # Widgets for which the root style depends on the orientation
+    ORIENTED = (ttk.Scrollbar, ttk.Scale, ttk.Separator)
+
+    def __init__(self, master: tk.Tk=None, allow_override: bool = True, auto_load: bool = True,
+                 async_load: bool = False):
         """
         Set-up the loader for a tk.Tk instance
 
@@ -150,14 +202,18 @@ class Style(ttk.Style, metaclass=TkSingleton):
             directory.
         :param auto_load: Whether to automatically load from the file
             ``example.ttkstyle`` file if it exists.
+        :param async_load: Whether to load the file automatically loaded
+            with :meth:`load_style_file_async` rather than blocking.
         """
         ttk.Style.__init__(self, master)
+        self.logger = get_logger(__class__.__name__)
         if not hooks.is_hooked({"style": None}):
-            hooks.hook_ttk_widgets(_label_option_updater, {"style": None})
+            hooks.hook_ttk_widgets(_label_option_updater, {"style": None}, apply_defaults=False)
             tk.Grid._original_grid = tk.Grid.grid
             tk.Grid.grid = tk.Grid.grid_configure = tk.Grid.config = tk.Grid.configure = _hook_grid_configure
 
         self.tkinst = ttk.setup_master(master)
+        self._lookup_cache = LookupCache.get(self.tkinst)
 
         # Load tksvg is available
         try:
@@ -166,11 +222,27 @@ class Style(ttk.Style, metaclass=TkSingleton):
         except ImportError:
             pass
 
-        self._grid_options = {}
+        # The grid index maps a style name or a (widget class,
+        # orientation) tuple to the resolved grid options
+        self._grid_index = {}
+        self._grid_options = _GridOptions(self._grid_index.clear)
         self._allow_override = allow_override
         self._settings = None
+        self._settings_stat = None
+        self._watch_id = None
+        # Stat of the changed style file, reloaded once it is stable
+        self._watch_stat = None
+        # Recordings of the loaded themes to take snapshots from
+        self._recordings = {}
+        # Grid options for every theme the style file was applied to
+        self._theme_grid = {}
+        # Labels by style name, restyled in one pass after changes
+        self._labels: Dict[str, weakref.WeakSet] = {}
+        self._label_styles = weakref.WeakKeyDictionary()
+        self._restyle_id = None
+        self._lookup_cache.add_listener(self._schedule_restyle)
         if auto_load:
-            self._load_auto()
+            self._load_auto(async_load)
 
     def _load_user_file(self):
         """Find the user's file with custom settings and load settings"""
@@ -182,34 +254,255 @@ class Style(ttk.Style, metaclass=TkSingleton):
                 self._load_file(f)
                 break
 
-    def _load_auto(self):
+    def _load_auto(self, async_load: bool = False):
         """Load the style settings from the """
         if self._settings is not None:
             return
 
         if os.path.exists("example.ttkstyle"):
-            self._load_file("example.ttkstyle")
+            if async_load:
+                self.load_style_file_async("example.ttkstyle")
+            else:
+                self._load_file("example.ttkstyle")
 
     def _load_file(self, path: str):
-        parser = StyleFile(path)
+        self._apply_file(*self._prepare_file(path))
+
+    @staticmethod
+    def _prepare_file(f: (File, str)) -> Tuple[StyleFile, str, str, List[Tuple[File, str]]]:
+        """
+        Parse a style file and make all the files it refers to available
+
+        This function does not interact with Tcl and may thus be run in
+        a thread other than the one running Tk. The files are made
+        available concurrently by the download threads, which also fetch
+        the files of the other themes in the background, so that they
+        are available when the themes are preloaded. These prefetches
+        are not waited for, see :meth:`Downloader.prefetch`.
+
+        :return: The parsed style file, the path to the theme directory,
+            the theme type and the fonts with available files
+        """
+        parser = StyleFile(resolve(f))
         theme, name, type = parser.theme
-        self.load_theme(theme, type)
-        try:
-            import tkextrafont
-        except ImportError:
-            import warnings
-            warnings.warn("Failed to load tkextrafont - no external fonts will be available", ImportWarning)
-            return
-        for font_tup in parser.fonts:
+        fonts = list(parser.fonts)
+        files = [theme] + [font for font, family in fonts if font is not None]
+        downloader = Downloader.get()
+        futures = [downloader.submit(resolve, file) for file in files]
+        for other, _, _ in parser.themes[1:]:
+            downloader.prefetch(resolve, other)
+        paths = {file: future.result() for file, future in zip(files, futures)}
+        fonts = [(File(paths[font]) if font is not None else None, family) for font, family in fonts]
+        return parser, paths[theme], type, fonts
+
+    def _apply_file(self, parser: StyleFile, theme: str, type: str, fonts: List[Tuple[File, str]]):
+        """Apply a style file prepared with _prepare_file"""
+        self._settings, self._settings_stat = parser, self._stat_file(parser._path)
+        name = self.load_theme(theme, type)
+        for font_tup in fonts:  # load_font warns if tkextrafont is unavailable
             self.load_font(font_tup)
-        styles = parser.styles
+        self._apply_styles(parser.theme_styles(name))
+        self._theme_grid[name] = dict(self._grid_options)
+
+    def load_style_file_async(self, f: (File, str), callback: Callable[[Optional[Exception]], None] = None,
+                              placeholder: str = None, interval: int = 50) -> Future:
+        """
+        Load a style file without blocking the Tk event loop
+
+        The style file is parsed and all files it refers to, such as
+        the theme and fonts, are made available in background threads.
+        Only loading the theme and fonts and configuring the styles is
+        done in the Tk thread, once all files are available. Tk is not
+        thread-safe, so the Tk thread checks for completion with after.
+
+        :param f: Style file specified as File or as path
+        :param callback: Function called in the Tk thread when loading
+            is done, with the exception raised or None upon success. If
+            not given, any exception is raised in the Tk thread.
+        :param placeholder: Name of a theme to use until loading is done
+        :param interval: Time between checks for completion in ms
+        :return: Future for the preparation in the background
+        """
+        if not isinstance(f, File) and not os.path.exists(f):
+            raise TtkStyleFileUnavailable("'{}' not a valid path to an existing file.".format(f))
+        if placeholder is not None:
+            self.set_theme(placeholder)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ttkstyles")
+        future = executor.submit(self._prepare_file, f)
+        executor.shutdown(wait=False)
+        self.tkinst.after(interval, self._finish_async, future, callback, interval)
+        return future
+
+    def _finish_async(self, future: Future, callback: Callable[[Optional[Exception]], None], interval: int):
+        """Apply the prepared style file in the Tk thread once available"""
+        if not future.done():
+            self.tkinst.after(interval, self._finish_async, future, callback, interval)
+            return
+        error = None
+        try:
+            self._apply_file(*future.result())
+        except Exception as e:
+            if callback is None:
+                raise
+            error = e
+        if callback is not None:
+            callback(error)
+
+    def _apply_styles(self, styles: Dict[str, Dict[str, Any]]):
+        """Configure the given styles and register their grid options"""
+        settings, grid = self._split_styles(styles)
+        for style in settings:
+            if style in grid:
+                self._grid_options[style] = grid[style]
+            else:
+                self._grid_options.pop(style, None)
+        self.configure_batch(settings)
+        self._build_grid_index()
+
+    @staticmethod
+    def _split_styles(styles: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Split styles into settings for configure_batch and grid options"""
+        styles = dict(styles)
         if "." in styles:
-            self.configure(".", **styles.pop("."))
+            styles = {".": styles.pop("."), **styles}
+        settings, grid = {}, {}
         for style, options in styles.items():
-            print("Configuring style: {} -> {}".format(style, options))
+            options = dict(options)
             if "grid" in options:
-                self._grid_options[style] = options.pop("grid")
-            self.configure(style, **options)
+                grid[style] = options.pop("grid")
+            settings[style] = {"configure": options}
+        return settings, grid
+
+    def configure_batch(self, settings: Dict[str, Dict[str, Any]]):
+        """
+        Apply the settings for many styles in a single Tcl evaluation
+
+        Instead of a separate call to Tcl for every style, a single
+        script is built for all styles and evaluated at once.
+
+        :param settings: Dictionary of style names with their settings,
+            in the same format as for :meth:`ttk.Style.theme_settings`.
+            Each style may specify the keys ``configure``, ``map``,
+            ``layout`` and ``element create``.
+        """
+        script = self._settings_script(settings)
+        if script:
+            self.tk.eval(script)
+            self._lookup_cache.invalidate()
+
+    @staticmethod
+    def _settings_script(settings: Dict[str, Dict[str, Any]]) -> str:
+        """Build a Tcl script that applies settings to the current theme"""
+        settings = {style: dict(spec) for style, spec in settings.items()}
+        for spec in settings.values():
+            if "configure" in spec:  # An option without value would be a query
+                spec["configure"] = {k: v for k, v in spec["configure"].items() if v is not None}
+        return ttk._script_from_settings(settings)
+
+    def configure(self, style: str, query_opt: str = None, **kw):
+        """Query or set the options of a style like ttk.Style.configure"""
+        result = ttk.Style.configure(self, style, query_opt, **kw)
+        if query_opt is None and len(kw) != 0:
+            self._lookup_cache.invalidate()
+        return result
+
+    def map(self, style: str, query_opt: str = None, **kw):
+        """Query or set the dynamic values of a style like ttk.Style.map"""
+        result = ttk.Style.map(self, style, query_opt, **kw)
+        if query_opt is None and len(kw) != 0:
+            self._lookup_cache.invalidate()
+        return result
+
+    def lookup(self, style: str, option: str, state: Tuple[str, ...] = None, default: Any = None) -> Any:
+        """Return the value of an option for a style using the lookup cache"""
+        return self._lookup_cache.lookup(style, option, state, default)
+
+    @staticmethod
+    def _stat_file(path: str) -> Tuple[int, int]:
+        """Return the modification time and size of a file"""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self, interval: int = 1000):
+        """
+        Watch the loaded style file and reload it when it changes
+
+        Only the parts of the style file that actually changed are
+        applied again: The theme is only loaded again if the ``#theme``
+        section changed, fonts only if their section changed and only
+        the changed selectors are configured.
+
+        :param interval: Time between checks of the file in ms
+        """
+        if self._settings is None:
+            raise TtkStyleException("No style file has been loaded, so there is nothing to watch")
+        self.unwatch()
+        self._watch_id = self.tkinst.after(interval, self._watch_file, interval)
+
+    def unwatch(self):
+        """Stop watching the loaded style file for changes"""
+        if self._watch_id is not None:
+            self.tkinst.after_cancel(self._watch_id)
+            self._watch_id = None
+
+    def _watch_file(self, interval: int):
+        """
+        Reload the style file if it changed and schedule the next check
+
+        A changed file is only reloaded once its stat is unchanged for
+        one more interval, so that a file still being written by an
+        editor is not parsed. If reloading fails, the error is logged and
+        the file is watched for the next change.
+        """
+        try:
+            stat = self._stat_file(self._settings._path)
+        except OSError:  # File is (temporarily) unavailable while being written
+            stat = self._settings_stat
+        try:
+            if stat == self._settings_stat:
+                self._watch_stat = None
+            elif stat != self._watch_stat:
+                self._watch_stat = stat
+            else:
+                self._watch_stat, self._settings_stat = None, stat
+                try:
+                    self._reload_file()
+                except Exception as e:
+                    self.logger.error("Failed to reload style file '{}': {}".format(self._settings._path, e))
+        finally:
+            self._watch_id = self.tkinst.after(interval, self._watch_file, interval)
+
+    def _reload_file(self):
+        """Parse the loaded style file again and apply only the changes"""
+        path = self._settings._path
+        old, new, stat = self._settings, StyleFile(path), self._stat_file(path)
+        current = self.tk.call("ttk::style", "theme", "use")
+
+        theme_changed = old._config.get("#theme") != new._config.get("#theme")
+        if theme_changed:
+            theme, name, type = new.theme
+            current = self.load_theme(theme, type)
+
+        for section, options in new._config.items():
+            if section.startswith("#font.") and old._config.get(section) != options:
+                self.load_font(new.font(section))
+
+        old_styles, new_styles = old.theme_styles(current), new.theme_styles(current)
+        for style in set(old_styles) - set(new_styles):
+            # ttk does not support removing options from a style, but
+            # the grid options are managed by this class.
+            self._grid_options.pop(style, None)
+        if theme_changed:  # Style settings are specific to a theme
+            changed = new_styles
+        else:
+            changed = {k: v for k, v in new_styles.items() if old_styles.get(k) != v}
+        self._apply_styles(changed)
+        self._theme_grid[current] = dict(self._grid_options)
+        self._settings, self._settings_stat = new, stat
+        # Preloaded themes are only compiled again, not activated
+        for name in list(self._theme_grid):
+            if name != current:
+                self._compile_theme(name)
 
     def load_style_file(self, f: (File, str)):
         """Load style settings from example.ttkstyle file specified as File or as path"""
@@ -223,28 +516,146 @@ class Style(ttk.Style, metaclass=TkSingleton):
         """Load a style based on specific settings"""
         raise NotImplementedError()
 
-    def load_theme(self, f: (File, str), type: str):
-        """Load a theme from a directory"""
-        if not isinstance(f, File) and not (os.path.exists(f) and os.path.isdir(f)):
+    def load_theme(self, f: (File, str), type: str) -> str:
+        """Load a theme from a directory and return its name"""
+        if not isinstance(f, File) and not isdir(f):
             raise TtkStyleException("'{}' is not a valid path to a directory.".format(f))
 
         if isinstance(f, File):
             f = f.abspath
 
-        if not os.path.exists(f) or not os.path.isdir(f):
+        if not isdir(f):
             raise TtkStyleException("'{}' did not yield a valid theme directory.")
 
         return self._load_theme(f, type)
 
-    def _load_theme(self, path: str, type: str):
-        """Load a theme from a specified directory"""
+    def _load_theme(self, path: str, type: str) -> str:
+        """Load a theme from a specified directory and activate it"""
+        theme = self._source_theme(path, type)
+        self.set_theme(theme)
+        return theme
+
+    def _source_theme(self, path: str, type: str) -> str:
+        """Load a theme from a specified directory without activating it"""
         if type not in LOADERS:
             raise TtkStyleException("Invalid theme type specified '{}'".format(type))
 
         loader = LOADERS[type](self.tk, path)
-        theme = loader.load()
+        with ThemeRecorder(self.tk) as recording:
+            theme = loader.load()
+        # A theme that was loaded before is not defined again
+        if len(recording.themes) != 0 or theme not in self._recordings:
+            self._recordings[theme] = recording
+        return theme
+
+    def preload_themes(self, themes: List[Tuple[Union[File, str], str]] = None,
+                       callback: Callable[[Optional[Exception]], None] = None, interval: int = 50) -> List[Future]:
+        """
+        Load themes in the background so that switching to them is fast
+
+        The files of the themes are made available in background
+        threads, after which the themes are loaded one by one when Tk is
+        idle. The style file is compiled for each theme and applied to
+        its settings when the theme is loaded, so that switching to a
+        preloaded theme with :meth:`set_theme` is a single Tcl call.
+
+        :param themes: List of tuples of theme File or path and theme
+            type. Defaults to all themes in the loaded style file.
+        :param callback: Function called in the Tk thread when all
+            themes have been loaded, with the exception raised or None
+            upon success. If not given, any exception is raised in the
+            Tk thread.
+        :param interval: Time between checks for available files in ms
+        :return: List of Futures for the theme directories
+        """
+        if themes is None:
+            if self._settings is None:
+                raise TtkStyleException("No style file has been loaded, so there are no themes to preload")
+            themes = [(f, type) for f, name, type in self._settings.themes]
+        executor = ThreadPoolExecutor(max_workers=max(len(themes), 1), thread_name_prefix="ttkstyles")
+        pending = [(executor.submit(resolve, f), type) for f, type in themes]
+        executor.shutdown(wait=False)
+        self.tkinst.after(interval, self._preload_next, pending, callback, interval)
+        return [future for future, type in pending]
+
+    def _preload_next(self, pending: List[Tuple[Future, str]], callback: Callable, interval: int):
+        """Schedule loading the next theme when its files are available"""
+        if len(pending) == 0:
+            if callback is not None:
+                callback(None)
+        elif not pending[0][0].done():
+            self.tkinst.after(interval, self._preload_next, pending, callback, interval)
+        else:
+            self.tkinst.after_idle(self._preload_pending, pending, callback, interval)
+
+    def _preload_pending(self, pending: List[Tuple[Future, str]], callback: Callable, interval: int):
+        """Load the first pending theme and continue with the next"""
+        future, type = pending[0]
+        try:
+            self.preload_theme(future.result(), type)
+        except Exception as e:
+            if callback is None:
+                raise
+            return callback(e)
+        self._preload_next(pending[1:], callback, interval)
+
+    def preload_theme(self, f: (File, str), type: str) -> str:
+        """
+        Load a theme and apply the loaded style file to it without
+        activating it. See :meth:`preload_themes`.
 
-        self.set_theme(theme)
+        :return: Name of the loaded theme
+        """
+        if isinstance(f, File):
+            f = f.abspath
+        if not isdir(f):
+            raise TtkStyleException("'{}' is not a valid path to a directory.".format(f))
+        theme = self._source_theme(f, type)
+        self._compile_theme(theme)
+        return theme
+
+    def _compile_theme(self, theme: str):
+        """Apply the style file to the settings of a theme that is not active"""
+        styles = self._settings.theme_styles(theme) if self._settings is not None else {}
+        settings, grid = self._split_styles(styles)
+        script = self._settings_script(settings)
+        if script:
+            self.tk.call("ttk::style", "theme", "settings", theme, script)
+        self._theme_grid[theme] = grid
+
+    def snapshot(self, path: str):
+        """
+        Write the resolved state of the active theme to a snapshot file
+
+        The snapshot contains the element definitions, layouts, style
+        configuration, maps and image data of the theme, including the
+        changes made by the loaded style file. With :meth:`restore`, a
+        snapshot can be used instead of loading the theme, which does
+        not require any of the theme files.
+
+        :param path: Path to write the snapshot file to
+        """
+        theme = self.tk.call("ttk::style", "theme", "use")
+        if theme not in self._recordings:
+            raise TtkStyleException("Theme '{}' was not loaded by this Style and can thus not be snapshot".format(theme))
+        styles = self._settings.styles.keys() if self._settings is not None else ()
+        ThemeSnapshot.take(self.tk, theme, self._recordings[theme], styles).save(path)
+
+    def restore(self, path: str) -> str:
+        """
+        Restore the state of a theme from a snapshot file and apply it
+
+        The state of the theme is rebuilt with a single Tcl evaluation,
+        without loading the theme or any of its files.
+
+        :param path: Path to a file written by :meth:`snapshot`
+        :return: Name of the restored theme
+        """
+        snapshot = ThemeSnapshot.load(path)
+        snapshot.restore(self.tk)
+        self._recordings[snapshot.theme] = snapshot
+        self.set_theme(snapshot.theme)
+        return snapshot.theme
 
     def load_font(self, font: Tuple[File, str]):
         """
@@ -262,7 +673,7 @@ class Style(ttk.Style, metaclass=TkSingleton):
                 import warnings
                 warnings.warn("Failed to load font support", ImportWarning)
                 return
-            font = tkextrafont.Font(file=f.abspath)
+            font = tkextrafont.Font(file=local_path(f.abspath))
             if not font.is_font_available(family):
                 raise TtkStyleException("Specified font file did not provide specified font family")
 
@@ -270,9 +681,86 @@ class Style(ttk.Style, metaclass=TkSingleton):
         """Set the currently applied theme to a specific theme name"""
         name = name.split("::")[-1]
         self.tk.call("ttk::setTheme", name)
+        # The style file has been applied to the settings of the theme
+        # already, but the grid options are not part of a theme
+        grid = self._theme_grid.get(name, None)
+        if grid is not None and grid != self._grid_options:
+            self._grid_options.clear()
+            self._grid_options.update(grid)
+        self._lookup_cache.invalidate()
 
     theme_use = set_theme
 
+    def _register_label(self, label: ttk.Label, style: Optional[str]):
+        """Register a label to restyle when the settings of its style change"""
+        previous = self._label_styles.pop(label, None)
+        if previous is not None:
+            self._labels[previous].discard(label)
+        if style is not None:
+            self._label_styles[label] = style
+            self._labels.setdefault(style, weakref.WeakSet()).add(label)
+
+    def _schedule_restyle(self):
+        """Restyle the registered labels once the event loop is idle"""
+        if self._restyle_id is None and len(self._labels) != 0:
+            self._restyle_id = self.tkinst.after_idle(self._restyle_labels)
+
+    def _restyle_labels(self):
+        """
+        Update the font and foreground of all registered labels
+
+        The options are looked up once per style rather than for every
+        label and all labels are configured in a single evaluation.
+        """
+        self._restyle_id = None
+        commands = []
+        for style, labels in list(self._labels.items()):
+            if len(labels) == 0:
+                del self._labels[style]
+                continue
+            font = self._lookup_cache.lookup(style, "font")
+            foreground = self._lookup_cache.lookup(style, "foreground")
+            for label in labels:
+                # Labels may have been destroyed without being collected
+                commands.append("catch {{{}}}".format(
+                    tk._join((label._w, "configure", "-font", font, "-foreground", foreground))))
+        if len(commands) != 0:
+            self.tk.eval("\n".join(commands))
+
+    def grid_defaults(self, widget: tk.Grid) -> Dict[str, Any]:
+        """
+        Return the default grid options for a widget
+
+        The options are resolved from the style hierarchy of the widget
+        only once and are stored in an index until the grid options
+        change. The returned dictionary must not be modified.
+        """
+        if not isinstance(widget, ttk.Widget):
+            return {}
+        key = widget.cget("style")
+        if not key:
+            key = (widget.__class__, str(widget.cget("orient")) if isinstance(widget, self.ORIENTED) else None)
+        try:
+            return self._grid_index[key]
+        except KeyError:
+            pass
+        style = key if isinstance(key, str) else Style.root_style(widget)
+        options = self._grid_index[key] = self._resolve_grid_options(style)
+        return options
+
+    def _resolve_grid_options(self, style: str) -> Dict[str, Any]:
+        """Merge the grid options of all styles in the hierarchy of a style"""
+        options = {}
+        for name in Style.style_hierarchy(style):
+            if name in self._grid_options:
+                options.update(self._grid_options[name])
+        return options
+
+    def _build_grid_index(self):
+        """Resolve the grid options for all styles with grid options"""
+        for style in self._grid_options:
+            self._grid_index[style] = self._resolve_grid_options(style)
+
     @staticmethod
     def style_hierarchy(style_name: str) -> Tuple[str]:
         elements = style_name.split(".")
@@ -288,7 +776,7 @@ class Style(ttk.Style, metaclass=TkSingleton):
     def root_style(widget: tk.BaseWidget) -> str:
         """Return the root style for a widget"""
         # TODO: LabeledScale?
-        orientation = (ttk.Scrollbar, ttk.Scale, ttk.Separator)
+        orientation = Style.ORIENTED
         without_t = (ttk.Treeview,)
         # Walk the MRO
         cls = None
@@ -307,20 +795,22 @@ class Style(ttk.Style, metaclass=TkSingleton):
 
 def _label_option_updater(inst, _, value):
     """Hook into ttk.Widget for ttk.Label to have an updated font with a style"""
-    if not isinstance(inst, ttk.Label):
-        return getattr(ttk.Widget, hooks.generate_hook_name({"style": None})).original_configure(inst, option=value)
-    style = ttk.Style(inst)
-    if value is not None:
-        inst.configure(font=style.lookup(value, "font"), foreground=style.lookup(value, "foreground"))
+    if value is None:
+        # A label without a style of its own is no longer restyled
+        if isinstance(inst, ttk.Label):
+            Style(inst)._register_label(inst, None)
+        return
+    configure = getattr(ttk.Widget, hooks.generate_hook_name({"style": None})).original_configure
+    configure(inst, style=value)
+    if isinstance(inst, ttk.Label):
+        Style(inst)._register_label(inst, value)
+        cache = LookupCache.get(inst)
+        configure(inst, font=cache.lookup(value, "font"), foreground=cache.lookup(value, "foreground"))
 
 
 def _hook_grid_configure(inst, cnf={}, **kwargs):
     cnf = tk._cnfmerge((cnf, kwargs))
-    options = {}
-    style_inst = Style(inst)
-    root = inst.cget("style") or Style.root_style(inst)
-    for style in Style.style_hierarchy(root):
-        if style in style_inst._grid_options:
-            options.update(style_inst._grid_options[style])
-    options.update(cnf)
-    return inst._original_grid(**options)
+    options = Style(inst).grid_defaults(inst)
+    if len(options) != 0:
+        cnf = dict(options, **cnf)
+    return inst._original_grid(**cnf)
@@ -6,6 +6,9 @@ Copyright (c) 2020 RedFantom
 # Standard Library
 import tkinter as tk
 from typing import List, Tuple, Optional
+# Project Modules
+from ..capabilities import ThemeCapabilities
+from ..exceptions import TtkStyleException
 
 
 class ThemeLoader(object):
@@ -18,6 +21,8 @@ class ThemeLoader(object):
         """
         self._tk = tkinterp
         self._path = path
+        # Name of the theme, set by the loader once loaded
+        self._theme = None
 
     def load(self) -> str:
         """Load the theme from the specified directory and return theme name"""
@@ -25,7 +30,9 @@ class ThemeLoader(object):
 
     def supports_extras(self) -> List[str]:
         """Return a list of the names of the extra widgets supported by this theme"""
-        raise NotImplementedError()
+        if self._theme is None:
+            raise TtkStyleException("Theme from '{}' must be loaded to determine its extras".format(self._path))
+        return ThemeCapabilities(self._tk, self._theme).extras
 
     @staticmethod
     def is_loader_capable(path: str) -> bool:
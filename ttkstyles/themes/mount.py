@@ -0,0 +1,304 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import base64
+from fnmatch import fnmatchcase
+import os
+import re
+import time
+import tkinter as tk
+from typing import Dict, List, Tuple
+# Project Modules
+from ..archive import ArchiveIndex, find_member
+from ..logger import get_logger
+
+
+class _MemoryChannels(object):
+    """
+    Handler of the Tcl channels that read files from memory
+
+    Tcl calls the handler of a channel created with ``chan create`` for
+    every operation on the channel. A single handler serves all channels
+    of an interpreter and outlives the ArchiveMount that opened them, so
+    that channels may be closed after loading.
+    """
+
+    COMMAND = "::ttkstyles::memory_channel"
+
+    _handlers: Dict[int, "_MemoryChannels"] = {}
+
+    def __init__(self):
+        # Contents and position of every open channel
+        self._channels: Dict[str, List] = {}
+        self._pending = b""
+
+    @classmethod
+    def open(cls, tkinterp, data: bytes, binary: bool) -> str:
+        """Return a new readable channel for data"""
+        handler = cls._handlers.get(tkinterp.interpaddr(), None)
+        if handler is None or not tkinterp.call("info", "commands", cls.COMMAND):
+            handler = cls._handlers[tkinterp.interpaddr()] = cls()
+            tkinterp.eval("namespace eval ::ttkstyles {}")
+            tkinterp.createcommand(cls.COMMAND, handler)
+        handler._pending = data
+        channel = tkinterp.call("chan", "create", "read", cls.COMMAND)
+        if binary:
+            tkinterp.call("chan", "configure", channel, "-translation", "binary")
+        return channel
+
+    def __call__(self, command: str, channel: str, *args):
+        if command == "initialize":
+            self._channels[channel], self._pending = [self._pending, 0], b""
+            return "initialize finalize watch read seek"
+        elif command == "finalize":
+            del self._channels[channel]
+        elif command == "read":
+            state = self._channels[channel]
+            data = state[0][state[1]:state[1] + int(args[0])]
+            state[1] += len(data)
+            return data
+        elif command == "seek":
+            state = self._channels[channel]
+            position = {"start": 0, "current": state[1], "end": len(state[0])}[args[1]] + int(args[0])
+            if position < 0:
+                raise tk.TclError("error during seek on \"{}\": invalid argument".format(channel))
+            state[1] = position
+            return position
+        return ""
+
+
+class ArchiveMount(object):
+    """
+    Serve the files in archives to Tcl scripts while loading a theme
+
+    Tcl 8.6 offers no virtual file system that can be provided from
+    Python, so the commands themes use to access their files are replaced
+    for the duration of the context. Paths that point into an archive, as
+    returned by ZippedFile when it does not extract, are served from the
+    index of the archive. The following uses are supported:
+
+    - ``source``, evaluating the script from memory
+    - ``image create photo|bitmap`` with ``-file`` or ``-maskfile``,
+      creating the image from its data
+    - ``glob`` with the ``-directory``, ``-path``, ``-join``, ``-tails``,
+      ``-nocomplain`` and ``-types`` options, for patterns that span
+      multiple folders as well
+    - ``open`` for reading, from memory through a reflected channel
+    - ``file`` to query paths: ``exists``, ``isfile``, ``isdirectory``,
+      ``readable``, ``writable``, ``executable``, ``size``, ``type`` and
+      ``mtime``, as well as the subcommands that only operate on the path
+      string, such as ``join`` and ``dirname``
+
+    Any other use of a path in an archive, such as opening a file for
+    writing, raises a Tcl error and logs a warning, as such a theme must
+    be extracted. All other calls are passed on to the original commands.
+    """
+
+    COMMANDS = ("source", "image", "glob", "open", "file")
+
+    # Subcommands of file that do not access the file system
+    PATH_SUBCOMMANDS = {"dirname", "extension", "join", "nativename", "normalize", "pathtype", "rootname",
+                        "separator", "split", "tail"}
+    # Access modes of open that only read
+    READ_MODES = {"r", "rb"}
+    READ_FLAGS = {"RDONLY", "BINARY", "NOCTTY", "NONBLOCK"}
+
+    def __init__(self, tkinterp):
+        self.logger = get_logger(__class__.__name__)
+        self._tk = tkinterp
+        self._namespace = "::ttkstyles::mount{}".format(id(self))
+        self._replaced: List[str] = []
+
+    def _original(self, command: str) -> str:
+        return "{}::{}".format(self._namespace, command)
+
+    def __enter__(self):
+        self._tk.eval("namespace eval {} {{}}".format(self._namespace))
+        for command in self.COMMANDS:
+            if not self._tk.call("info", "commands", "::{}".format(command)):
+                continue  # The image command requires Tk
+            self._tk.call("rename", "::{}".format(command), self._original(command))
+            self._tk.createcommand("::{}".format(command), getattr(self, "_{}".format(command)))
+            self._replaced.append(command)
+        return self
+
+    def __exit__(self, *args):
+        while len(self._replaced) != 0:
+            command = self._replaced.pop()
+            self._tk.deletecommand("::{}".format(command))
+            self._tk.call("rename", self._original(command), "::{}".format(command))
+        self._tk.call("namespace", "delete", self._namespace)
+
+    def _call(self, command: str, args: Tuple[str, ...]):
+        return self._tk.call(self._original(command), *args)
+
+    def _unsupported(self, command: str, path: str):
+        """Report a use of a path in an archive that cannot be served"""
+        self.logger.warning("'{}' is not supported for '{}' in an archive, extract the theme instead".format(
+            command, path))
+        raise tk.TclError("{} is not supported for \"{}\" in an archive".format(command, path))
+
+    def _source(self, *args):
+        member = find_member(args[-1]) if len(args) != 0 else None
+        if member is None:
+            return self._call("source", args)
+        index, path = member
+        script = index.read(path).decode()
+        previous = self._tk.call("info", "script")
+        self._tk.call("info", "script", args[-1])
+        try:
+            return self._tk.eval(script)
+        finally:
+            self._tk.call("info", "script", previous)
+
+    def _image(self, *args):
+        if args[:1] == ("create",) and len(args) > 1 and args[1] in ("photo", "bitmap"):
+            # The name of the image is optional, options come in pairs
+            start = 3 if len(args) % 2 == 1 else 2
+            options = list(args)
+            for i in range(start, len(options) - 1, 2):
+                member = find_member(options[i + 1]) if options[i] in ("-file", "-maskfile") else None
+                if member is None:
+                    continue
+                index, path = member
+                data = index.read(path)
+                if args[1] == "photo":
+                    options[i:i + 2] = ["-data", base64.b64encode(data).decode()]
+                else:  # Bitmaps are given as text
+                    options[i:i + 2] = [options[i].replace("file", "data"), data.decode()]
+            args = tuple(options)
+        return self._call("image", args)
+
+    def _glob(self, *args):
+        options, patterns = self._glob_options(args)
+        if "-join" in options:
+            patterns = ["/".join(patterns)]
+        directory = options.get("-directory", None)
+        searches = []
+        for pattern in patterns:
+            if directory is not None:
+                member = find_member(directory)
+                if member is None:
+                    return self._call("glob", args)
+                # Matched from the folder, returned relative to the directory
+                index, folder = member
+                searches.append((index, folder, pattern, folder, directory))
+                continue
+            member = find_member(options.get("-path", "") + pattern)
+            if member is None:
+                return self._call("glob", args)
+            # Matched from the root of the archive, tails relative to the folder of the prefix
+            index, pattern = member
+            prefix = find_member(options["-path"])[1] if "-path" in options else ""
+            searches.append((index, "", pattern, prefix.rsplit("/", 1)[0] if "/" in prefix else "", index.path))
+
+        types = options.get("-types", "")
+        matches = []
+        for index, start, pattern, base, root in searches:
+            for path in self._glob_members(index, start, pattern):
+                if ("d" in types and not index.is_dir(path)) or ("f" in types and index.is_dir(path)):
+                    continue
+                if "-tails" in options:
+                    matches.append(path[len(base):].strip("/"))
+                else:
+                    matches.append(os.path.join(root, *path[len(start):].strip("/").split("/")))
+        if len(matches) == 0 and "-nocomplain" not in options:
+            raise tk.TclError("no files matched glob pattern{} \"{}\"".format(
+                "s" if len(patterns) > 1 else "", " ".join(patterns)))
+        return tuple(matches)
+
+    @staticmethod
+    def _glob_options(args: Tuple[str, ...]) -> Tuple[dict, List[str]]:
+        """Split the arguments to glob into its options and patterns"""
+        options, i = {}, 0
+        while i < len(args) and args[i].startswith("-"):
+            if args[i] == "--":
+                i += 1
+                break
+            elif args[i] in ("-directory", "-path", "-types"):
+                options[args[i]] = args[i + 1]
+                i += 2
+            else:
+                options[args[i]] = None
+                i += 1
+        return options, list(args[i:])
+
+    @classmethod
+    def _glob_members(cls, index: ArchiveIndex, start: str, pattern: str) -> List[str]:
+        """Return the members that match a pattern relative to start, folder by folder"""
+        matches = []
+        for expanded in cls._expand_braces(pattern):
+            candidates = [start.strip("/")]
+            for part in [part for part in expanded.split("/") if part not in ("", ".")]:
+                found = []
+                for candidate in candidates:
+                    if not re.search(r"[*?\[]", part):
+                        path = "/".join((candidate, part)).strip("/")
+                        if index.exists(path):
+                            found.append(path)
+                        continue
+                    for name in index.listdir(candidate):
+                        if fnmatchcase(name, part):
+                            found.append("/".join((candidate, name)).strip("/"))
+                candidates = found
+            matches.extend(path for path in candidates if path not in matches)
+        return matches
+
+    @classmethod
+    def _expand_braces(cls, pattern: str) -> List[str]:
+        """Expand the alternatives in braces of a glob pattern"""
+        match = re.search(r"{([^{}]*)}", pattern)
+        if match is None:
+            return [pattern]
+        expanded = []
+        for alternative in match.group(1).split(","):
+            expanded.extend(cls._expand_braces(pattern[:match.start()] + alternative + pattern[match.end():]))
+        return expanded
+
+    def _open(self, *args):
+        member = find_member(args[0]) if len(args) != 0 else None
+        if member is None:
+            return self._call("open", args)
+        access = args[1] if len(args) > 1 else "r"
+        flags = set(self._tk.splitlist(access))
+        if access not in self.READ_MODES and not ("RDONLY" in flags and flags.issubset(self.READ_FLAGS)):
+            self._unsupported("open {}".format(access), args[0])
+        index, path = member
+        if index.is_dir(path):
+            raise tk.TclError("couldn't open \"{}\": illegal operation on a directory".format(args[0]))
+        return _MemoryChannels.open(self._tk, index.read(path), access == "rb" or "BINARY" in flags)
+
+    def _file(self, *args):
+        if len(args) == 0 or args[0] in self.PATH_SUBCOMMANDS:
+            return self._call("file", args)
+        members = [(arg, find_member(arg)) for arg in args[1:]]
+        members = [(arg, member) for arg, member in members if member is not None]
+        if len(members) == 0:
+            return self._call("file", args)
+        if len(args) != 2:
+            self._unsupported("file {}".format(args[0]), members[0][0])
+        index, path = members[0][1]
+        command = args[0]
+        if command in ("exists", "readable"):
+            return index.exists(path)
+        elif command == "isdirectory":
+            return index.is_dir(path)
+        elif command == "isfile":
+            return index.exists(path) and not index.is_dir(path)
+        elif command in ("writable", "executable"):
+            return False
+        elif command not in ("size", "type", "mtime"):
+            self._unsupported("file {}".format(command), args[1])
+        elif not index.exists(path):
+            raise tk.TclError("could not read \"{}\": no such file or directory".format(args[1]))
+        info = index.members.get(path.strip("/"), None)
+        if command == "type":
+            return "file" if info is not None else "directory"
+        elif info is None:  # Folders have no size or time of their own in archives
+            return 0
+        elif command == "size":
+            return info.file_size
+        return int(time.mktime(info.date_time + (0, 0, -1)))
@@ -0,0 +1,191 @@
+"""
+Author: RedFantom
+License: GNU GPLv3
+Copyright (c) 2021 RedFantom
+"""
+# Standard Library
+import base64
+import json
+import tkinter as tk
+from typing import Dict, Iterable, List, Optional, Tuple
+# Project Modules
+from ..exceptions import TtkStyleException
+
+
+class ThemeRecorder(object):
+    """
+    Record the Tcl commands that define themes while they are loaded
+
+    Not all of the state of a theme can be queried from Tcl: There is
+    no way to retrieve the definition of an element, for example.
+    Therefore, the ``ttk::style`` and ``image`` commands are traced
+    while a theme is loaded. The recorded commands have all of their
+    arguments substituted, so they can be replayed without the
+    variables, procedures and files the theme scripts use.
+    """
+
+    def __init__(self, tkinterp):
+        self._tk = tkinterp
+        self._command = "ttkstyles_record_{}".format(id(self))
+        # Themes created in order with their parent themes
+        self.themes: List[Tuple[str, Optional[str]]] = []
+        # Commands with the theme they were executed for
+        self.commands: List[Tuple[str, Tuple[str, ...]]] = []
+        self.images: List[str] = []
+        # Themes of the 'theme settings' scripts being executed
+        self._stack: List[str] = []
+        self._current = None
+
+    def __enter__(self):
+        self._current = self._tk.call("ttk::style", "theme", "use")
+        self._tk.createcommand(self._command, self._trace)
+        self._tk.call("trace", "add", "execution", "::ttk::style", ("enter", "leave"), self._command)
+        self._tk.call("trace", "add", "execution", "::image", "leave", self._command)
+        return self
+
+    def __exit__(self, *args):
+        self._tk.call("trace", "remove", "execution", "::ttk::style", ("enter", "leave"), self._command)
+        self._tk.call("trace", "remove", "execution", "::image", "leave", self._command)
+        self._tk.deletecommand(self._command)
+
+    def _trace(self, *args):
+        """Callback for the execution traces"""
+        command, op = tuple(map(str, self._tk.splitlist(args[0]))), args[-1]
+        if command[0].split("::")[-1] == "image":
+            # Leave trace: command string, code, result, operation
+            if len(command) > 2 and command[1] == "create" and str(args[1]) == "0":
+                self.images.append(str(args[2]))
+            return
+        args = command[1:]
+        if args[:2] in (("theme", "create"), ("theme", "settings")):
+            if op == "enter":
+                if args[1] == "create":
+                    options = dict(zip(args[3::2], args[4::2]))
+                    self.themes.append((args[2], options.get("-parent", None)))
+                self._stack.append(args[2])
+            else:
+                self._stack.pop()
+        elif args[:2] == ("theme", "use") and len(args) > 2:
+            self._current = args[2]
+        elif op == "enter" and self.is_definition(args):
+            self.commands.append((self._stack[-1] if len(self._stack) != 0 else self._current, args))
+
+    @staticmethod
+    def is_definition(args: Tuple[str, ...]) -> bool:
+        """Return whether the arguments to ttk::style modify a theme"""
+        if len(args) == 0:
+            return False
+        elif args[0] in ("configure", "map"):
+            return len(args) > 3
+        elif args[0] == "layout":
+            return len(args) > 2
+        elif args[0] == "element":
+            return len(args) > 1 and args[1] == "create"
+        return False
+
+
+class ThemeSnapshot(object):
+    """
+    Fully resolved state of a theme that can be restored in one go
+
+    A snapshot consists of the themes that have to be created, the
+    commands recorded while loading them, the resolved configuration
+    of the styles of the theme and the data of all images created.
+    Restoring a snapshot is a single Tcl evaluation and requires none
+    of the files of the theme.
+    """
+
+    VERSION = 1
+
+    def __init__(self, theme: str, themes: List[Tuple[str, Optional[str]]],
+                 commands: List[Tuple[str, Tuple[str, ...]]], images: Dict[str, str], patchlevel: str):
+        self.theme = theme
+        self.themes = [tuple(t) for t in themes]
+        self.commands = [(t, tuple(c)) for t, c in commands]
+        self.images = images
+        self.patchlevel = patchlevel
+
+    @classmethod
+    def take(cls, tkinterp, theme: str, recording, styles: Iterable[str] = ()) -> "ThemeSnapshot":
+        """
+        Build a snapshot of a theme from a recording of its definition
+
+        :param tkinterp: Tcl interpreter the theme is loaded in
+        :param theme: Name of the theme, which must be the active theme
+        :param recording: ThemeRecorder or ThemeSnapshot with the
+            commands that created the theme
+        :param styles: Names of additional styles to include the
+            configuration of, for example those of a style file
+        """
+        commands = list(recording.commands)
+        # The configuration of styles may have been changed since the
+        # theme was loaded, so their resolved state is included too
+        styles = set(styles) | {args[1] for t, args in commands if t == theme and args[0] != "element"}
+        for style in sorted(styles):
+            for query in ("configure", "map"):
+                options = tuple(map(str, tkinterp.splitlist(tkinterp.call("ttk::style", query, style))))
+                if len(options) != 0:
+                    commands.append((theme, (query, style) + options))
+
+        images = {}
+        for name in recording.images:
+            try:
+                if tkinterp.call("image", "type", name) != "photo":
+                    continue
+                data = tkinterp.call(name, "data", "-format", "png")
+            except tk.TclError:  # Image has been deleted since
+                continue
+            if isinstance(data, bytes):
+                data = base64.b64encode(data).decode()
+            images[name] = str(data)
+
+        return cls(theme, recording.themes, commands, images, tkinterp.call("info", "patchlevel"))
+
+    def script(self) -> str:
+        """Build the Tcl script that restores the state of the theme"""
+        lines = []
+        for name, data in self.images.items():
+            lines.append(tk._join(("image", "create", "photo", name, "-format", "png", "-data", data)))
+        for name, parent in self.themes:
+            create = ("ttk::style", "theme", "create", name) + (("-parent", parent) if parent else ())
+            lines.append("if {{[lsearch -exact [ttk::style theme names] {}] < 0}} {{{}}}".format(
+                tk._stringify(name), tk._join(create)))
+        # Group subsequent commands for the same theme into one block
+        blocks: List[Tuple[str, List[str]]] = []
+        for theme, args in self.commands:
+            if len(blocks) == 0 or blocks[-1][0] != theme:
+                blocks.append((theme, []))
+            blocks[-1][1].append(tk._join(("ttk::style",) + args))
+        for theme, commands in blocks:
+            lines.append("ttk::style theme settings {} {{\n{}\n}}".format(tk._stringify(theme), "\n".join(commands)))
+        return "\n".join(lines)
+
+    def restore(self, tkinterp):
+        """Restore the state of the theme in a single Tcl evaluation"""
+        patchlevel = tkinterp.call("info", "patchlevel")
+        if patchlevel != self.patchlevel:
+            raise TtkStyleException("Snapshot of '{}' was taken with Tcl {}, not {}".format(
+                self.theme, self.patchlevel, patchlevel))
+        tkinterp.eval(self.script())
+
+    def save(self, path: str):
+        """Write the snapshot to a file"""
+        data = {
+            "version": self.VERSION,
+            "theme": self.theme,
+            "themes": self.themes,
+            "commands": self.commands,
+            "images": self.images,
+            "patchlevel": self.patchlevel,
+        }
+        with open(path, "w") as fo:
+            json.dump(data, fo, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "ThemeSnapshot":
+        """Read a snapshot from a file"""
+        with open(path) as fi:
+            data = json.load(fi)
+        if data.get("version") != cls.VERSION:
+            raise TtkStyleException("Unsupported theme snapshot version in '{}'".format(path))
+        return cls(data["theme"], data["themes"], data["commands"], data["images"], data["patchlevel"])
@@ -6,10 +6,12 @@ Copyright (c) 2020 RedFantom
 # Standard Library
 import os
 import tkinter as tk
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 # Project Modules
+from ..archive import find_member, listdir
 from ..exceptions import TtkStyleException
 from .loader import ThemeLoader
+from .mount import ArchiveMount
 from ..utils import chdir, first, subtup
 
 
@@ -21,30 +23,38 @@ class TclThemeLoader(ThemeLoader):
         entry = self._find_entry_point(self._path)
         if entry is None:
             raise TtkStyleException("Could not find entry point for Tcl theme in '{}'".format(self._path))
-        # Some Tcl packages depend on the working directory being the
-        # directory that the script is in. Sometimes, Tcl scripts may
-        # change their working directory, and we want to guarantee that
-        # after execution of this code it is is the same as before.
-        with chdir(self._path):
+        if find_member(self._path) is not None:
+            # Themes in an archive are served from it while they are loaded
+            context = ArchiveMount(self._tk)
+            entry = os.path.join(self._path, entry)
+        else:
+            # Some Tcl packages depend on the working directory being the
+            # directory that the script is in. Sometimes, Tcl scripts may
+            # change their working directory, and we want to guarantee that
+            # after execution of this code it is is the same as before.
+            context = chdir(self._path)
+        with context:
             try:
                 # Often, Tcl packages refer to a variable named 'dir'
                 # This is expected to be a string containing the abspath
                 # to the directory the script being evaluated is in
-                self._tk.eval("set dir {}".format(self._path))
+                self._tk.call("set", "dir", self._path)
 
-                self._tk.eval("source {}".format(entry))
+                self._tk.call("source", entry)
             except tk.TclError as e:
                 message, = e.args
                 if "already exists" in message:
-                    return message.split(" ")[1]
+                    self._theme = message.split(" ")[1]
+                    return self._theme
                 else:
                     raise
-        pkg = subtup(self._loaded_pkgs, packages)
-        theme = first(pkg)
-        if theme is None:
-            raise TtkStyleException("Loading '{}' from '{}' did not yield a theme. Is there a package provide line?"
-                .format(entry, self._path))
-        self._tk.call("package", "require", "ttk::theme::{}".format(theme))
+            pkg = subtup(self._loaded_pkgs, packages)
+            theme = first(pkg)
+            if theme is None:
+                raise TtkStyleException("Loading '{}' from '{}' did not yield a theme. Is there a package provide line?"
+                    .format(entry, self._path))
+            self._tk.call("package", "require", "ttk::theme::{}".format(theme))
+        self._theme = theme
         return theme
         
     @property
@@ -55,12 +65,9 @@ class TclThemeLoader(ThemeLoader):
     def _find_entry_point(path: str) -> Optional[str]:
         path = path.rstrip(os.sep)
         candidates = ["pkgIndex.tcl", "{}.tcl".format(os.path.basename(path))]
-        actual = [c for c in candidates if c in os.listdir(path)]
+        actual = [c for c in candidates if c in listdir(path)]
         return first(actual)
 
-    def supports_extras(self) -> List[str]:
-        raise NotImplementedError()
-
     @staticmethod
     def is_loader_capable(path: str) -> bool:
         return TclThemeLoader._find_entry_point(path) is not None
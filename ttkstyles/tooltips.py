@@ -20,15 +20,34 @@ try:
 except ImportError:
     import tkinter as tk
     from tkinter import ttk
-from ttkstyles.hooks import hook_ttk_widgets, generate_hook_name, is_hooked
+from ttkstyles.hooks import hook_ttk_widgets, generate_hook_name, is_hooked, WidgetTable
 # TODO: New tooltip does not include all options ttkwidgets.frames.ToolTip does
 from ttkstyles.widgets.tooltip import ToolTip as Tooltip
 
 
-OPTIONS = {"tooltip": None, "tooltip_options": {}}
+# The options of a tooltip given on init are set before its text, so
+# that the Tooltip is created with them
+OPTIONS = {"tooltip_options": {}, "tooltip": None}
 NAME = generate_hook_name(OPTIONS)
 
 
+class _TooltipTable(WidgetTable):
+    """Table of Tooltips that destroys the Tooltips of destroyed widgets"""
+
+    __slots__ = ()
+
+    def forget(self, widget):
+        tooltip = self.pop(widget, None)
+        if tooltip is not None:
+            tooltip.destroy()
+
+
+# Tooltip widgets of the widgets that have a tooltip
+TOOLTIPS = _TooltipTable()
+# Options of the tooltips of widgets, merged over all configurations
+TOOLTIP_OPTIONS = WidgetTable()
+
+
 def update_defaults(defaults):
     # type: (dict) -> None
     """
@@ -56,23 +75,28 @@ def tooltip_options_hook(self, option, value):
         option ``tooltip`` and a dictionary for option
         ``tooltip_options``.
     """
-    holder = getattr(self, NAME.lower())  # Instance of OriginalFunctions
-    tooltip_widget = getattr(holder, "tooltip_widget", None)
+    tooltip_widget = TOOLTIPS.get(self, None)
     if option == "tooltip":
-        tooltip_tooltip_updater(self, holder, tooltip_widget, value)
+        tooltip_tooltip_updater(self, tooltip_widget, value)
     elif option == "tooltip_options":
-        tooltip_options_updater(self, holder, tooltip_widget, value)
+        tooltip_options_updater(self, tooltip_widget, value)
     else:
         raise RuntimeError("Invalid option passed to tooltip_updater")
 
 
-def tooltip_tooltip_updater(self, holder, tooltip_widget, tooltip):
-    # type: ((tk.Widget, ttk.Widget), object, (Tooltip, None), (str, None)) -> None
+def get_tooltip(widget):
+    # type: (ttk.Widget) -> (Tooltip, None)
+    """Return the Tooltip of a widget if it has one"""
+    return TOOLTIPS.get(widget, None)
+
+
+def tooltip_tooltip_updater(self, tooltip_widget, tooltip):
+    # type: ((tk.Widget, ttk.Widget), (Tooltip, None), (str, None)) -> None
     """Update the ``tooltip`` option of a widget by updating tooltip text"""
     if tooltip_widget is None and tooltip is not None:
         # Create a new tooltip
         options = OPTIONS["tooltip_options"].copy()
-        options.update(getattr(holder, "tooltip_options", {}))
+        options.update(TOOLTIP_OPTIONS.get(self, {}))
         options["text"] = tooltip
         tooltip_widget = Tooltip(self, **options)
     elif tooltip_widget is not None and tooltip is None:
@@ -84,19 +108,27 @@ def tooltip_tooltip_updater(self, holder, tooltip_widget, tooltip):
         tooltip_widget.configure(text=tooltip)
     else:  # tooltip_widget is None and tooltip is None
         pass
-    setattr(holder, "tooltip_widget", tooltip_widget)
+    if tooltip_widget is None:
+        TOOLTIPS.pop(self, None)
+    else:
+        TOOLTIPS[self] = tooltip_widget
 
 
-def tooltip_options_updater(self, holder, tooltip_widget, options):
-    """Update the options of a tooltip widget held on a widget"""
-    # Update options for when a new tooltip is created
-    new_options = getattr(holder, "tooltip_options", {})
+def tooltip_options_updater(self, tooltip_widget, options):
+    """
+    Update the options of the tooltip widget of a widget
+
+    The options are merged into the options given before, so options
+    that are not given again are kept, also for when a new tooltip is
+    created. ``cget("tooltip_options")`` returns the options last given.
+    """
+    new_options = TOOLTIP_OPTIONS.get(self, {}).copy()
     new_options.update(options)
-    setattr(holder, "tooltip_options", new_options)
+    TOOLTIP_OPTIONS[self] = new_options
     if tooltip_widget is not None:
         # Tooltip already exists, configure it with new options
         tooltip_widget.configure(**new_options)
 
 
 if not is_hooked(OPTIONS):
-    hook_ttk_widgets(tooltip_options_hook, OPTIONS)
+    hook_ttk_widgets(tooltip_options_hook, OPTIONS, apply_defaults=False)
@@ -7,7 +7,7 @@ Copyright (c) 2020 RedFantom
 from contextlib import contextmanager
 import os
 import tkinter as tk
-from typing import Optional, Tuple, Iterable, List
+from typing import Callable, Optional, Tuple, Iterable, List
 # Project Modules
 from ttkstyles.files import File
 
@@ -94,3 +94,18 @@ def dicttupkey(d: dict, k: tuple):
     """Return the element of a dictionary using comptup"""
     max_key = max(d.keys(), key=lambda kd: sum(e in kd for e in k))
     return d[max_key]
+
+
+def bind_theme_changed(root: tk.Tk, callback: Callable[[], None]) -> str:
+    """
+    Call a function once whenever the theme of a Tk instance changes
+
+    ttk sends <<ThemeChanged>> to every widget, and the bindings on the
+    root window are executed for all widgets within it. Therefore, the
+    binding only calls the function for the event of the root window.
+
+    :return: Name of the Tcl command created for the function
+    """
+    command = root.register(callback)
+    root.tk.call("bind", root._w, "<<ThemeChanged>>", '+if {"%W" eq "."} {' + command + '}')
+    return command
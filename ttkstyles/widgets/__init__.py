@@ -4,4 +4,4 @@ License: GNU GPLv3
 Copyright (c) 2021 RedFantom
 """
 from ttkstyles.widgets.toggle import ToggleButton, SwitchButton
-from ttkstyles.widgets.tristate import TristateCheckbutton, TristateRadiobutton
+from ttkstyles.widgets.tristate import TristateCheckbutton, TristateRadiobutton, TristateTree
@@ -7,6 +7,8 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Optional
 
+from ttkstyles.capabilities import Capabilities, EXTRAS
+
 
 class CustomCheckbutton(ttk.Checkbutton):
     """Button that is like a checkbox, but looks different"""
@@ -25,7 +27,8 @@ class CustomCheckbutton(ttk.Checkbutton):
         layout = kwargs.pop("style", None)
 
         if layout is None:
-            layout = self._determine_proper_layout()
+            master = kwargs.get("master", args[0] if len(args) != 0 else None)
+            layout = self._determine_proper_layout(master)
         if layout is None and allow_fallback:
             layout = "Checkbutton"
         if layout is None:
@@ -35,21 +38,16 @@ class CustomCheckbutton(ttk.Checkbutton):
         ttk.Checkbutton.__init__(self, *args, **kwargs)
 
     @classmethod
-    def _determine_proper_layout(cls) -> Optional[str]:
-        """Enumerate the layout and find one that's valid and return it"""
-        style = ttk.Style()  # Style created with default root
-        for layout in cls.ALLOWED_LAYOUTS:
-            try:
-                style.layout(layout)
-                return layout  # Return if there is no error
-            except tk.TclError:
-                continue  # Error must be caught this way, checking otherwise not possible
-        return None  # Return None if no valid layout found
+    def _determine_proper_layout(cls, master: tk.Misc = None) -> Optional[str]:
+        """Find the first layout the theme in use provides and return it"""
+        if master is None:
+            master = tk._get_default_root("create a {}".format(cls.__name__))
+        return Capabilities.get(master).first_layout(cls.ALLOWED_LAYOUTS)
 
 
 class ToggleButton(CustomCheckbutton):
-    ALLOWED_LAYOUTS = ["ToggleButton", "Togglebutton", "Toggle"]
+    ALLOWED_LAYOUTS = EXTRAS["ToggleButton"]
 
 
 class SwitchButton(CustomCheckbutton):
-    ALLOWED_LAYOUTS = ["Switch", "SwitchButton", "Switchbutton", "ToggleButton", "Togglebutton", "Toggle"]
+    ALLOWED_LAYOUTS = EXTRAS["SwitchButton"]
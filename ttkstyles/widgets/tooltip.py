@@ -5,15 +5,199 @@ Copyright (c) ToolTip: rdbende 2021
 Copyright (c) stylecheck: RedFantom 2021
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk
-from typing import Any, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+import weakref
+
+from ttkstyles.capabilities import Capabilities, EXTRAS
+from ttkstyles.lookup import LookupCache
+
+
+class TooltipWindow(object):
+    """
+    Window shared by all ToolTips of a Tk instance
+
+    Only a single tooltip can be shown at a time, so rather than
+    creating and destroying a Toplevel with a Label for every tooltip
+    shown, a single withdrawn Toplevel and Label are reconfigured and
+    moved for the tooltip that is shown.
+    """
+
+    _windows = weakref.WeakKeyDictionary()
+
+    def __init__(self, root: tk.Tk):
+        self.toplevel = tk.Toplevel(root)
+        self.toplevel.overrideredirect(True)
+        self.toplevel.withdraw()
+        self.label = ttk.Label(self.toplevel)
+        self.label.pack()
+        # ToolTip currently shown
+        self.owner = None
+        self._options: Dict[str, Any] = {}
+        self._pack: Tuple[Any, Any] = (None, None)
+        self._bg = None
+
+    @classmethod
+    def get(cls, widget: tk.Misc) -> "TooltipWindow":
+        """Return the TooltipWindow for the Tk instance of a widget"""
+        root = widget._root()
+        window = cls._windows.get(root, None)
+        if window is None or not window.toplevel.winfo_exists():
+            window = cls._windows[root] = cls(root)
+        return window
+
+    def show(self, owner: "ToolTip", options: Dict[str, Any], ipadx: Any, ipady: Any, bg: Optional[str]):
+        """Configure the label with the options of a ToolTip"""
+        self.owner = owner
+        # Options of the previous tooltip not given are reset to their defaults
+        changes = {key: "" for key in self._options if key not in options}
+        changes.update((key, value) for key, value in options.items() if self._options.get(key, "") != value)
+        if len(changes) != 0:
+            self.label.configure(**changes)
+            self._options = {key: value for key, value in options.items() if value != ""}
+        if self._pack != (ipadx, ipady):
+            self.label.pack_configure(ipadx=ipadx, ipady=ipady)
+            self._pack = (ipadx, ipady)
+        if bg is not None and bg != self._bg:
+            try:
+                self.toplevel.wm_attributes("-transparentcolor", bg)
+                self._bg = bg
+            except tk.TclError:  # Only supported on Windows
+                pass
+
+    def place(self, x: int, y: int):
+        """Move the window to the given position and make it visible"""
+        self.toplevel.geometry("+{}+{}".format(x, y))
+        self.toplevel.deiconify()
+        self.toplevel.lift()
+
+    def hide(self, owner: "ToolTip"):
+        """Withdraw the window if the given ToolTip is being shown"""
+        if self.owner is owner:
+            self.owner = None
+            self.toplevel.withdraw()
+
+
+class TooltipDispatcher(object):
+    """
+    Route the events of all widgets with a ToolTip of a Tk instance
+
+    Rather than binding to the events of every widget that has a
+    ToolTip, which costs Tcl bindings for every widget and replaces
+    the bindings of the user, the events are bound once for every
+    widget class that has a ToolTip, after the bindings ttk has for the
+    class. The ToolTip to notify is looked up by the path of the widget,
+    so once its class is bound, adding a ToolTip costs a dict insert.
+
+    The class of widgets is determined once for every Python type. For
+    a widget that is given a class of its own with the ``class_``
+    option, :meth:`bind_class` must be called with that class.
+    """
+
+    SEQUENCES = ("<Enter>", "<Leave>", "<ButtonPress>")
+
+    _dispatchers = weakref.WeakKeyDictionary()
+
+    def __init__(self, root: tk.Tk):
+        self.records: Dict[str, "ToolTip"] = {}
+        self._tk = root.tk
+        self._commands = dict(zip(self.SEQUENCES, (root.register(self._enter), root.register(self._leave),
+                                                   root.register(self._leave))))
+        # Classes bound and the class of every type of widget registered
+        self._classes: Set[str] = set()
+        self._types: Dict[type, str] = {}
+
+    @classmethod
+    def get(cls, widget: tk.Misc) -> "TooltipDispatcher":
+        """Return the TooltipDispatcher for the Tk instance of a widget"""
+        root = widget._root()
+        dispatcher = cls._dispatchers.get(root, None)
+        if dispatcher is None:
+            dispatcher = cls._dispatchers[root] = cls(root)
+        return dispatcher
+
+    def bind_class(self, name: str):
+        """Route the events of the widgets of a class, if not done already"""
+        if name in self._classes:
+            return
+        self._classes.add(name)
+        for sequence, command in self._commands.items():
+            self._tk.call("bind", name, sequence, "+{} %W".format(command))
+        # Bindings of the class to presses of specific buttons take precedence over <ButtonPress>
+        for sequence in self._tk.splitlist(self._tk.call("bind", name)):
+            if "Button-" in sequence or "ButtonPress-" in sequence:
+                self._tk.call("bind", name, sequence, "+{} %W".format(self._commands["<ButtonPress>"]))
+
+    def register(self, tooltip: "ToolTip"):
+        """Route the events of the master of a ToolTip to it"""
+        master = tooltip.master
+        if type(master) not in self._types:
+            self._types[type(master)] = master.winfo_class()
+            self.bind_class(self._types[type(master)])
+        self.records[master._w] = tooltip
+
+    def unregister(self, tooltip: "ToolTip"):
+        """Stop routing events to a ToolTip"""
+        path = tooltip.master._w
+        if self.records.get(path, None) is tooltip:
+            del self.records[path]
+
+    def _enter(self, path: str):
+        tooltip = self.records.get(path, None)
+        if tooltip is not None:
+            tooltip._enter()
+
+    def _leave(self, path: str):
+        tooltip = self.records.get(path, None)
+        if tooltip is not None:
+            tooltip._hidetip()
+
+
+class DynamicText(object):
+    """
+    Text of a ToolTip that is produced only when the ToolTip is shown
+
+    Any callable may be given as the text of a ToolTip, in which case it
+    is called every time the ToolTip is shown. A DynamicText allows the
+    produced text to be reused, either until it is invalidated or for a
+    limited amount of time.
+    """
+
+    __slots__ = ("_func", "_memoize", "_ttl", "_value", "_time")
+
+    def __init__(self, func: Callable[[], str], memoize: bool = False, ttl: float = None):
+        """
+        :param func: Function that returns the text
+        :param memoize: Whether to reuse the text once produced
+        :param ttl: Number of seconds to reuse the text for, implies
+            memoize. If not given, memoized text is reused until
+            :meth:`invalidate` is called.
+        """
+        self._func = func
+        self._memoize = memoize or ttl is not None
+        self._ttl = ttl
+        self._value = None
+        self._time = None
+
+    def __call__(self) -> str:
+        if self._time is not None and (self._ttl is None or time.monotonic() - self._time < self._ttl):
+            return self._value
+        value = self._func()
+        if self._memoize:
+            self._value, self._time = value, time.monotonic()
+        return value
+
+    def invalidate(self):
+        """Produce the text again the next time it is requested"""
+        self._value = self._time = None
 
 
 class ToolTip(object):
 
     # TODO: Make themes pick one of these variants for the layout name
-    ALLOWED_LAYOUTS = ["ToolTip", "Tooltip", "Tip", "Balloon"]
+    ALLOWED_LAYOUTS = EXTRAS["ToolTip"]
 
     def __init__(self, master, **kwargs):
         """
@@ -30,57 +214,61 @@ class ToolTip(object):
         :type ipadx: int
         :param ipady: inner Y padding of the tooltip
         :type ipady: int
+        :param text: text of the tooltip, or a callable such as a
+            :class:`DynamicText` that returns the text when the tooltip
+            is shown
+        :type text: Union[str, Callable[[], str]]
         :param kwargs: options to be passed on to the :class:`ttk.Label` initializer inside the tooltip
+
+        Creating a ToolTip is cheap: the layout of the tooltip is only
+        determined when the tooltip is shown.
         """
-        self._toplevel = None
+        self._window = None
+        self.id0 = self.id1 = None
         self.master = master
         self._wait = int(kwargs.pop("wait", "2")) * 1000
         self._duration = int(kwargs.pop("duration", "10")) * 1000
         self._direction = kwargs.pop("direction", "cursor")
         self._ipadx = kwargs.pop("ipadx", "3")
         self._ipady = kwargs.pop("ipady", "1")
-        kwargs.update(anchor="center")
-        self._layout, self._bg = self._determine_proper_layout()
-        if self._layout is None:
-            kwargs.update(relief="solid", borderwidth=1)
-        else:
-            kwargs.update(style=self._layout)
+        # Layout and background are determined when shown
+        self._layout = self._bg = None
         self.kwargs = kwargs
-        if kwargs["text"] is not None:
+        if kwargs.get("text", None) is not None:
             self._bind()
 
     def _bind(self):
-        self.master.bind("<Enter>", self._enter)
-        self.master.bind("<Leave>", self._hidetip)
-        self.master.bind("<ButtonPress>", self._hidetip)
+        TooltipDispatcher.get(self.master).register(self)
 
     def _unbind(self):
-        # TODO: Improve this so as to only unbind our own methods
-        self.master.unbind("<Enter>")
-        self.master.unbind("<Leave>")
-        self.master.unbind("<ButtonPress>")
+        TooltipDispatcher.get(self.master).unregister(self)
 
     def _enter(self, *args):
-        """Creates a ToolTip, and schedules it"""
-        self._toplevel = tk.Toplevel(self.master)
-        self._toplevel.overrideredirect(True)
-        self._toplevel.withdraw()
-        if self._bg is not None:
-            self._toplevel.wm_attributes("-transparentcolor", self._bg)
+        """Schedules the ToolTip to be shown"""
+        self._cancel()
         self.id0 = self.master.after(self._wait, self._showtip)
         self.id1 = self.master.after(self._duration, self._hidetip)
 
+    def _cancel(self):
+        """Cancel the scheduled showing and hiding of the ToolTip"""
+        for after_id in (self.id0, self.id1):
+            if after_id is not None:
+                self.master.after_cancel(after_id)
+        self.id0 = self.id1 = None
+
     def _hidetip(self, *args):
-        """Destroys the ToolTip"""
-        self.master.after_cancel(self.id0)
-        self.master.after_cancel(self.id1)
-        self._toplevel.destroy()
+        """Hides the ToolTip"""
+        self._cancel()
+        if self._window is not None:
+            self._window.hide(self)
+            self._window = None
 
     def _showtip(self):
         """Displays the ToolTip"""
-        self._toplevel.deiconify()
-        label = ttk.Label(self._toplevel, **self.kwargs)
-        label.pack(ipadx=self._ipadx, ipady=self._ipady)
+        self.id0 = None
+        self._window = TooltipWindow.get(self.master)
+        self._window.show(self, self._label_options(), self._ipadx, self._ipady, self._bg)
+        label = self._window.label
         if self._direction == "above":
             self.x = int(self.master.winfo_rootx() + (self.master.winfo_width() / 2) - (label.winfo_reqwidth() / 2))
             self.y = self.master.winfo_rooty() - label.winfo_reqheight() - 5
@@ -96,34 +284,54 @@ class ToolTip(object):
         elif self._direction == "cursor":
             self.x = label.winfo_pointerx() + 10
             self.y = label.winfo_pointery() + 20
-        self._toplevel.geometry("+{}+{}".format(self.x, self.y))
+        self._window.place(self.x, self.y)
+
+    def _label_options(self) -> Dict[str, Any]:
+        """Return the options to configure the label of the window with"""
+        # Cheap enough to follow changes of the theme on every show
+        self._layout, self._bg = self._determine_proper_layout(self.master)
+        options = self.kwargs.copy()
+        options.update(anchor="center")
+        if self._layout is None:
+            options.update(relief="solid", borderwidth=1)
+        else:
+            options.update(style=self._layout)
+        if callable(options.get("text", None)):
+            options["text"] = options["text"]()
+        return options
 
     @staticmethod
-    def _determine_proper_layout() -> Optional[Tuple[str, str]]:
-        """Enumerate the layout and find one that's valid and return it"""
-        style = ttk.Style()  # Style created with default root
-        for layout in ToolTip.ALLOWED_LAYOUTS:
-            try:
-                style.layout(layout)
-                bg = style.lookup(".", "background")
-                return layout, bg  # Return if there is no error
-            except tk.TclError:
-                continue  # Error must be caught this way, checking otherwise not possible
-        return None, None  # Return None if no valid layout found
+    def _determine_proper_layout(master: tk.Misc) -> Optional[Tuple[str, str]]:
+        """Find the first layout the theme in use provides and return it with the background"""
+        layout = Capabilities.get(master).first_layout(ToolTip.ALLOWED_LAYOUTS)
+        if layout is None:
+            return None, None
+        return layout, LookupCache.get(master).lookup(".", "background")
 
     def configure(self, cnf={}, **kwargs):
+        """Configure the ToolTip with the options it takes on initialization"""
+        kwargs = dict(cnf, **kwargs)
+        for key in ("wait", "duration"):
+            if key in kwargs:
+                setattr(self, "_" + key, int(kwargs.pop(key)) * 1000)
+        for key in ("direction", "ipadx", "ipady"):
+            if key in kwargs:
+                setattr(self, "_" + key, kwargs.pop(key))
         self.kwargs.update(kwargs)
 
     def cget(self, key: str) -> Any:
+        if key in ("wait", "duration"):
+            return getattr(self, "_" + key) // 1000
+        elif key in ("direction", "ipadx", "ipady"):
+            return getattr(self, "_" + key)
         return self.kwargs[key]
 
     def __setitem__(self, key: str, value: Any):
-        return self.configure(key=value)
+        return self.configure(**{key: value})
 
     def __getitem__(self, key: str) -> Any:
         return self.cget(key)
 
     def destroy(self):
-        if self._toplevel is not None:
-            self._toplevel.destroy()
-            self._toplevel = None
+        self._hidetip()
+        self._unbind()
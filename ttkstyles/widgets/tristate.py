@@ -6,12 +6,10 @@ Copyright (c) 2020 RedFantom
 from enum import IntEnum
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
+import weakref
 
-
-def tuple_comp(tup1: tuple, tup2: tuple) -> bool:
-    """Compare the elements of one tuple to another"""
-    return set(tup1) == set(tup2)
+from ttkstyles.hooks import WidgetTable
 
 
 class TristateWidget(ttk.Widget):
@@ -19,13 +17,14 @@ class TristateWidget(ttk.Widget):
     Widget that supports a third, 'partially' selected state
 
     'Normal' widgets do include a third state (tristate) in their
-    operation. Therefore, it must forcibly be set so that the widget is
-    displayed properly.
+    operation. ttk sets the 'alternate' state of checkbuttons and
+    radiobutons whenever their variable is unset, so the state of the
+    widget is stored in a variable of its own: Set to the on value when
+    selected, to the off value when not selected and unset when in the
+    tristate.
 
-    The state of the widget is internally tracked in the variable
-    ``_state``, and the widget hooks into the proper Tkinter events
-    to ensure that its display is continuously forced to match that
-    state.
+    The state is only changed on actual transitions, when clicked or
+    when set with :meth:`set`, and ttk updates the display by itself.
     """
 
     class State(IntEnum):
@@ -43,58 +42,264 @@ class TristateWidget(ttk.Widget):
             else:
                 return TristateWidget.State.NONE
 
-    _state_map: Dict[State, str] = {
-        State.NONE: "",
-        State.TRISTATE: "alternate",
-        State.SELECTED: "selected"
-    }
+    ON, OFF = "1", "0"
+    # Options that determine the values of the variable
+    _values: Dict[str, str] = {}
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, master, widget, **kwargs):
         variable = kwargs.pop("variable", None)
         assert (isinstance(variable, tk.IntVar) or variable is None)  # TODO
-        self._variable = tk.BooleanVar()
-        # kwargs.update({"variable": self._variable, "offvalue": False, "onvalue": True})
-        ttk.Widget.__init__(self, *args, kwargs)
-        self.bind("<Button-1>", self._on_click)
-        self.bind("<Configure>", self._update_state)
-        self.bind("<Enter>", self._update_state)
-        self.bind("<Leave>", self._update_state)
+        self._command = kwargs.pop("command", None)
+        self._variable = tk.StringVar(master, self.OFF)
+        kwargs.update(self._values, variable=self._variable, command=self._on_invoke)
+        ttk.Widget.__init__(self, master, widget, kwargs)
         self._state: TristateWidget.State = TristateWidget.State.NONE
+        # TristateTree that determines the state when invoked
+        self._controller: Optional[TristateTree] = None
+
+    def _on_invoke(self):
+        """Move on to the next state after the widget has been invoked"""
+        if self._controller is not None:
+            self._controller._invoked(self)
+        else:
+            self.set(TristateWidget.State.next(self._state))
+        if self._command is not None:
+            self._command()
+
+    def get(self) -> "TristateWidget.State":
+        """Return the current state of the widget"""
+        return self._state
+
+    def set(self, state: "TristateWidget.State"):
+        """
+        Set the state of the widget, which is displayed by ttk
+
+        The state of a widget in a TristateTree is set through the tree,
+        see :meth:`TristateTree.set`.
+        """
+        if self._controller is not None:
+            self._controller.set(self, state)
+        else:
+            self.tk.eval(self._set_script(state))
 
-    def _on_click(self, _: tk.Event):
-        self._state: TristateWidget.State = TristateWidget.State.next(self._state)
-        self._variable.set(self._state == TristateWidget.State.SELECTED)
-        self._update_state()
-        self.update_idletasks()
-        assert self._variable.get() == (self._state == TristateWidget.State.SELECTED)
-
-    def _update_state(self, _: tk.Event = None):
-        """Force the state of the widget to be alternate if in tristate"""
-        self.update_idletasks()
-        tkstate = self.state()
-        assert isinstance(tkstate, tuple)
-        tkstate = list(tkstate)
-        # Clean the current state from display state
-        for value in self._state_map.values():
-            if value in tkstate:
-                tkstate.remove(value)
-        # Add the proper display state
-        if self._state != TristateWidget.State.NONE:
-            tkstate.append(self._state_map[self._state])
-        tkstate = tuple(tkstate)
-        self.state(tkstate)
-        self.update_idletasks()
-        print(self._state, tkstate, self.state())
-        # assert tuple_comp(self.state(), tkstate)
+    def _set_script(self, state: "TristateWidget.State") -> str:
+        """Set the state and return the Tcl command that displays it"""
+        self._state = TristateWidget.State(state)
+        if self._state == TristateWidget.State.TRISTATE:
+            return tk._join(("unset", "-nocomplain", self._variable._name))
+        return tk._join(("set", self._variable._name,
+                         self.ON if self._state == TristateWidget.State.SELECTED else self.OFF))
 
 
 class TristateCheckbutton(TristateWidget):
+    _values = {"onvalue": TristateWidget.ON, "offvalue": TristateWidget.OFF}
+
     def __init__(self, master, **kwargs):
         kwargs.update(style="TCheckbutton")
         TristateWidget.__init__(self, master, "ttk::checkbutton", **kwargs)
 
 
 class TristateRadiobutton(TristateWidget):
+    _values = {"value": TristateWidget.ON}
+
     def __init__(self, master, **kwargs):
         kwargs.update(style="TRadiobutton")
         TristateWidget.__init__(self, master, "ttk::radiobutton", **kwargs)
+
+
+class _TreeNode(object):
+    """Node of a TristateTree with the counts of the states of its children"""
+
+    __slots__ = ("widget", "parent", "children", "selected", "partial")
+
+    def __init__(self, widget: TristateWidget, parent: Optional["_TreeNode"]):
+        self.widget = widget
+        self.parent = parent
+        self.children: List[_TreeNode] = []
+        # Number of children that are selected and partially selected
+        self.selected = 0
+        self.partial = 0
+
+    def derived(self) -> TristateWidget.State:
+        """Return the state of the node as derived from its children"""
+        if len(self.children) == 0:
+            return self.widget.get()
+        elif self.selected == len(self.children):
+            return TristateWidget.State.SELECTED
+        elif self.selected == 0 and self.partial == 0:
+            return TristateWidget.State.NONE
+        return TristateWidget.State.TRISTATE
+
+
+class _NodeTable(WidgetTable):
+    """Table of the nodes of a TristateTree that removes destroyed checkbuttons"""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, tree: "TristateTree"):
+        WidgetTable.__init__(self)
+        # The table is kept alive by the hooks module, but not the tree
+        self._tree = weakref.ref(tree)
+
+    def forget(self, widget: TristateWidget):
+        tree = self._tree()
+        if tree is not None and widget in self:
+            tree.remove(widget)
+
+
+class TristateTree(object):
+    """
+    Controller of a hierarchy of TristateCheckbuttons
+
+    The state of a checkbutton with children is derived from its
+    children: selected if all of them are selected, not selected if none
+    of them are (partially) selected and the tristate otherwise.
+    Clicking a checkbutton without children toggles it, clicking one
+    with children selects or deselects everything below it.
+
+    Every node keeps count of the number of its selected and partially
+    selected children, so a change of a single checkbutton only updates
+    the nodes on the path to the root, rather than rescanning the tree.
+    The display of all checkbuttons changed by an operation is updated
+    in a single Tcl evaluation.
+
+    A checkbutton that is destroyed is removed from the tree along with
+    everything below it, as with :meth:`remove`.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[TristateWidget, _TreeNode] = _NodeTable(self)
+
+    def add(self, widget: TristateWidget, parent: TristateWidget = None) -> TristateWidget:
+        """
+        Add a checkbutton to the tree
+
+        :param widget: Checkbutton to add, with its current state
+        :param parent: Checkbutton already in the tree to add it under,
+            or None to add it as a root
+        """
+        if widget in self._nodes:
+            raise ValueError("{} is already part of the tree".format(widget))
+        node = self._nodes[widget] = _TreeNode(widget, None if parent is None else self._nodes[parent])
+        widget._controller = self
+        if node.parent is not None:
+            node.parent.children.append(node)
+            self._count(node.parent, node.widget.get(), 1)
+            self._apply(self._propagate(node.parent))
+        return widget
+
+    def remove(self, widget: TristateWidget):
+        """Remove a checkbutton and everything below it from the tree"""
+        node = self._nodes[widget]
+        for descendant in self._subtree(node):
+            del self._nodes[descendant.widget]
+            descendant.widget._controller = None
+        if node.parent is not None:
+            node.parent.children.remove(node)
+            self._count(node.parent, node.widget.get(), -1)
+            self._apply(self._propagate(node.parent))
+
+    def get(self, widget: TristateWidget) -> TristateWidget.State:
+        """Return the state of a checkbutton in the tree"""
+        return self._nodes[widget].widget.get()
+
+    def children(self, widget: TristateWidget) -> List[TristateWidget]:
+        """Return the children of a checkbutton in the tree"""
+        return [child.widget for child in self._nodes[widget].children]
+
+    def parent(self, widget: TristateWidget) -> Optional[TristateWidget]:
+        """Return the parent of a checkbutton in the tree"""
+        parent = self._nodes[widget].parent
+        return None if parent is None else parent.widget
+
+    def select(self, widget: TristateWidget, selected: bool = True):
+        """Select or deselect a checkbutton and everything below it"""
+        node = self._nodes[widget]
+        state = TristateWidget.State.SELECTED if selected else TristateWidget.State.NONE
+        changes = {}
+        # Children are set before their parents, so the counts of every
+        # node in the subtree are correct once it is set itself
+        for descendant in reversed(list(self._subtree(node))):
+            descendant.selected = len(descendant.children) if selected else 0
+            descendant.partial = 0
+            if descendant.widget.get() != state:
+                changes[descendant] = state
+        self._set(node, state, changes)
+
+    def set(self, widget: TristateWidget, state: TristateWidget.State):
+        """
+        Set the state of a checkbutton in the tree
+
+        Setting a checkbutton with children selects or deselects
+        everything below it, see :meth:`select`. As the tristate of such
+        a checkbutton is derived from its children, it cannot be set.
+        """
+        node, state = self._nodes[widget], TristateWidget.State(state)
+        if len(node.children) == 0:
+            self._set(node, state, {node: state})
+        elif state == TristateWidget.State.TRISTATE:
+            raise ValueError("The tristate of {} is derived from its children".format(widget))
+        else:
+            self.select(widget, state == TristateWidget.State.SELECTED)
+
+    def _set(self, node: _TreeNode, state: TristateWidget.State, changes: Dict[_TreeNode, TristateWidget.State]):
+        """Set the state of a node and display it with all other changes"""
+        previous = node.widget.get()
+        if previous != state and node.parent is not None:
+            self._count(node.parent, previous, -1)
+            self._count(node.parent, state, 1)
+        node.widget._state = state
+        if node.parent is not None:
+            changes.update(self._propagate(node.parent))
+        self._apply(changes)
+
+    def _invoked(self, widget: TristateWidget):
+        """Toggle a checkbutton when it has been clicked"""
+        node = self._nodes[widget]
+        if len(node.children) != 0:
+            self.select(widget, widget.get() != TristateWidget.State.SELECTED)
+        else:
+            state = TristateWidget.State.NONE if widget.get() == TristateWidget.State.SELECTED \
+                else TristateWidget.State.SELECTED
+            self._set(node, state, {node: state})
+
+    @staticmethod
+    def _count(node: _TreeNode, state: TristateWidget.State, delta: int):
+        """Add a child with the given state to the counts of a node"""
+        if state == TristateWidget.State.SELECTED:
+            node.selected += delta
+        elif state == TristateWidget.State.TRISTATE:
+            node.partial += delta
+
+    def _propagate(self, node: _TreeNode) -> Dict[_TreeNode, TristateWidget.State]:
+        """Update the states of a node and its ancestors from the counts"""
+        changes = {}
+        while node is not None:
+            previous, state = node.widget.get(), node.derived()
+            if previous == state:
+                break
+            changes[node] = state
+            if node.parent is not None:
+                self._count(node.parent, previous, -1)
+                self._count(node.parent, state, 1)
+            # Store the state right away, as the parent reads it
+            node.widget._state = state
+            node = node.parent
+        return changes
+
+    @staticmethod
+    def _apply(changes: Dict[_TreeNode, TristateWidget.State]):
+        """Display the changed states in a single Tcl evaluation"""
+        if len(changes) == 0:
+            return
+        script = "\n".join(node.widget._set_script(state) for node, state in changes.items())
+        next(iter(changes)).widget.tk.eval(script)
+
+    @staticmethod
+    def _subtree(node: _TreeNode) -> Iterable[_TreeNode]:
+        """Iterate over a node and all nodes below it, parents first"""
+        stack = [node]
+        while len(stack) != 0:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children)